@@ -1,17 +1,7 @@
-import os
-import sys
-
-from imageio.v2 import imwrite
-
 from src.factory import ArtFactory
 from src.gui import Gui
 from src.image import Image
-
-
-def save_preview_tmp(preview: Image) -> str:
-    tmp_path: str = os.path.join(sys.path[0], "tmp.ppm")
-    imwrite(tmp_path, preview.get_image_data())
-    return f"file:{os.sep}{tmp_path}"
+from src.image.session import load_session, save_session
 
 
 def on_open_image_dialog(gui: Gui, index: int) -> None:
@@ -19,7 +9,7 @@ def on_open_image_dialog(gui: Gui, index: int) -> None:
         gui.image_dialog.openDialog(-1, "", "", "", False, False, False, False)
     else:  # editing existing image
         image = gui.art_factory[index]
-        preview_path = save_preview_tmp(image)
+        preview_path = gui.publish_preview(image)
         gui.image_dialog.openDialog(
             index, preview_path,
             image.name, image.path,
@@ -30,13 +20,15 @@ def on_open_image_dialog(gui: Gui, index: int) -> None:
 
 def on_preview_art(gui: Gui, image: Image) -> None:
     gui.image_dialog.setImageLoading(True)
+    image.working_size = gui.compute_max_art_size()
+    image.share_pipeline(gui.art_factory.loaded_image)
     gui.art_factory.loaded_image = image
     gui.process_image_background(-1, image)
 
 
 def on_image_processed(gui: Gui, index: int) -> None:
     if index == -1:  # new image preview
-        preview_path = save_preview_tmp(gui.art_factory.loaded_image)
+        preview_path = gui.publish_preview(gui.art_factory.loaded_image)
         gui.image_dialog.setPreview(preview_path)
         gui.image_dialog.setImageLoading(False)
     elif gui.get_current_art_list_index() == index:
@@ -46,15 +38,15 @@ def on_image_processed(gui: Gui, index: int) -> None:
 def on_add_edit_art(gui: Gui, index: int, name: str) -> None:
     new_image = gui.art_factory.loaded_image
     new_image.name = name
-    gui.art_factory.loaded_image = None
+    new_image.release_raw_data()
     if index == -1:  # add image
         gui.art_factory += new_image
-        if len(gui.art_factory) > 1:
-            gui.set_play_animation_button_enable(True)
     else:  # edit image
         gui.art_factory[index] = new_image
         if gui.get_current_art_list_index() == index:
             on_draw_art(gui, index)
+    gui.art_factory.loaded_image = None  # added image keeps its rendered outputs
+    gui.set_play_animation_button_enable(gui.art_factory.is_animatable())
 
 
 def on_draw_art(gui: Gui, index: int) -> None:
@@ -69,14 +61,23 @@ def on_draw_art(gui: Gui, index: int) -> None:
 
 def on_remove_art(gui: Gui, index: int) -> None:
     del gui.art_factory[index]
-    if len(gui.art_factory) < 2:
-        gui.set_play_animation_button_enable(False)
+    gui.set_play_animation_button_enable(gui.art_factory.is_animatable())
 
 
 def on_apply_grayscale(gui: Gui, new_grayscale: str) -> None:
-    for i, art in enumerate(gui.art_factory):
-        art.grayscale_level = new_grayscale
-        gui.process_image_background(i, art)
+    for art in gui.art_factory:
+        art.set_grayscale_level(new_grayscale)
+    on_draw_art(gui, gui.get_current_art_list_index())
+
+
+def on_open_session(gui: Gui, path: str) -> None:
+    gui.art_factory.reset(load_session(path))
+    gui.set_play_animation_button_enable(gui.art_factory.is_animatable())
+    on_draw_art(gui, gui.get_current_art_list_index())
+
+
+def on_save_session(gui: Gui, path: str) -> None:
+    save_session(path, gui.art_factory)
 
 
 def main():
@@ -89,6 +90,8 @@ def main():
     gui.on_draw_art = on_draw_art
     gui.on_remove_art = on_remove_art
     gui.on_apply_grayscale = on_apply_grayscale
+    gui.on_open_session = on_open_session
+    gui.on_save_session = on_save_session
     gui.show()
 
 
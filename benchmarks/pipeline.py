@@ -0,0 +1,356 @@
+"""
+Benchmark suite of the image to ASCII art pipeline.
+
+Times every stage of Image (decode, effects, grayscale conversion,
+glyph mapping, resize, text formatting and color rendering)
+on synthetic images of several sizes, records peak memory of each stage
+(and size of text outputs) and saves / compares JSON baselines.
+
+Usage:
+    python -m benchmarks [--sizes MP ...] [--repeat N]
+                         [--save baseline.json] [--compare baseline.json]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from imageio.v3 import imwrite
+
+from src.image import Image
+from src.image.render_cache import render_cache
+from src.image.text import decode_ascii_art
+from src.util import consts
+from src.util.disk_cache import disk_cache
+
+DEFAULT_SIZES = (0.25, 1.0, 4.0, 12.0, 24.0, 50.0)
+"""Default sizes of synthetic images (in megapixels)."""
+
+DEFAULT_THRESHOLD = 1.25
+"""Default slowdown ratio, above which a stage is reported as regression."""
+
+MIN_REGRESSION_TIME = 1e-3
+"""Slowdowns smaller than this (in seconds) are treated as noise."""
+
+ART_SIZE = (300, 150)
+"""ASCII art size (width and height) used by the resize stage."""
+
+
+def make_image_data(megapixels: float, rng: np.random.Generator) -> np.ndarray:
+    """
+    Generates synthetic RGB image data.
+
+    Smooth gradients with mild noise, so that encoded files
+    have realistic sizes and decoding times.
+
+    Args:
+        megapixels: float
+            Image size (in megapixels).
+        rng: np.random.Generator
+            Random generator.
+
+    Returns:
+        RGB image data (uint8) with 4:3 aspect ratio.
+    """
+
+    height = max(1, int((megapixels * 1e6 * 3 / 4) ** 0.5))
+    width = max(1, int(megapixels * 1e6 / height))
+    rows = np.linspace(0, 255, height, dtype=np.float32)[:, np.newaxis]
+    cols = np.linspace(0, 255, width, dtype=np.float32)
+    data = np.empty((height, width, 3), dtype=np.uint8)
+    data[:, :, 0] = (rows * 0.5 + cols * 0.5).astype(np.uint8)
+    data[:, :, 1] = rows.astype(np.uint8)
+    data[:, :, 2] = (255 - cols).astype(np.uint8)
+    data[::7, ::5] = rng.integers(0, 256, data[::7, ::5].shape, dtype=np.uint8)
+    return data
+
+
+def new_image(path: str) -> Image:
+    """
+    Args:
+        path: str
+            Path to image file.
+
+    Returns:
+        Image with all effects applied and default grayscale level.
+    """
+
+    return Image(
+        "Benchmark", path,
+        True, True, True, True,
+        consts.uiConsts["DefaultGrayscaleLevel"]
+    )
+
+
+def build_stages(path: str) -> Dict[str, Tuple[Callable[[], Any], Callable[[], Any]]]:
+    """
+    Prepares inputs of every pipeline stage.
+
+    Args:
+        path: str
+            Path to image file.
+
+    Returns:
+        Stage name mapped to a pair of setup function
+        (called before each run, not timed) and timed function.
+    """
+
+    image = new_image(path)
+    # noinspection PyUnresolvedReferences
+    raw = image._Image__get_image_data_raw()
+    gray = Image._Image__rgb_to_gray(raw)
+    image.convert_to_ascii_art()
+    (_, glyph_lut, _) = image._Image__grayscale
+    glyphs = Image._Image__get_ascii_data(gray, glyph_lut)
+    render_id = image._Image__render_id
+    fresh: List[Image] = []
+
+    def new_fresh_image() -> None:
+        fresh[:] = [new_image(path)]
+
+    return {
+        "decode": (new_fresh_image, lambda: fresh[0]._Image__get_image_data_raw()),
+        "negative": (None, lambda: Image._Image__negative(raw)),
+        "contrast": (None, lambda: Image._Image__contrast(raw)),
+        "rgb_to_gray": (None, lambda: Image._Image__rgb_to_gray(raw)),
+        "sharpen": (None, lambda: image._Image__sharpen(gray)),
+        "emboss": (None, lambda: image._Image__emboss(gray)),
+        "ascii_data": (None, lambda: Image._Image__get_ascii_data(gray, glyph_lut)),
+        "resize": (
+            lambda: render_cache.invalidate(render_id),
+            lambda: image.get_ascii_art(*ART_SIZE)
+        ),
+        "format_output": (None, lambda: decode_ascii_art(glyphs)),
+        "color_ansi": (
+            lambda: render_cache.invalidate(render_id),
+            lambda: image.get_color_ascii_art(*ART_SIZE, "ansi")
+        ),
+        "color_html": (
+            lambda: render_cache.invalidate(render_id),
+            lambda: image.get_color_ascii_art(*ART_SIZE, "html")
+        ),
+        "convert": (new_fresh_image, lambda: fresh[0].convert_to_ascii_art())
+    }
+
+
+def measure(setup: Optional[Callable[[], Any]], func: Callable[[], Any],
+            repeat: int) -> Dict[str, float]:
+    """
+    Measures duration and peak memory of a stage.
+
+    Duration is measured without memory tracing (best of repeat runs),
+    peak memory is measured in one extra traced run.
+    Size of text outputs (e.g. colored ASCII art) is recorded as well.
+
+    Args:
+        setup: Callable[[], Any] or None
+            Called before each run (not timed).
+        func: Callable[[], Any]
+            Timed function.
+        repeat: int
+            Number of timed runs.
+
+    Returns:
+        Best duration (in seconds), peak allocated memory (in bytes)
+        and output size (in bytes, text outputs only).
+    """
+
+    durations = []
+    for _ in range(max(1, repeat)):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    if setup:
+        setup()
+    tracemalloc.start()
+    output = func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    result = {"seconds": min(durations), "peak_bytes": peak}
+    if isinstance(output, str):
+        result["output_bytes"] = len(output.encode())
+    return result
+
+
+def run_benchmarks(sizes: Sequence[float], repeat: int,
+                   stages: Optional[Sequence[str]] = None,
+                   log: Callable[[str], None] = print) -> Dict[str, Any]:
+    """
+    Runs all stages on synthetic images of all sizes.
+    Disk cache is disabled, so every run processes images.
+
+    Args:
+        sizes: Sequence[float]
+            Image sizes (in megapixels).
+        repeat: int
+            Number of timed runs of each stage.
+        stages: Sequence[str] or None
+            Names of stages to run (all stages if None).
+        log: Callable[[str], None]
+            Receives a line of progress output.
+
+    Returns:
+        Results in baseline format:
+        {"meta": {...}, "results": {size: {stage: {"seconds", "peak_bytes"}}}}.
+    """
+
+    rng = np.random.default_rng(0)
+    results = {}
+    is_disk_cache_enabled, disk_cache.enabled = disk_cache.enabled, False
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for megapixels in sizes:
+                path = os.path.join(tmp_dir, f"{megapixels}.png")
+                imwrite(path, make_image_data(megapixels, rng))
+                size_results = {}
+                for stage, (setup, func) in build_stages(path).items():
+                    if stages and stage not in stages:
+                        continue
+                    size_results[stage] = measure(setup, func, repeat)
+                    log(format_result(megapixels, stage, size_results[stage]))
+                results[f"{megapixels:g}"] = size_results
+                os.remove(path)
+    finally:
+        disk_cache.enabled = is_disk_cache_enabled
+    return {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "processor": platform.processor(),
+            "cpu_count": os.cpu_count(),
+            "repeat": repeat
+        },
+        "results": results
+    }
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any],
+            threshold: float = DEFAULT_THRESHOLD) -> List[str]:
+    """
+    Compares results with a baseline.
+
+    Args:
+        results: Dict[str, Any]
+            Results of run_benchmarks.
+        baseline: Dict[str, Any]
+            Previously saved results.
+        threshold: float
+            Slowdown ratio, above which a stage is reported.
+
+    Returns:
+        Descriptions of stages slower than in baseline
+        (only sizes and stages present in both are compared).
+    """
+
+    regressions = []
+    for size, stages in results["results"].items():
+        for stage, result in stages.items():
+            old = baseline["results"].get(size, {}).get(stage)
+            if old is None:
+                continue
+            ratio = result["seconds"] / max(old["seconds"], 1e-9)
+            if ratio > threshold and result["seconds"] - old["seconds"] > MIN_REGRESSION_TIME:
+                regressions.append(
+                    f"{stage} at {size} MP: {old['seconds']:.4f} s -> "
+                    f"{result['seconds']:.4f} s ({ratio:.2f}x)"
+                )
+    return regressions
+
+
+def format_result(megapixels: float, stage: str, result: Dict[str, float]) -> str:
+    """
+    Args:
+        megapixels: float
+            Image size (in megapixels).
+        stage: str
+            Stage name.
+        result: Dict[str, float]
+            Stage's duration and peak memory.
+
+    Returns:
+        Formatted line of results table.
+    """
+
+    line = (f"{megapixels:>6g} MP {stage:<14} {result['seconds'] * 1e3:>10.2f} ms "
+            f"{result['peak_bytes'] / 1e6:>10.1f} MB")
+    if "output_bytes" in result:
+        line += f" {result['output_bytes'] / 1e3:>10.1f} kB output"
+    return line
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    """
+    Parses command line arguments of the benchmark suite.
+
+    Args:
+        argv: Sequence[str] or None
+            Command line arguments (sys.argv is used if None).
+
+    Returns:
+        Parsed arguments.
+    """
+
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Benchmarks every stage of the image to ASCII art pipeline."
+    )
+    parser.add_argument(
+        "--sizes", type=float, nargs='+', default=DEFAULT_SIZES,
+        help="synthetic image sizes in megapixels (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--stages", nargs='+',
+        help="stages to run (default: all stages)"
+    )
+    parser.add_argument(
+        "-r", "--repeat", type=int, default=3,
+        help="timed runs of each stage, the best one is reported (default: 3)"
+    )
+    parser.add_argument("--save", help="save results as JSON baseline to this path")
+    parser.add_argument("--compare", help="compare results with JSON baseline at this path")
+    parser.add_argument(
+        "--threshold", type=float, default=DEFAULT_THRESHOLD,
+        help="slowdown ratio reported as regression (default: %(default)s)"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Benchmark suite entry point.
+
+    Args:
+        argv: Sequence[str] or None
+            Command line arguments (sys.argv is used if None).
+
+    Returns:
+        Exit code (nonzero if any stage regressed against baseline).
+    """
+
+    args = parse_args(argv)
+    print(f"{'size':>9} {'stage':<14} {'time':>13} {'peak memory':>13}")
+    results = run_benchmarks(args.sizes, args.repeat, args.stages)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline saved to {args.save}")
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        print(f"{len(regressions)} regression(s) against {args.compare}")
+        return 1 if regressions else 0
+    return 0
@@ -0,0 +1,88 @@
+"""
+Benchmark of RGB to grayscale conversion.
+
+Compares the lookup table converter used by Image
+with the previous float64 implementation (speed and peak memory).
+
+Usage:
+    python -m benchmarks.rgb_to_gray [megapixels ...]
+"""
+import sys
+import time
+import tracemalloc
+from typing import Callable, Tuple
+
+import numpy as np
+
+from src.image import Image
+from src.util import consts
+
+
+def rgb_to_gray_float(data: np.ndarray) -> np.ndarray:
+    """
+    Previous grayscale converter (float64 copies of RGB data).
+
+    Args:
+        data: np.ndarray
+            RGB image data.
+
+    Returns:
+        Grayscale image data.
+    """
+
+    gamma_compressed = data / 255.0
+    linear = np.where(
+        gamma_compressed <= 0.04045,
+        gamma_compressed / 12.92,
+        ((gamma_compressed + 0.055) / 1.055) ** 2.4
+    )
+    linear_luminance = linear @ np.array(
+        consts.imageConsts["LuminanceCoefficients"]
+    ).T
+    return (linear_luminance * 255).astype(np.ubyte)
+
+
+def measure(func: Callable[[np.ndarray], np.ndarray],
+            data: np.ndarray) -> Tuple[float, int, np.ndarray]:
+    """
+    Measures duration and peak memory of a converter.
+
+    Args:
+        func: Callable[[np.ndarray], np.ndarray]
+            Grayscale converter.
+        data: np.ndarray
+            RGB image data.
+
+    Returns:
+        Duration (in seconds), peak allocated memory (in bytes)
+        and converted data.
+    """
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(data)
+    duration = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return duration, peak, result
+
+
+def main() -> None:
+    sizes = [float(mp) for mp in sys.argv[1:]] or [1.0, 12.0, 24.0]
+    rng = np.random.default_rng(0)
+    print(f"{'MP':>6} {'float64 s':>10} {'table s':>8} {'speedup':>8} "
+          f"{'float64 MB':>11} {'table MB':>9}")
+    for mp in sizes:
+        side = int((mp * 1e6) ** 0.5)
+        data = rng.integers(0, 256, (side, side, 3), dtype=np.uint8)
+        old_time, old_peak, old = measure(rgb_to_gray_float, data)
+        # noinspection PyUnresolvedReferences
+        new_time, new_peak, new = measure(Image._Image__rgb_to_gray, data)
+        assert np.array_equal(old, new)
+        print(f"{mp:>6.1f} {old_time:>10.3f} {new_time:>8.3f} "
+              f"{old_time / new_time:>7.1f}x "
+              f"{old_peak / 1e6:>11.1f} {new_peak / 1e6:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
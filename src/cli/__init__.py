@@ -0,0 +1 @@
+from .batch import main
@@ -0,0 +1,277 @@
+from __future__ import annotations
+
+import argparse
+import glob
+import os
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+from src.image import FrameSequence, open_image
+from src.image.export import EXPORT_EXTENSIONS, export_ascii_art
+from src.util import consts
+from src.util.instrumentation import call_with_stats, instrumentation
+
+
+def collect_images(patterns: Sequence[str]) -> List[Path]:
+    """
+    Collects image and video files from paths, directories and glob patterns.
+
+    Directories are searched (non-recursively) for files
+    of supported image and video formats.
+
+    Args:
+        patterns: Sequence[str]
+            Image paths, directories or glob patterns.
+
+    Returns:
+        Sorted list of unique image paths.
+    """
+
+    extensions = {
+        ext.lstrip('*').lower()
+        for ext in (
+            consts.uiConsts["SupportedImageFormats"].split()
+            + consts.uiConsts["SupportedVideoFormats"].split()
+        )
+    }
+    images = set()
+    for pattern in patterns:
+        for match in glob.glob(pattern, recursive=True) or [pattern]:
+            path = Path(match)
+            if path.is_dir():
+                images.update(
+                    p for p in path.iterdir()
+                    if p.is_file() and p.suffix.lower() in extensions
+                )
+            elif path.is_file():
+                images.add(path)
+    return sorted(images)
+
+
+def compute_output_paths(images: Sequence[Path], output_dir: Optional[Path],
+                         extension: str) -> List[Path]:
+    """
+    Computes unique output paths of images.
+
+    Output file is named after the image without its extension
+    (lenna.png -> lenna.txt) and placed in output_dir or next to the image.
+    Images, which would share an output path (x.png and x.jpg),
+    keep their full file name (x.png.txt). Images of the same name
+    from different directories (a/p.png and b/p.png with output_dir)
+    are placed in subdirectories of output_dir mirroring their directories
+    relative to the common parent (a/p.png.txt and b/p.png.txt).
+
+    Args:
+        images: Sequence[Path]
+            Unique image paths.
+        output_dir: Path or None
+            Directory for output files (None places outputs next to images).
+        extension: str
+            Output file extension.
+
+    Returns:
+        Output paths in the order of images.
+
+    Raises:
+        ValueError: If output paths still collide.
+    """
+
+    outputs = [(output_dir or src.parent) / f"{src.stem}{extension}" for src in images]
+    for indices in _group_collisions(outputs):
+        for index in indices:
+            outputs[index] = outputs[index].with_name(f"{images[index].name}{extension}")
+    for indices in _group_collisions(outputs):
+        parents = [images[index].resolve().parent for index in indices]
+        common = Path(os.path.commonpath(parents))
+        for index, parent in zip(indices, parents):
+            outputs[index] = outputs[index].parent / parent.relative_to(common) / outputs[index].name
+    for indices in _group_collisions(outputs):
+        raise ValueError(
+            f"Output path {outputs[indices[0]]} collides for images: "
+            + ", ".join(str(images[index]) for index in indices)
+        )
+    return outputs
+
+
+def _group_collisions(paths: Sequence[Path]) -> List[List[int]]:
+    """
+    Helper function for finding paths used more than once.
+
+    Args:
+        paths: Sequence[Path]
+            Output paths.
+
+    Returns:
+        Indices of every group of equal paths.
+    """
+
+    groups = defaultdict(list)
+    for index, path in enumerate(paths):
+        groups[path].append(index)
+    return [indices for indices in groups.values() if len(indices) > 1]
+
+
+def convert_image(src: Path, dst: Path,
+                  contrast: bool, negative: bool,
+                  sharpen: bool, emboss: bool,
+                  grayscale: str, export_format: str = "txt") -> Tuple[int, int]:
+    """
+    Converts image file to ASCII art file in full image size.
+
+    Used by worker processes of the batch conversion.
+
+    Args:
+        src: Path
+            Path to image file.
+        dst: Path
+            Path to output text file.
+        contrast: bool
+            Image's contrast flag.
+        negative: bool
+            Image's negative flag.
+        sharpen: bool
+            Image's sharpen flag.
+        emboss: bool
+            Image's emboss flag.
+        grayscale: str
+            Image's grayscale level.
+        export_format: str
+            Output format (one of EXPORT_EXTENSIONS keys).
+
+    Returns:
+        A pair of input file size and written ASCII art size (in bytes).
+    """
+
+    image = open_image(
+        src.stem, str(src),
+        contrast, negative,
+        sharpen, emboss,
+        grayscale
+    )
+    if not isinstance(image, FrameSequence):
+        # frames are converted while streaming, an up-front pass would decode them twice
+        image.convert_to_ascii_art()
+    return src.stat().st_size, export_ascii_art(image, str(dst), export_format)
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    """
+    Parses command line arguments of the batch conversion.
+
+    Args:
+        argv: Sequence[str] or None
+            Command line arguments (sys.argv is used if None).
+
+    Returns:
+        Parsed arguments.
+    """
+
+    parser = argparse.ArgumentParser(
+        prog="python -m src.cli",
+        description="Converts images to ASCII art files without GUI."
+    )
+    parser.add_argument(
+        "inputs", nargs='+',
+        help="image paths, directories or glob patterns"
+    )
+    parser.add_argument(
+        "-o", "--output-dir", type=Path,
+        help="directory for output files (default: next to each image)"
+    )
+    parser.add_argument(
+        "-f", "--format", choices=EXPORT_EXTENSIONS, default="txt",
+        help="output format: plain text, gzip-compressed text or HTML (default: txt)"
+    )
+    parser.add_argument("--contrast", action="store_true", help="apply contrast effect")
+    parser.add_argument("--negative", action="store_true", help="apply negative effect")
+    parser.add_argument("--sharpen", action="store_true", help="apply sharpen effect")
+    parser.add_argument("--emboss", action="store_true", help="apply emboss effect")
+    parser.add_argument(
+        "-g", "--grayscale", default="",
+        help="symbols from darkest to lightest (default grayscale level if empty)"
+    )
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=os.cpu_count(),
+        help="number of worker processes (default: number of cores)"
+    )
+    parser.add_argument(
+        "--profile", metavar="PATH",
+        help="collect per-stage timing and write it as JSON to PATH ('-' for stderr)"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Batch conversion entry point.
+
+    Converts all given images in a process pool
+    and reports the throughput.
+    With --profile, per-stage stats of all worker processes
+    are merged and written as JSON.
+
+    Args:
+        argv: Sequence[str] or None
+            Command line arguments (sys.argv is used if None).
+
+    Returns:
+        Exit code (number of failed images is nonzero).
+    """
+
+    args = parse_args(argv)
+    images = collect_images(args.inputs)
+    if not images:
+        print("No images found.", file=sys.stderr)
+        return 1
+    try:
+        outputs = compute_output_paths(images, args.output_dir, EXPORT_EXTENSIONS[args.format])
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+    for dst in outputs:
+        dst.parent.mkdir(parents=True, exist_ok=True)
+
+    failed = 0
+    converted = 0
+    total_bytes = 0
+    start = time.perf_counter()
+    if args.profile:
+        instrumentation.reset()
+    with ProcessPoolExecutor(max_workers=max(1, args.jobs)) as executor:
+        futures = {
+            executor.submit(
+                *((call_with_stats, convert_image) if args.profile else (convert_image,)),
+                src, dst,
+                args.contrast, args.negative,
+                args.sharpen, args.emboss,
+                args.grayscale, args.format
+            ): src for src, dst in zip(images, outputs)
+        }
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+                if args.profile:
+                    result, stats = result
+                    instrumentation.merge(stats)
+                src_size, _ = result
+            except Exception as e:
+                failed += 1
+                print(f"{futures[future]}: {e}", file=sys.stderr)
+            else:
+                converted += 1
+                total_bytes += src_size
+    elapsed = max(time.perf_counter() - start, 1e-9)
+
+    print(
+        f"Converted {converted} of {len(images)} images "
+        f"({total_bytes / 1e6:.1f} MB) in {elapsed:.2f} s: "
+        f"{converted / elapsed:.2f} images/s, "
+        f"{total_bytes / 1e6 / elapsed:.2f} MB/s"
+    )
+    if args.profile:
+        instrumentation.dump(args.profile)
+    return 1 if failed else 0
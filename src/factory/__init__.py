@@ -1 +1,19 @@
-from .art_factory import ArtFactory
+"""
+Image containers.
+
+ArtList is a plain (Qt-free) container, ArtFactory is its Qt list model
+adapter, which imports PySide2 on first access.
+"""
+from importlib import import_module
+
+from .art_list import ArtList
+
+__all__ = ["ArtList", "ArtFactory"]
+
+
+def __getattr__(name: str):
+    if name != "ArtFactory":
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = import_module(".art_factory", __name__).ArtFactory
+    globals()[name] = value
+    return value
@@ -1,20 +1,20 @@
 from __future__ import annotations
 
 import os
-from typing import List, Dict, Final, Iterator
+from typing import Dict, Final, Iterable, Iterator
 
 from PySide2.QtCore import Qt, QAbstractListModel, QModelIndex
 
-from src.image import Image
+from src.image import FrameSequence, Image
+from .art_list import ArtList
 
 
 class ArtFactory(QAbstractListModel):
     """
     Image controller.
 
-    This is a general factory class for images.
-    Stores and controls all loaded images (add, update, remove, count etc.).
-    Manages the connection between main program logic, loaded images and GUI.
+    Qt adapter of ArtList: exposes all loaded images to GUI
+    and notifies it about every change (add, update, remove etc.).
     Inherits QAbstractListModel class for connection with GUI.
 
     Attributes:
@@ -22,32 +22,44 @@ class ArtFactory(QAbstractListModel):
             Private constant for defining a name of the image.
         __IMAGE_ROLE: Final[int]
             Private constant for defining a path of the image.
-        __arts: List[Image]
+        arts: ArtList
             All loaded images.
-        loaded_image: Image or None
-            Currently adding (but not added yet) image.
     """
 
     __NAME_ROLE: Final[int]
     __IMAGE_ROLE: Final[int]
-    __arts: List[Image]
-    loaded_image: Image or None
+    arts: ArtList
 
-    def __init__(self) -> None:
-        """Factory initialization."""
+    def __init__(self, arts: ArtList or None = None) -> None:
+        """
+        Factory initialization.
+
+        Args:
+            arts: ArtList or None
+                Images to be shown (new empty list if None).
+        """
 
         super().__init__()
         self.__NAME_ROLE = Qt.DisplayRole
         self.__IMAGE_ROLE = Qt.DecorationRole
-        self.__arts = []
-        self.loaded_image = None
+        self.arts = ArtList() if arts is None else arts
 
-    def __add__(self, new_image: Image) -> ArtFactory:
+    @property
+    def loaded_image(self) -> Image or FrameSequence or None:
+        """Currently adding (but not added yet) image."""
+
+        return self.arts.loaded_image
+
+    @loaded_image.setter
+    def loaded_image(self, image: Image or FrameSequence or None) -> None:
+        self.arts.loaded_image = image
+
+    def __add__(self, new_image: Image or FrameSequence) -> ArtFactory:
         """
         x.__add__(y) <==> x += y
 
         Args:
-            new_image: Image
+            new_image: Image or FrameSequence
                 Image to be added.
 
         Returns:
@@ -55,18 +67,18 @@ class ArtFactory(QAbstractListModel):
         """
 
         self.beginInsertRows(QModelIndex(), 0, 0)
-        self.__arts.insert(0, new_image)
+        self.arts += new_image
         self.endInsertRows()
         return self
 
-    def __setitem__(self, index: int, image: Image) -> None:
+    def __setitem__(self, index: int, image: Image or FrameSequence) -> None:
         """
         x.__setitem_(y, z) <==> x[y] = z
 
         Args:
             index: int
                 Image index.
-            image: Image
+            image: Image or FrameSequence
                 Updated image.
 
         Returns:
@@ -74,10 +86,10 @@ class ArtFactory(QAbstractListModel):
         """
 
         row = self.index(index)
-        self.__arts[index] = image
+        self.arts[index] = image
         self.dataChanged.emit(row, row, self.roleNames())
 
-    def __getitem__(self, index: int) -> Image:
+    def __getitem__(self, index: int) -> Image or FrameSequence:
         """
         x.__getitem__(y) <==> x[y]
 
@@ -89,7 +101,7 @@ class ArtFactory(QAbstractListModel):
             Image at the given index.
         """
 
-        return self.__arts[index]
+        return self.arts[index]
 
     def __delitem__(self, index: int) -> None:
         """
@@ -103,10 +115,26 @@ class ArtFactory(QAbstractListModel):
             None.
         """
 
-        self.beginRemoveColumns(QModelIndex(), index, index)
-        del self.__arts[index]
+        self.beginRemoveRows(QModelIndex(), index, index)
+        del self.arts[index]
         self.endRemoveRows()
 
+    def reset(self, images: Iterable[Image or FrameSequence]) -> None:
+        """
+        Replaces all loaded images (e.g. by images of opened session).
+
+        Args:
+            images: Iterable[Image or FrameSequence]
+                New images.
+
+        Returns:
+            None.
+        """
+
+        self.beginResetModel()
+        self.arts.reset(images)
+        self.endResetModel()
+
     def __len__(self) -> int:
         """
         x.__len__() <==> len(x)
@@ -115,9 +143,9 @@ class ArtFactory(QAbstractListModel):
             Total number of added images.
         """
 
-        return len(self.__arts)
+        return len(self.arts)
 
-    def __iter__(self) -> Iterator[Image]:
+    def __iter__(self) -> Iterator[Image or FrameSequence]:
         """
         x.__iter__() <==> iter(x)
 
@@ -125,7 +153,7 @@ class ArtFactory(QAbstractListModel):
             Iterator for all the added images.
         """
 
-        return iter(self.__arts)
+        return iter(self.arts)
 
     def __contains__(self, index: int) -> bool:
         """
@@ -139,7 +167,33 @@ class ArtFactory(QAbstractListModel):
             If image exists at the given index.
         """
 
-        return len(self.__arts) > index
+        return index in self.arts
+
+    def is_animatable(self) -> bool:
+        """
+        Returns:
+            If there are at least 2 images or an image with multiple frames.
+        """
+
+        return self.arts.is_animatable()
+
+    def get_memory_usage(self) -> int:
+        """
+        Returns:
+            Total size of image data held by all the added images (in bytes).
+        """
+
+        return self.arts.get_memory_usage()
+
+    @staticmethod
+    def get_render_cache_stats() -> Dict[str, int]:
+        """
+        Returns:
+            Hits, misses, number of entries and size (in bytes)
+            of rendered outputs of all images in render cache.
+        """
+
+        return ArtList.get_render_cache_stats()
 
     def data(self, index, role=Qt.DisplayRole) -> str:
         """
@@ -157,8 +211,8 @@ class ArtFactory(QAbstractListModel):
 
         row = index.row()
         return {
-            self.__NAME_ROLE: self.__arts[row].name,
-            self.__IMAGE_ROLE: f"file:{os.sep}{self.__arts[row].path}"
+            self.__NAME_ROLE: self.arts[row].name,
+            self.__IMAGE_ROLE: f"file:{os.sep}{self.arts[row].path}"
         }[role]
 
     def rowCount(self, parent=QModelIndex()) -> int:
@@ -173,7 +227,7 @@ class ArtFactory(QAbstractListModel):
             Number of rows under the given parent.
         """
 
-        return len(self.__arts)
+        return len(self.arts)
 
     def roleNames(self) -> Dict[int, bytes]:
         """
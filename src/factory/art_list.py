@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List
+
+if TYPE_CHECKING:
+    from src.image import FrameSequence, Image
+
+
+class ArtList:
+    """
+    Plain container of loaded images.
+
+    Stores and controls all loaded images (add, update, remove, count etc.)
+    without any GUI dependency, so it can be used from scripts
+    and headless tools. The GUI wraps it in ArtFactory.
+    Rendered outputs of images, which leave the list
+    (removed, replaced or dropped previews), are released from render cache.
+
+    Attributes:
+        __arts: List[Image or FrameSequence]
+            All loaded images (the most recently added first).
+        __loaded_image: Image or FrameSequence or None
+            Currently adding (but not added yet) image.
+    """
+
+    __arts: List[Image or FrameSequence]
+    __loaded_image: Image or FrameSequence or None
+
+    def __init__(self, images: Iterable[Image or FrameSequence] = ()) -> None:
+        """
+        List initialization.
+
+        Args:
+            images: Iterable[Image or FrameSequence]
+                Initial images.
+        """
+
+        self.__arts = list(images)
+        self.__loaded_image = None
+
+    @property
+    def loaded_image(self) -> Image or FrameSequence or None:
+        """Currently adding (but not added yet) image."""
+
+        return self.__loaded_image
+
+    @loaded_image.setter
+    def loaded_image(self, image: Image or FrameSequence or None) -> None:
+        previous = self.__loaded_image
+        self.__loaded_image = image
+        if previous is not None:
+            self.__release([previous])
+
+    def __add__(self, new_image: Image or FrameSequence) -> ArtList:
+        """
+        x.__add__(y) <==> x += y
+
+        Args:
+            new_image: Image or FrameSequence
+                Image to be added (at the beginning of the list).
+
+        Returns:
+            ArtList instance.
+        """
+
+        self.__arts.insert(0, new_image)
+        return self
+
+    def __setitem__(self, index: int, image: Image or FrameSequence) -> None:
+        """
+        x.__setitem_(y, z) <==> x[y] = z
+
+        Args:
+            index: int
+                Image index.
+            image: Image or FrameSequence
+                Updated image.
+
+        Returns:
+            None.
+        """
+
+        previous = self.__arts[index]
+        self.__arts[index] = image
+        self.__release([previous])
+
+    def __getitem__(self, index: int) -> Image or FrameSequence:
+        """
+        x.__getitem__(y) <==> x[y]
+
+        Args:
+            index: int
+                Index of the image to get.
+
+        Returns:
+            Image at the given index.
+        """
+
+        return self.__arts[index]
+
+    def __delitem__(self, index: int) -> None:
+        """
+        x.__delitem__(y) <==> del x[y]
+
+        Args:
+            index: int
+                Index of the image to remove.
+
+        Returns:
+            None.
+        """
+
+        previous = self.__arts[index]
+        del self.__arts[index]
+        self.__release([previous])
+
+    def reset(self, images: Iterable[Image or FrameSequence]) -> None:
+        """
+        Replaces all loaded images (e.g. by images of opened session).
+
+        Args:
+            images: Iterable[Image or FrameSequence]
+                New images.
+
+        Returns:
+            None.
+        """
+
+        previous = self.__arts
+        self.__arts = list(images)
+        self.__release(previous)
+
+    def __len__(self) -> int:
+        """
+        x.__len__() <==> len(x)
+
+        Returns:
+            Total number of added images.
+        """
+
+        return len(self.__arts)
+
+    def __iter__(self) -> Iterator[Image or FrameSequence]:
+        """
+        x.__iter__() <==> iter(x)
+
+        Returns:
+            Iterator for all the added images.
+        """
+
+        return iter(self.__arts)
+
+    def __contains__(self, index: int) -> bool:
+        """
+        if x.__contains__(y) <==> if y in x
+
+        Args:
+            index: int
+                Index to check.
+
+        Returns:
+            If image exists at the given index.
+        """
+
+        return len(self.__arts) > index
+
+    def is_animatable(self) -> bool:
+        """
+        Returns:
+            If there are at least 2 images or an image with multiple frames.
+        """
+
+        from src.image import FrameSequence
+        return len(self.__arts) > 1 or any(
+            isinstance(image, FrameSequence) for image in self.__arts
+        )
+
+    def get_memory_usage(self) -> int:
+        """
+        Returns:
+            Total size of image data held by all the added images (in bytes).
+        """
+
+        return sum(image.get_memory_usage() for image in self.__arts)
+
+    @staticmethod
+    def get_render_cache_stats() -> Dict[str, int]:
+        """
+        Returns:
+            Hits, misses, number of entries and size (in bytes)
+            of rendered outputs of all images in render cache.
+        """
+
+        from src.image.render_cache import render_cache
+        return render_cache.get_stats()
+
+    def __release(self, images: Iterable[Image or FrameSequence]) -> None:
+        """
+        Releases rendered outputs of images, which are no longer
+        in the list nor loaded.
+
+        Args:
+            images: Iterable[Image or FrameSequence]
+                Images, which left the list.
+
+        Returns:
+            None.
+        """
+
+        kept = {id(image) for image in self.__arts}
+        kept.add(id(self.__loaded_image))
+        for image in images:
+            if id(image) not in kept:
+                image.release_render_cache()
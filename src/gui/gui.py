@@ -1,21 +1,24 @@
 from __future__ import annotations
 import os
 import sys
-import time
-from pathlib import Path
-from threading import Thread, Event
-from typing import Callable, Tuple
+from typing import Callable, Dict, Tuple
 
-from PySide2.QtCore import Qt, QObject, Slot, Signal
+from PySide2.QtCore import Qt, QObject, QTimer, Slot, Signal
 from PySide2.QtGui import QFontMetrics
 from PySide2.QtQml import QQmlApplicationEngine, QQmlProperty
 from PySide2.QtQuickControls2 import QQuickStyle
 from PySide2.QtWidgets import QApplication, QFileDialog
 
 from src.factory import ArtFactory
-from src.image import Image
+from src.image import FrameSequence, Image, open_image
+from src.image.export import EXPORT_EXTENSIONS, export_ascii_art
+from src.image.session import SESSION_EXTENSION
+from src.util.animation import AnimationPlayer, FrameCache
 from src.util.consts import uiConsts
+from src.util.instrumentation import PROFILE_ENV, instrumentation
+from src.util.scheduler import ConversionScheduler
 from . import res
+from .preview_provider import PreviewImageProvider
 
 
 class Gui(QObject):
@@ -34,13 +37,20 @@ class Gui(QObject):
         __image_thread_signal: Signal[int]
             Qt signal.
             Activates if image is processed in background thread.
-        __animation_thread_signal: Signal[int]
+        __scheduler: ConversionScheduler
+            Runs image conversions in background threads.
+        __animation_thread_signal: Signal[int, str]
             Qt signal.
             Activates if animation background thread changes current image.
-        __animation_thread: Thread
-            Animation background thread.
-        __animation_stop_event: Event
-            Animation background thread stop event.
+        __animation_player: AnimationPlayer or None
+            Plays pre-rendered animation frames in background threads.
+        __art_rendered_signal: Signal[int, int, int, str]
+            Qt signal.
+            Activates if full ASCII art is rendered in background thread.
+        __draw_timer: QTimer
+            Single-shot timer, restarted by every art size change,
+            which starts full ASCII art rendering (in GUI thread)
+            once art size stops changing.
 
         __app: QApplication
             Holds Qt application instance for GUI.
@@ -48,6 +58,8 @@ class Gui(QObject):
             Holds Qt GUI properties and user interaction logic with __app.
         __open_file_dialog: QFileDialog
             File browser for choosing path to image.
+        __preview_provider: PreviewImageProvider
+            Serves processed images to QML from memory.
         __root: QObject
             Root container of main window.
         __settings: QObject
@@ -80,17 +92,24 @@ class Gui(QObject):
             Activates if image is removed.
         on_apply_grayscale: Callable[[Gui, str], None]
             Activates if grayscale level is updated for all images.
+        on_open_session: Callable[[Gui, str], None]
+            Activates if session file is chosen to be opened.
+        on_save_session: Callable[[Gui, str], None]
+            Activates if session file is chosen to be saved.
     """
 
     art_factory: ArtFactory
     __image_thread_signal: Signal(int) = Signal(int)
-    __animation_thread_signal: Signal(int) = Signal(int)
-    __animation_thread: Thread
-    __animation_stop_event: Event
+    __scheduler: ConversionScheduler
+    __animation_thread_signal: Signal(int, str) = Signal(int, str)
+    __animation_player: AnimationPlayer or None
+    __art_rendered_signal: Signal(int, int, int, str) = Signal(int, int, int, str)
+    __draw_timer: QTimer
 
     __app: QApplication
     __engine: QQmlApplicationEngine
     __open_file_dialog: QFileDialog
+    __preview_provider: PreviewImageProvider
     __root: QObject
     __settings: QObject
     __art_layout: QObject
@@ -107,16 +126,21 @@ class Gui(QObject):
     on_draw_art: Callable[[Gui, int], None]
     on_remove_art: Callable[[Gui, int], None]
     on_apply_grayscale: Callable[[Gui, str], None]
+    on_open_session: Callable[[Gui, str], None]
+    on_save_session: Callable[[Gui, str], None]
 
     def __init__(self, art_factory: ArtFactory) -> None:
         """Gui initialization."""
 
         super().__init__()
         self.art_factory = art_factory
+        self.__scheduler = ConversionScheduler()
         # noinspection PyUnresolvedReferences
         self.__image_thread_signal.connect(self.__on_image_processed)
         # noinspection PyUnresolvedReferences
-        self.__animation_thread_signal.connect(self.__art_list_change_index)
+        self.__animation_thread_signal.connect(self.__show_animation_frame)
+        # noinspection PyUnresolvedReferences
+        self.__art_rendered_signal.connect(self.__show_rendered_art)
 
         # Material desktop style
         os.environ["QT_QUICK_CONTROLS_MATERIAL_VARIANT"] = "Dense"
@@ -128,11 +152,18 @@ class Gui(QObject):
         self.__app.setOrganizationName(uiConsts["AuthorName"])
         self.__app.setOrganizationDomain(uiConsts["ProjectDomain"])
         self.__app.setWindowIcon(res.get_app_icon())
+        self.__draw_timer = QTimer(self)
+        self.__draw_timer.setSingleShot(True)
+        self.__draw_timer.setInterval(int(uiConsts["RenderDebounceDelay"] * 1000))
+        # noinspection PyUnresolvedReferences
+        self.__draw_timer.timeout.connect(self.__render_art_background)
 
         self.__engine = QQmlApplicationEngine()
         self.__engine.rootContext().setContextProperty("Consts", uiConsts)
         self.__engine.rootContext().setContextProperty("Gui", self)
         self.__engine.rootContext().setContextProperty("ArtFactory", self.art_factory)
+        self.__preview_provider = PreviewImageProvider()
+        self.__engine.addImageProvider("preview", self.__preview_provider)
         self.__engine.load(res.get_main_qml_path())
 
         if not self.__engine.rootObjects():
@@ -148,20 +179,26 @@ class Gui(QObject):
         self.image_dialog = self.__root.findChild(QObject, "imageDialog")
 
         self.__art_list.currentItemChanged.connect(self.__draw_art)
-        self.__init_animation_thread()
+        self.__art_layout.widthChanged.connect(self.__resize_art)
+        self.__art_layout.heightChanged.connect(self.__resize_art)
+        self.__animation_player = None
         self.__init_open_file_dialog()
 
     def __del__(self) -> None:
         """Gui destructor."""
 
-        Path(os.path.join(sys.path[0], "tmp.ppm")).unlink(True)
+        self.__draw_timer.stop()
+        self.__scheduler.shutdown()
         self.__stop_animation()
         # self.__art_list.currentItemChanged.disconnect(self.__draw_art)
         self.__app.quit()
 
     def process_image_background(self, index: int, image: Image) -> None:
         """
-        Creates a new background thread for image to ASCII art conversion.
+        Schedules image to ASCII art conversion in background thread.
+
+        Older pending conversions of the same index are cancelled
+        and only the newest conversion result is signaled.
 
         Args:
             index: int
@@ -174,36 +211,89 @@ class Gui(QObject):
             None.
         """
 
-        Thread(target=self.__image_thread_func, args=(index, image, self.__image_thread_signal)).start()
+        self.__scheduler.submit(
+            index,
+            image.convert_to_ascii_art,
+            lambda _: self.__image_thread_signal.emit(index)
+        )
+
+    def get_conversion_queue_depth(self) -> int:
+        """
+        Returns:
+            Number of image conversions waiting to be started.
+        """
+
+        return self.__scheduler.depth
+
+    def publish_preview(self, image: Image or FrameSequence) -> str:
+        """
+        Publishes processed image for previewing in QML.
+
+        Args:
+            image: Image
+                Converted image.
+
+        Returns:
+            URL of the preview served from memory.
+        """
+
+        return f"image://preview/{self.__preview_provider.publish('dialog', image.get_image_data())}"
 
     def compute_art_layout_size(self) -> Tuple[int, int]:
         """
         Computes the size of art_layout which prints ASCII art.
 
+        Art symbol size is taken from art_size_slider,
+        so a coarse render currently shown doesn't change the result.
+
         Returns:
             A pair of art_layout's width and height.
         """
 
         art_width = int(self.__get_property(self.__art_layout, "width").read())
         art_height = int(self.__get_property(self.__art_layout, "height").read())
-        fm = QFontMetrics(self.__get_property(self.__art_layout, "font").read())
+        font = self.__get_property(self.__art_layout, "font").read()
+        font.setPixelSize(int(self.__get_property(self.__art_size_slider, "value").read()))
+        fm = QFontMetrics(font)
         char_width = art_width // fm.averageCharWidth()
         char_height = art_height // fm.height()
         return char_width, char_height
 
-    def print_art(self, art: str) -> None:
+    def compute_max_art_size(self) -> Tuple[int, int]:
+        """
+        Computes the largest ASCII art size art_layout can show,
+        which is screen size with the smallest art symbol size.
+
+        Returns:
+            A pair of the largest ASCII art's width and height.
+        """
+
+        font = self.__get_property(self.__art_layout, "font").read()
+        font.setPixelSize(int(self.__get_property(self.__art_size_slider, "from").read()))
+        fm = QFontMetrics(font)
+        screen_size = self.__app.primaryScreen().size()
+        return screen_size.width() // fm.averageCharWidth(), screen_size.height() // fm.height()
+
+    def print_art(self, art: str, scale: int = 1) -> None:
         """
         Prints ASCII art in art_layout.
 
         Args:
             art: str
                 ASCII art.
+            scale: int
+                Art symbol size multiplier (coarse renders are printed
+                with scale times fewer rows and columns of larger symbols).
 
         Returns:
             None.
         """
 
-        self.__get_property(self.__art_layout, "text").write(art)
+        with instrumentation.stage("gui.print_art") as stage:
+            font_size = int(self.__get_property(self.__art_size_slider, "value").read()) * scale
+            self.__get_property(self.__art_layout, "font.pixelSize").write(font_size)
+            self.__get_property(self.__art_layout, "text").write(art)
+            stage.nbytes = len(art)
 
     def set_play_animation_button_enable(self, state: bool) -> None:
         """
@@ -231,11 +321,28 @@ class Gui(QObject):
         """
         Shows Gui.
 
+        Dumps instrumentation stats on exit if they are enabled
+        (to the path set in ASCII_ART_PROFILE environment variable or stderr).
+
         Returns:
             None.
         """
 
-        sys.exit(self.__app.exec_())
+        exit_code = self.__app.exec_()
+        if instrumentation.enabled:
+            instrumentation.dump(os.environ.get(PROFILE_ENV))
+        sys.exit(exit_code)
+
+    @staticmethod
+    def get_stats() -> Dict[str, Dict[str, float]]:
+        """
+        Returns:
+            Snapshot of instrumentation stats: stage name mapped to its
+            "calls", "seconds", "max_seconds" and "bytes"
+            (empty if instrumentation is disabled).
+        """
+
+        return instrumentation.snapshot()
 
     @Slot(int)
     def __open_image_dialog(self, index: int) -> None:
@@ -281,7 +388,7 @@ class Gui(QObject):
             None.
         """
 
-        self.on_preview_art(self, Image(
+        self.on_preview_art(self, open_image(
             name, path,
             contrast, negative,
             sharpen, emboss,
@@ -331,8 +438,92 @@ class Gui(QObject):
             None.
         """
 
+        if self.__is_animating():
+            return
         self.on_draw_art(self, self.get_current_art_list_index())
 
+    @Slot()
+    def __resize_art(self) -> None:
+        """
+        Qt slot for redrawing an art after art_layout or art symbol size changed.
+
+        Prints a coarse render (CoarseRenderScale times fewer rows
+        and columns) right away and schedules the full render,
+        once size changes settle, in background thread.
+
+        Returns:
+            None.
+        """
+
+        if self.__is_animating():
+            return
+        index = self.get_current_art_list_index()
+        if index == -1 or index not in self.art_factory:
+            return
+        scale = uiConsts["CoarseRenderScale"]
+        (char_width, char_height) = self.compute_art_layout_size()
+        with instrumentation.stage("gui.coarse_render"):
+            art = self.art_factory[index].get_ascii_art(
+                max(1, char_width // scale), max(1, char_height // scale)
+            )
+        self.print_art(art, scale)
+        if self.__draw_timer.isActive():
+            instrumentation.count("gui.render_superseded")
+        self.__draw_timer.start()
+
+    @Slot()
+    def __render_art_background(self) -> None:
+        """
+        Qt slot for rendering current art in full size in background thread.
+
+        Renders of superseded sizes are dropped by the scheduler
+        (only the newest render is delivered).
+
+        Returns:
+            None.
+        """
+
+        index = self.get_current_art_list_index()
+        if self.__is_animating() or index == -1 or index not in self.art_factory:
+            return
+        image = self.art_factory[index]
+        (char_width, char_height) = self.compute_art_layout_size()
+        signal = self.__art_rendered_signal
+        self.__scheduler.submit(
+            "draw",
+            lambda: image.get_ascii_art(char_width, char_height),
+            lambda art: signal.emit(index, char_width, char_height, art)
+        )
+
+    @Slot(int, int, int, str)
+    def __show_rendered_art(self, index: int,
+                            char_width: int, char_height: int, art: str) -> None:
+        """
+        Qt slot for swapping in full render of an art.
+
+        Render is dropped if another art is shown meanwhile
+        or art_layout size has changed.
+
+        Args:
+            index: int
+                Image's index in list.
+            char_width: int
+                Width of rendered ASCII art.
+            char_height: int
+                Height of rendered ASCII art.
+            art: str
+                Rendered ASCII art.
+
+        Returns:
+            None.
+        """
+
+        if self.__is_animating() or index != self.get_current_art_list_index() \
+                or (char_width, char_height) != self.compute_art_layout_size():
+            instrumentation.count("gui.render_dropped")
+            return
+        self.print_art(art)
+
     @Slot(int)
     def __remove_art(self, index: int) -> None:
         """
@@ -392,8 +583,8 @@ class Gui(QObject):
         self.__get_property(self.__art_size_slider, "enabled").write(False)
         self.__get_property(self.__play_anim_button, "enabled").write(False)
         self.__get_property(self.__stop_anim_Button, "enabled").write(True)
-        self.__init_animation_thread()
-        self.__animation_thread.start()
+        self.__init_animation_player()
+        self.__animation_player.start()
 
     @Slot()
     def __stop_animation(self) -> None:
@@ -404,9 +595,8 @@ class Gui(QObject):
             None.
         """
 
-        if self.__animation_thread and self.__animation_thread.is_alive():
-            self.__animation_stop_event.set()
-            self.__animation_thread.join()
+        if self.__is_animating():
+            self.__animation_player.stop()
             self.__get_property(self.__art_size_slider, "enabled").write(True)
             self.__get_property(self.__play_anim_button, "enabled").write(True)
             self.__get_property(self.__stop_anim_Button, "enabled").write(False)
@@ -414,8 +604,8 @@ class Gui(QObject):
     @Slot(int)
     def __export_art(self, index: int) -> None:
         """
-        Qt slot for opening file dialog to choose text file's path
-        to export ASCII art into.
+        Qt slot for opening file dialog to choose file's path
+        to export ASCII art into (as plain text, gzip-compressed text or HTML).
 
         Args:
             index: int
@@ -425,103 +615,136 @@ class Gui(QObject):
             None.
         """
 
-        files = QFileDialog.getSaveFileName(caption="Save art", filter="Text files (*.txt)")
+        export_filters = {
+            "Text files (*.txt)": "txt",
+            "Gzip-compressed text files (*.txt.gz)": "gz",
+            "HTML files (*.html)": "html"
+        }
+        files = QFileDialog.getSaveFileName(caption="Save art", filter=";;".join(export_filters))
         if files and files[0]:
-            with open(files[0], "wt") as f:
-                f.write(str(self.art_factory[index]))
+            export_format = export_filters.get(files[1], "txt")
+            path = files[0]
+            if not path.lower().endswith(EXPORT_EXTENSIONS[export_format]):
+                path += EXPORT_EXTENSIONS[export_format]
+            export_ascii_art(self.art_factory[index], path, export_format)
 
-    @Slot(int)
-    def __art_list_change_index(self, index: int) -> None:
+    @Slot()
+    def __open_session(self) -> None:
         """
-        Qt slot for changing currently drawn ASCII art.
-
-        Args:
-            index: int
-                Image's index in list.
-                Should be -1 for clearing art_layout.
+        Qt slot for opening file dialog to choose session file to open.
 
         Returns:
             None.
         """
 
-        self.__get_property(self.__art_list, "currentIndex").write(index)
-
-    def __init_open_file_dialog(self) -> None:
-        """open_file_dialog initialization."""
+        files = QFileDialog.getOpenFileName(
+            caption=uiConsts["OpenSessionText"], filter=uiConsts["SessionFilesFilter"]
+        )
+        if files and files[0]:
+            self.on_open_session(self, files[0])
 
-        self.__open_file_dialog = QFileDialog()
-        self.__open_file_dialog.setWindowTitle("Open image")
-        self.__open_file_dialog.setFileMode(QFileDialog.ExistingFile)
-        self.__open_file_dialog.setNameFilter(f"Images ({uiConsts['SupportedImageFormats']})")
+    @Slot()
+    def __save_session(self) -> None:
+        """
+        Qt slot for opening file dialog to choose session file's path
+        to save all images into.
 
-    def __init_animation_thread(self) -> None:
-        """animation_thread initialization."""
+        Returns:
+            None.
+        """
 
-        duration = float(self.__get_property(self.__settings, "animationDuration").read())
-        self.__animation_stop_event = Event()
-        self.__animation_thread = Thread(
-            target=self.__animation_thread_func,
-            args=(
-                len(self.art_factory), duration,
-                self.__animation_thread_signal, self.__animation_stop_event
-            )
+        files = QFileDialog.getSaveFileName(
+            caption=uiConsts["SaveSessionText"], filter=uiConsts["SessionFilesFilter"]
         )
+        if files and files[0]:
+            path = files[0]
+            if not path.lower().endswith(SESSION_EXTENSION):
+                path += SESSION_EXTENSION
+            self.on_save_session(self, path)
 
-    @staticmethod
-    def __animation_thread_func(factory_size: int,
-                                duration: float,
-                                signal: Signal(int),
-                                stop_event: Event) -> None:
+    @Slot(int, str)
+    def __show_animation_frame(self, index: int, art: str) -> None:
         """
-        Function used in animation background thread.
-
-        Sends each index of loaded images to signal
-        with duration delay.
+        Qt slot for showing pre-rendered animation frame.
 
         Args:
-            factory_size: int
-                Loaded images count.
-            duration: float
-                Delay between animation frames (in seconds).
-            signal: Signal[int]
-                Qt signal accepting image index when it needs to be drawn.
-            stop_event: Event
-                Event for thread killing.
+            index: int
+                Image's index in list.
+            art: str
+                Pre-rendered ASCII art of the image.
 
         Returns:
             None.
         """
 
-        while True:
-            for i in range(factory_size - 1, -1, -1):
-                if stop_event.is_set():
-                    return
-                signal.emit(i)
-                time.sleep(duration)
+        if not self.__is_animating():
+            return
+        self.__get_property(self.__art_list, "currentIndex").write(index)
+        self.print_art(art)
 
-    @staticmethod
-    def __image_thread_func(index: int, image: Image,
-                            signal: Signal(int)) -> None:
+    def get_animation_fps(self) -> float:
+        """
+        Returns:
+            Frames per second achieved by the last (or current) animation.
         """
-        Function used in image converting background thread.
 
-        Sends converted image index to signal.
-
-        Args:
-            index: int
-                Image's index in list.
-                If image is not added to list yet, index should be set to -1.
-            image: Image
-                Image to convert.
-            signal: Signal[int]
-                Qt signal accepting converted image index.
+        return self.__animation_player.fps if self.__animation_player else 0.0
 
+    def __is_animating(self) -> bool:
+        """
         Returns:
-            None.
+            If animation is playing.
         """
 
-        image.convert_to_ascii_art()
-        signal.emit(index)
+        return self.__animation_player is not None and self.__animation_player.is_alive()
+
+    def __init_open_file_dialog(self) -> None:
+        """open_file_dialog initialization."""
+
+        self.__open_file_dialog = QFileDialog()
+        self.__open_file_dialog.setWindowTitle("Open image")
+        self.__open_file_dialog.setFileMode(QFileDialog.ExistingFile)
+        self.__open_file_dialog.setNameFilters([
+            f"Images ({uiConsts['SupportedImageFormats']})",
+            f"Videos ({uiConsts['SupportedVideoFormats']})"
+        ])
+
+    def __init_animation_player(self) -> None:
+        """
+        animation_player initialization.
+
+        Frames of current image are played if it has multiple frames
+        (at its own frame rate if defined),
+        otherwise images are played from the oldest to the newest.
+        Frames are pre-rendered in art_layout's current size.
+        """
+
+        duration = float(self.__get_property(self.__settings, "animationDuration").read())
+        (char_width, char_height) = self.compute_art_layout_size()
+        signal = self.__animation_thread_signal
+        index = self.get_current_art_list_index()
+        if index != -1 and index in self.art_factory \
+                and isinstance(self.art_factory[index], FrameSequence):
+            frames = self.art_factory[index]
+            self.__animation_player = AnimationPlayer(
+                FrameCache(
+                    len(frames),
+                    lambda position: frames[position].get_ascii_art(char_width, char_height)
+                ),
+                frames.get_frame_duration() or duration,
+                lambda _, art: signal.emit(index, art)
+            )
+            return
+        arts = list(self.art_factory)
+        frame_count = len(arts)
+        self.__animation_player = AnimationPlayer(
+            FrameCache(
+                frame_count,
+                lambda position: arts[frame_count - 1 - position].get_ascii_art(char_width, char_height)
+            ),
+            duration,
+            lambda position, art: signal.emit(frame_count - 1 - position, art)
+        )
 
     @staticmethod
     def __get_property(element: QObject, prop: str) -> QQmlProperty:
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+from itertools import count
+from threading import Lock
+from typing import Dict, Final, Iterator, List
+
+import numpy as np
+from PySide2.QtCore import QSize
+from PySide2.QtGui import QImage
+from PySide2.QtQuick import QQuickImageProvider
+
+from src.image.image import compute_resample_indices
+
+
+class PreviewImageProvider(QQuickImageProvider):
+    """
+    Qt image provider serving processed images from memory.
+
+    QML requests images by "image://<provider name>/<key>/<version>" URLs
+    (version makes every published image a new URL).
+    Image data is wrapped in QImage without copying if it fits
+    the requested size, otherwise it's downscaled first.
+
+    Attributes:
+        __SERVED_HISTORY: Final[int]
+            Private constant for defining how many served images are kept alive.
+        __images: Dict[str, np.ndarray]
+            Published image data by key.
+        __served: List[np.ndarray]
+            Recently served image data, kept alive while QML
+            may still reference their buffers.
+        __versions: Iterator[int]
+            Published images counter.
+        __lock: Lock
+            Guards published images (QML requests images in its own thread).
+    """
+
+    __SERVED_HISTORY: Final[int]
+    __images: Dict[str, np.ndarray]
+    __served: List[np.ndarray]
+    __versions: Iterator[int]
+    __lock: Lock
+
+    def __init__(self) -> None:
+        """Provider initialization."""
+
+        super().__init__(QQuickImageProvider.Image)
+        self.__SERVED_HISTORY = 4
+        self.__images = {}
+        self.__served = []
+        self.__versions = count()
+        self.__lock = Lock()
+
+    def publish(self, key: str, data: np.ndarray) -> str:
+        """
+        Publishes grayscale image data.
+
+        Args:
+            key: str
+                Image key.
+            data: np.ndarray
+                2D grayscale image data (uint8).
+
+        Returns:
+            Image path relative to the provider
+            (to be prefixed by "image://<provider name>/").
+        """
+
+        with self.__lock:
+            self.__images[key] = np.ascontiguousarray(data)
+            return f"{key}/{next(self.__versions)}"
+
+    def requestImage(self, image_id: str, size: QSize, requested_size: QSize) -> QImage:
+        """
+        Redefined method from QQuickImageProvider.
+
+        Args:
+            image_id: str
+                Requested image path.
+            size: QSize
+                Original size of the image (set by provider).
+            requested_size: QSize
+                Size requested by QML (sourceSize).
+
+        Returns:
+            Image, downscaled to fit in requested size.
+        """
+
+        with self.__lock:
+            data = self.__images.get(image_id.split('/')[0])
+        if data is None:
+            return QImage()
+        height, width = data.shape
+        size.setWidth(width)
+        size.setHeight(height)
+
+        scale = 1.0
+        if requested_size.width() > 0:
+            scale = min(scale, requested_size.width() / width)
+        if requested_size.height() > 0:
+            scale = min(scale, requested_size.height() / height)
+        if scale < 1.0:
+            rows, cols = compute_resample_indices(
+                data.shape, (max(1, int(height * scale)), max(1, int(width * scale)))
+            )
+            data = data[rows, cols]
+
+        with self.__lock:
+            self.__served = (self.__served + [data])[-self.__SERVED_HISTORY:]
+        return QImage(
+            data.data, data.shape[1], data.shape[0],
+            data.strides[0], QImage.Format_Grayscale8
+        )
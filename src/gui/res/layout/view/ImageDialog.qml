@@ -24,6 +24,8 @@ Dialog {
             Layout.preferredWidth: parent.parent.width * Consts.ImageDialogImageWidthCoefficient
             Layout.fillHeight: true
             fillMode: Image.PreserveAspectFit
+            sourceSize.width: width
+            sourceSize.height: height
             cache: false
         }
         ColumnLayout {
@@ -34,10 +34,7 @@ ToolBar {
             stepSize: 1
             to: 25
             value: Consts.DefaultArtSize
-            onMoved: {
-                artLayout.font.pixelSize = value
-                Gui.__draw_art()
-            }
+            onMoved: Gui.__resize_art()
 
             ToolTip {
                 parent: artSizeSlider.handle
@@ -76,6 +73,20 @@ ToolBar {
                 topPadding: 0
                 bottomPadding: 0
 
+                Action {
+                    text: Consts.OpenSessionText
+                    onTriggered: {
+                        Gui.__stop_animation()
+                        Gui.__open_session()
+                    }
+                }
+                Action {
+                    text: Consts.SaveSessionText
+                    onTriggered: {
+                        Gui.__stop_animation()
+                        Gui.__save_session()
+                    }
+                }
                 Action {
                     text: Consts.SettingsText
                     onTriggered: {
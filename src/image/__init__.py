@@ -1 +1,23 @@
-from .image import Image
+"""
+Conversion core.
+
+Submodules (and NumPy) are imported on first access of their names,
+so importing this package stays cheap.
+"""
+from importlib import import_module
+
+_LAZY_NAMES = {
+    "Image": ".image",
+    "FrameSequence": ".frames",
+    "open_image": ".frames"
+}
+
+__all__ = list(_LAZY_NAMES)
+
+
+def __getattr__(name: str):
+    if name not in _LAZY_NAMES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_LAZY_NAMES[name], __name__), name)
+    globals()[name] = value
+    return value
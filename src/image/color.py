@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import html
+from typing import Dict, List
+
+import numpy as np
+
+from .text import decode_ascii_art
+
+COLOR_FORMATS: Dict[str, str] = {
+    "ansi": "ANSI 24-bit color escape sequences",
+    "html": "HTML <span> elements"
+}
+"""Supported color ASCII art formats."""
+
+ANSI_RESET = "\x1b[0m"
+"""Resets terminal colors at the end of every row."""
+
+
+def compute_cell_colors(data: np.ndarray, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+    """
+    Computes mean color of every ASCII art cell.
+
+    Cells are the blocks between consecutive resampling indices
+    (see compute_resample_indices), so every cell covers
+    the pixels of its glyph. Blocks are summed like in area downsampling:
+    rows of every row of cells are reduced into a single row
+    (with buffered casting, so no widened copy of image data is made),
+    then the columns of all cells are reduced at once.
+
+    Args:
+        data: np.ndarray
+            Image data (uint8, grayscale or RGB).
+        rows: np.ndarray
+            First row of every cell (ascending).
+        cols: np.ndarray
+            First column of every cell (ascending).
+
+    Returns:
+        NumPy uint8 array of shape (rows, cols, 3) with mean RGB of every cell.
+    """
+
+    rows, cols = np.ravel(rows), np.ravel(cols)
+    row_sums = np.empty((len(rows),) + data.shape[1:], dtype=np.uint64)
+    # cells of upsampled images repeat a start index and cover a single pixel
+    stops = rows[1:].tolist() + [data.shape[0]]
+    for index, (start, stop) in enumerate(zip(rows.tolist(), stops)):
+        np.add.reduce(data[start:max(stop, start + 1)], axis=0, out=row_sums[index])
+    sums = np.add.reduceat(row_sums, cols, axis=1)
+    row_counts = np.maximum(np.diff(rows, append=data.shape[0]), 1)
+    col_counts = np.maximum(np.diff(cols, append=data.shape[1]), 1)
+    counts = np.outer(row_counts, col_counts).astype(np.uint64)
+    if sums.ndim == 3:
+        counts = counts[:, :, np.newaxis]
+    means = ((sums + counts // 2) // counts).astype(np.uint8)
+    if means.ndim == 2:
+        means = np.repeat(means[:, :, np.newaxis], 3, axis=2)
+    return means
+
+
+def quantize_colors(colors: np.ndarray, step: int) -> np.ndarray:
+    """
+    Rounds every color channel to the nearest multiple of step,
+    so neighbouring cells of similar colors can be merged into one run.
+
+    Args:
+        colors: np.ndarray
+            RGB colors (uint8).
+        step: int
+            Quantization step (1 keeps colors unchanged).
+
+    Returns:
+        Quantized RGB colors (uint8).
+    """
+
+    if step <= 1:
+        return colors
+    quantized = (colors.astype(np.uint16) + step // 2) // step * step
+    return np.minimum(quantized, 255).astype(np.uint8)
+
+
+def render_color_ascii_art(glyphs: np.ndarray, colors: np.ndarray, color_format: str,
+                           symbols: str = "") -> str:
+    """
+    Renders glyphs with colors of their cells.
+
+    Consecutive cells of the same color in a row are merged into a single run,
+    so a color escape (or <span>) is emitted once per run
+    instead of once per glyph. Run boundaries are found
+    with a single vectorized comparison of packed colors.
+
+    Args:
+        glyphs: np.ndarray
+            2D NumPy uint8 array of glyph codes.
+        colors: np.ndarray
+            RGB colors (uint8) of every glyph.
+        color_format: str
+            One of COLOR_FORMATS keys.
+        symbols: str
+            Symbol table of glyph codes (see text.encode_ascii_art).
+
+    Returns:
+        Colored ASCII art (rows separated by newlines).
+
+    Raises:
+        ValueError: If color format is not supported.
+    """
+
+    if color_format not in COLOR_FORMATS:
+        raise ValueError(f"Unsupported color format: {color_format}")
+    height, width = glyphs.shape
+    packed = (colors[:, :, 0].astype(np.uint32) << 16
+              | colors[:, :, 1].astype(np.uint32) << 8
+              | colors[:, :, 2])
+    is_run_start = np.ones((height, width), dtype=bool)
+    is_run_start[:, 1:] = packed[:, 1:] != packed[:, :-1]
+
+    lines: List[str] = []
+    for row, text in enumerate(decode_ascii_art(glyphs, symbols).split("\n")):
+        starts = np.flatnonzero(is_run_start[row]).tolist()
+        stops = starts[1:] + [width]
+        run_colors = packed[row, starts].tolist()
+        if color_format == "ansi":
+            parts = [
+                f"\x1b[38;2;{color >> 16};{color >> 8 & 255};{color & 255}m{text[start:stop]}"
+                for start, stop, color in zip(starts, stops, run_colors)
+            ]
+            parts.append(ANSI_RESET)
+        else:
+            parts = [
+                f"<span style=\"color:#{color:06x}\">{html.escape(text[start:stop], False)}</span>"
+                for start, stop, color in zip(starts, stops, run_colors)
+            ]
+        lines.append("".join(parts))
+    return "\n".join(lines)
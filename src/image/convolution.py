@@ -0,0 +1,126 @@
+import numpy as np
+from numpy import fft
+
+from src.util import consts
+from src.util.instrumentation import instrumented
+
+
+def convolve(data: np.ndarray, kernel: np.ndarray) -> np.ndarray:
+    """
+    Applies image kernel (sharpen, emboss etc.) on grayscale image data.
+
+    Small odd-sized integer kernels are applied directly
+    by accumulating shifted slices of image data in integer arithmetic,
+    which costs O(N * kernel size) and a few bytes per pixel.
+    Other kernels (larger than DirectConvolutionMaxKernelSize,
+    even-sized or non-integer) fall back to discrete Fourier Transform.
+
+    Both engines treat image borders as periodic (image wraps around),
+    so the direct engine is exact and the FFT engine differs from it
+    at most by 1 due to floating-point truncation.
+
+    Args:
+        data: np.ndarray
+            2D grayscale image data (uint8).
+        kernel: np.ndarray
+            2D effect kernel.
+
+    Returns:
+        Kernelized image data (uint8) clipped to 0-255.
+    """
+
+    kernel_h, kernel_w = kernel.shape
+    is_direct = (
+            max(kernel.shape) <= consts.imageConsts["DirectConvolutionMaxKernelSize"]
+            and kernel_h % 2 == 1 and kernel_w % 2 == 1
+            and np.array_equal(kernel, np.round(kernel))
+            and kernel_h <= data.shape[0] and kernel_w <= data.shape[1]
+    )
+    if is_direct:
+        return direct_convolve(data, kernel.astype(np.int64))
+    return fft_convolve(data, kernel)
+
+
+@instrumented("convolution.direct")
+def direct_convolve(data: np.ndarray, kernel: np.ndarray) -> np.ndarray:
+    """
+    Applies odd-sized integer kernel with shifted-slice accumulation.
+
+    Accumulates in int16 if the kernel can't overflow it,
+    otherwise in int32.
+    Borders are handled by wrapping image data around
+    (same result as FFT convolution).
+
+    Args:
+        data: np.ndarray
+            2D grayscale image data (uint8).
+        kernel: np.ndarray
+            Odd-sized 2D integer kernel.
+
+    Returns:
+        Kernelized image data (uint8) clipped to 0-255.
+    """
+
+    height, width = data.shape
+    kernel_h, kernel_w = kernel.shape
+    max_sum = 255 * int(np.abs(kernel).sum())
+    acc_type = np.int16 if max_sum <= np.iinfo(np.int16).max else np.int32
+
+    padded = np.pad(
+        data.astype(acc_type, copy=False),
+        ((kernel_h // 2, kernel_h // 2), (kernel_w // 2, kernel_w // 2)),
+        mode="wrap"
+    )
+    acc = np.zeros((height, width), dtype=acc_type)
+    tmp = np.empty_like(acc)
+    for y in range(kernel_h):
+        for x in range(kernel_w):
+            weight = int(kernel[y, x])
+            if weight == 0:
+                continue
+            # convolution flips the kernel
+            shifted = padded[
+                kernel_h - 1 - y:kernel_h - 1 - y + height,
+                kernel_w - 1 - x:kernel_w - 1 - x + width
+            ]
+            if weight == 1:
+                acc += shifted
+            elif weight == -1:
+                acc -= shifted
+            else:
+                np.multiply(shifted, weight, out=tmp)
+                acc += tmp
+    return np.clip(acc, 0, 255, out=acc).astype(np.uint8)
+
+
+@instrumented("convolution.fft")
+def fft_convolve(data: np.ndarray, kernel: np.ndarray) -> np.ndarray:
+    """
+    Applies kernel with discrete Fourier Transform.
+
+    Args:
+        data: np.ndarray
+            2D grayscale image data (uint8).
+        kernel: np.ndarray
+            2D kernel (not larger than image data).
+
+    Returns:
+        Kernelized image data (uint8) clipped to 0-255.
+    """
+
+    new_kernel_size = (
+        data.shape[0] - kernel.shape[0],
+        data.shape[1] - kernel.shape[1]
+    )
+    kernel_padding = (
+        ((new_kernel_size[0] + 1) // 2, new_kernel_size[0] // 2),
+        ((new_kernel_size[1] + 1) // 2, new_kernel_size[1] // 2)
+    )
+    padded_kernel = np.pad(kernel, kernel_padding)
+    # move FFT origin to the middle
+    shifted_kernel = fft.ifftshift(padded_kernel)
+
+    kernelized = np.real(
+        fft.ifft2(fft.fft2(data) * fft.fft2(shifted_kernel))
+    )
+    return np.clip(kernelized, 0, 255).astype(np.ubyte)
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import gzip
+import html
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, Optional
+
+from src.util import consts
+from src.util.instrumentation import instrumentation
+from .frames import FrameSequence
+from .image import Image
+from .text import TEXT_ENCODING
+
+EXPORT_EXTENSIONS: Dict[str, str] = {
+    "txt": ".txt",
+    "gz": ".txt.gz",
+    "html": ".html"
+}
+"""Supported export formats and their file extensions."""
+
+
+def get_export_format(path: str) -> str:
+    """
+    Detects export format by file extension.
+
+    Args:
+        path: str
+            Path to exported file.
+
+    Returns:
+        "gz" for .gz files, "html" for .html / .htm files, "txt" otherwise.
+    """
+
+    suffix = Path(path).suffix.lower()
+    if suffix == ".gz":
+        return "gz"
+    if suffix in (".html", ".htm"):
+        return "html"
+    return "txt"
+
+
+def export_ascii_art(image: Image or FrameSequence, path: str,
+                     export_format: Optional[str] = None) -> int:
+    """
+    Exports ASCII art in full image size to file.
+
+    Streams rows to file in chunks of ExportChunkSize bytes,
+    so memory used by exporting doesn't grow with image size.
+    Supported formats are plain text, gzip-compressed text
+    and HTML page with <pre> block.
+
+    Args:
+        image: Image or FrameSequence
+            Converted image (all frames of FrameSequence are exported).
+        path: str
+            Path to exported file.
+        export_format: str or None
+            One of EXPORT_EXTENSIONS keys
+            (detected by file extension if None).
+
+    Returns:
+        Number of ASCII art bytes written (before compression).
+
+    Raises:
+        ValueError: If export format is not supported.
+    """
+
+    export_format = export_format or get_export_format(path)
+    if export_format not in EXPORT_EXTENSIONS:
+        raise ValueError(f"Unsupported export format: {export_format}")
+    chunks = image.iter_ascii_chunks(consts.imageConsts["ExportChunkSize"])
+
+    written = 0
+    with instrumentation.stage(f"export.{export_format}") as stage:
+        if export_format == "gz":
+            with gzip.open(path, "wb") as f:
+                for chunk in chunks:
+                    written += f.write(chunk)
+        else:
+            with open(path, "wb") as f:
+                if export_format == "html":
+                    written += _write_html(f, image.name, chunks)
+                else:
+                    for chunk in chunks:
+                        written += f.write(chunk)
+        stage.nbytes = written
+    return written
+
+
+def _write_html(f: BinaryIO, title: str, chunks: Iterator[memoryview]) -> int:
+    """
+    Helper function for writing ASCII art as HTML page.
+
+    Args:
+        f: BinaryIO
+            Opened file.
+        title: str
+            Page title.
+        chunks: Iterator[memoryview]
+            Encoded ASCII art chunks.
+
+    Returns:
+        Number of ASCII art bytes written (escaped).
+    """
+
+    f.write(
+        f"<!DOCTYPE html>\n<html>\n<head>\n"
+        f"<meta charset=\"{TEXT_ENCODING}\">\n"
+        f"<title>{html.escape(title)}</title>\n"
+        f"</head>\n<body>\n"
+        f"<pre style=\"font-family: monospace; line-height: 1;\">".encode(TEXT_ENCODING)
+    )
+    written = 0
+    for chunk in chunks:
+        escaped = bytes(chunk).replace(b"&", b"&amp;").replace(b"<", b"&lt;").replace(b">", b"&gt;")
+        written += f.write(escaped)
+    f.write(b"</pre>\n</body>\n</html>\n")
+    return written
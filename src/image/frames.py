@@ -0,0 +1,654 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from functools import partial
+from itertools import islice
+from threading import Lock
+from typing import Any, Dict, Iterator, List, Tuple
+
+import numpy as np
+
+from src.util import consts
+from src.util.scheduler import map_ordered
+from src.util.slots import add_slots
+from .image import Image, improps
+from .text import TEXT_ENCODING
+
+FRAME_SEPARATOR = b"\n\f\n"
+"""Separates frames in exported text (form feed on its own line)."""
+
+
+def count_frames(path: str) -> int:
+    """
+    Reads number of frames from file header without decoding frames.
+
+    Args:
+        path: str
+            Path to image or video file.
+
+    Returns:
+        Number of frames (1 for still images, 0 if unknown).
+    """
+
+    props = improps(path)
+    if not props.is_batch:
+        return 1
+    return props.n_images or 0
+
+
+def iter_frames(path: str) -> Iterator[np.ndarray]:
+    """
+    Decodes frames of animated image or video one by one.
+
+    Args:
+        path: str
+            Path to image or video file.
+
+    Returns:
+        Iterator of decoded frames.
+    """
+
+    from imageio.v3 import imiter
+    yield from imiter(path)
+
+
+def open_image(name: str, path: str,
+               contrast: bool, negative: bool,
+               sharpen: bool, emboss: bool,
+               grayscale_level: str) -> Image or FrameSequence:
+    """
+    Opens image or video file.
+
+    Args:
+        name: str
+            Image's given name.
+        path: str
+            Path to image or video file.
+        contrast: bool
+            Image's contrast flag.
+        negative: bool
+            Image's negative flag.
+        sharpen: bool
+            Image's sharpen flag.
+        emboss: bool
+            Image's emboss flag.
+        grayscale_level: str
+            Image's grayscale level.
+
+    Returns:
+        FrameSequence for files with multiple frames, Image otherwise.
+    """
+
+    cls = Image if count_frames(path) == 1 else FrameSequence
+    return cls(
+        name, path,
+        contrast, negative,
+        sharpen, emboss,
+        grayscale_level
+    )
+
+
+@add_slots
+@dataclass
+class FrameSequence:
+    """
+    Data class for animated images (GIF) and videos.
+
+    Frames are decoded lazily one by one, converted in a pool
+    of worker threads and reassembled in order through a bounded
+    reorder buffer, so only a few decoded frames are held at once.
+    Converted frames are Images without raw data,
+    which provide the same outputs as Image (e.g. for animation playback).
+    Only the first frame and a window of FrameWindowSize recently used frames
+    are kept, other frames are decoded and converted again on demand
+    (window by window, continuing the previous decoding pass
+    when frames are read in order), so memory usage doesn't grow
+    with the number of frames.
+    Full-size outputs are streamed from a new decoding pass.
+
+    Attributes:
+        name: str
+            Sequence's given name.
+        path: str
+            Path to image or video file.
+        is_contrast: bool
+            Flag, which indicates if contrast effect is applied.
+        is_negative: bool
+            Flag, which indicates if negative effect is applied.
+        is_sharpen: bool
+            Flag, which indicates if sharpen effect is applied.
+        is_emboss: bool
+            Flag, which indicates if emboss effect is applied.
+        grayscale_level: str
+            Range of symbols from darkest to lightest
+            used for ASCII conversion.
+        working_size: Tuple[int, int] or None
+            Maximum resolution (width and height) ASCII art will be drawn in.
+            Frames are downsampled (at most to this resolution)
+            before effects are applied.
+        max_workers: int or None
+            Number of frame conversion threads (number of cores if None).
+        __frame_count: int
+            Number of frames read from file header (0 if unknown).
+        __frame_duration: float or None
+            Delay between frames (in seconds) read from file metadata.
+        __first_frame: Image or None
+            Converted first frame (None if sequence is not converted).
+        __frames: OrderedDict[int, Image]
+            Window of converted frames by their index
+            from least to most recently used.
+        __window_size: int
+            Maximum number of frames in the window.
+        __cursor: Tuple[int, Iterator[np.ndarray]] or None
+            Index of the next frame and decoding pass
+            the next window is continued from.
+        __lock: Lock
+            Serializes conversion of frame windows.
+    """
+
+    name: str
+    path: str
+    is_contrast: bool
+    is_negative: bool
+    is_sharpen: bool
+    is_emboss: bool
+    grayscale_level: str
+    working_size: Tuple[int, int] or None = None
+    max_workers: int or None = None
+    __frame_count: int = field(init=False)
+    __frame_duration: float or None = field(init=False)
+    __first_frame: Image or None = field(init=False)
+    __frames: OrderedDict = field(init=False)
+    __window_size: int = field(init=False)
+    __cursor: Tuple[int, Iterator[np.ndarray]] or None = field(init=False)
+    __lock: Lock = field(init=False)
+
+    def __str__(self) -> str:
+        """
+        x.__str__() <==> str(x)
+
+        Returns:
+            ASCII art of all frames in full size separated by FRAME_SEPARATOR.
+        """
+
+        return str(self.get_ascii_buffer(), TEXT_ENCODING)
+
+    def __len__(self) -> int:
+        """
+        x.__len__() <==> len(x)
+
+        If file header doesn't define frame count and no window
+        has reached the end of file yet, the remaining frames
+        are counted by decoding them.
+
+        Returns:
+            Number of frames of converted sequence (0 if not converted).
+        """
+
+        if self.__first_frame is None:
+            return 0
+        if not self.__frame_count:
+            with self.__lock:
+                self.__count_remaining_frames()
+        return self.__frame_count
+
+    def __getitem__(self, index: int) -> Image:
+        """
+        x.__getitem__(y) <==> x[y]
+
+        Frames out of the window are decoded and converted again
+        together with the following window of frames.
+
+        Args:
+            index: int
+                Frame index.
+
+        Returns:
+            Converted frame.
+
+        Raises:
+            IndexError: If there is no converted frame at the given index.
+        """
+
+        if index < 0:
+            index += len(self)
+        if index < 0 or self.__first_frame is None or 0 < self.__frame_count <= index:
+            raise IndexError(f"Frame index out of range: {index}")
+        if index == 0:
+            return self.__first_frame
+        with self.__lock:
+            frame = self.__frames.get(index)
+            if frame is None:
+                return self.__convert_window(index)
+            self.__frames.move_to_end(index)
+            return frame
+
+    def __iter__(self) -> Iterator[Image]:
+        """
+        x.__iter__() <==> iter(x)
+
+        Frames are converted window by window until the end of file,
+        so frame count doesn't need to be known up front.
+
+        Returns:
+            Iterator of converted frames in playback order.
+        """
+
+        index = 0
+        while True:
+            try:
+                frame = self[index]
+            except IndexError:
+                return
+            yield frame
+            index += 1
+
+    def __post_init__(self) -> None:
+        """
+        Reads frame count and frame rate from file header
+        without decoding frames.
+
+        Returns:
+            None.
+        """
+
+        self.__first_frame = None
+        self.__frames = OrderedDict()
+        self.__window_size = consts.imageConsts["FrameWindowSize"]
+        self.__cursor = None
+        self.__lock = Lock()
+        self.__frame_count = 0
+        self.__frame_duration = None
+        if not self.path:
+            return
+        self.__frame_count = count_frames(self.path)
+        from imageio.v3 import immeta
+        meta = immeta(self.path, index=0)
+        if meta.get("duration"):
+            self.__frame_duration = meta["duration"] / 1000.0
+        elif meta.get("fps"):
+            self.__frame_duration = 1.0 / meta["fps"]
+
+    @classmethod
+    def from_session(cls, metadata: Dict[str, Any],
+                     frames_data: List[np.ndarray]) -> FrameSequence:
+        """
+        Restores converted sequence saved by to_session
+        without reading its file.
+
+        Args:
+            metadata: Dict[str, Any]
+                Sequence's metadata.
+            frames_data: List[np.ndarray]
+                Grayscale image data of every frame
+                (e.g. memory-mapped from session file).
+
+        Returns:
+            Converted sequence.
+        """
+
+        sequence = cls(
+            metadata["name"], "",
+            metadata["is_contrast"], metadata["is_negative"],
+            metadata["is_sharpen"], metadata["is_emboss"],
+            metadata["grayscale_level"],
+            tuple(metadata["working_size"]) if metadata["working_size"] else None
+        )
+        sequence.path = metadata["path"]
+        sequence.__frame_duration = metadata["frame_duration"]
+        frames = [
+            Image.from_session(frame_metadata, frame_data)
+            for frame_metadata, frame_data in zip(metadata["frames"], frames_data)
+        ]
+        # frames are memory-mapped, so all of them are kept without decoding
+        sequence.__frames = OrderedDict(enumerate(frames))
+        sequence.__window_size = max(len(frames), 1)
+        sequence.__first_frame = frames[0] if frames else None
+        sequence.__frame_count = len(frames)
+        return sequence
+
+    def to_session(self) -> Tuple[Dict[str, Any], List[np.ndarray]]:
+        """
+        Frames out of the window are converted again.
+
+        Returns:
+            A pair of sequence's metadata (JSON serializable)
+            and converted grayscale image data of every frame.
+
+        Raises:
+            ValueError: If sequence is not converted.
+        """
+
+        if not len(self):
+            raise ValueError(f"Image {self.name} is not converted")
+        frames = [frame.to_session() for frame in self]
+        return {
+            "name": self.name,
+            "path": self.path,
+            "is_contrast": self.is_contrast,
+            "is_negative": self.is_negative,
+            "is_sharpen": self.is_sharpen,
+            "is_emboss": self.is_emboss,
+            "grayscale_level": self.grayscale_level,
+            "working_size": list(self.working_size) if self.working_size else None,
+            "frame_duration": self.__frame_duration,
+            "frames": [frame_metadata for frame_metadata, _ in frames]
+        }, [frame_data for _, frame_data in frames]
+
+    def convert_to_ascii_art(self) -> None:
+        """
+        Converts the first window of frames to ASCII art.
+
+        Other frames are converted on demand. Frame count is read
+        from file header, if it doesn't define it, frames are counted
+        once a window reaches the end of file (or len() is called).
+
+        Returns:
+            None.
+        """
+
+        self.set_grayscale_level(self.grayscale_level)
+        with self.__lock:
+            for frame in self.__kept_frames():
+                frame.release_render_cache()
+            self.__frames.clear()
+            self.__window_size = consts.imageConsts["FrameWindowSize"]
+            self.__cursor = None
+            try:
+                self.__first_frame = self.__convert_window(0)
+            except IndexError:
+                self.__first_frame = None
+
+    def iter_ascii_chunks(self, chunk_size: int) -> Iterator[memoryview]:
+        """
+        Converts and encodes ASCII art of all frames in full size
+        frame by frame, so neither all frames nor the whole text
+        is ever held in memory.
+
+        Args:
+            chunk_size: int
+                Approximate size of each chunk (in bytes).
+
+        Returns:
+            Iterator of UTF-8 encoded text buffers
+            (frames separated by FRAME_SEPARATOR).
+        """
+
+        for index, frame in enumerate(self.__convert_frames(None, iter_frames(self.path))):
+            if index:
+                yield memoryview(FRAME_SEPARATOR)
+            yield from frame.iter_ascii_chunks(chunk_size)
+
+    def get_ascii_buffer(self) -> memoryview:
+        """
+        Returns:
+            ASCII art of all frames in full size as UTF-8 encoded text buffer.
+        """
+
+        return memoryview(b"".join(
+            self.iter_ascii_chunks(consts.imageConsts["ExportChunkSize"])
+        )).toreadonly()
+
+    def get_ascii_art(self, win_width: int, win_height: int) -> str:
+        """
+        Args:
+            win_width: int
+                Width of window, in which art will be drawn.
+            win_height: int
+                Height of window, in which art will be drawn.
+
+        Returns:
+            ASCII art of the first frame.
+        """
+
+        return self.__first_frame.get_ascii_art(win_width, win_height)
+
+    def get_ascii_art_buffer(self, win_width: int, win_height: int) -> memoryview:
+        """
+        Same as get_ascii_art, but skips building a string.
+
+        Args:
+            win_width: int
+                Width of window, in which art will be drawn.
+            win_height: int
+                Height of window, in which art will be drawn.
+
+        Returns:
+            ASCII art of the first frame as UTF-8 encoded text buffer.
+        """
+
+        return self.__first_frame.get_ascii_art_buffer(win_width, win_height)
+
+    def get_image_data(self) -> np.ndarray:
+        """
+        Returns:
+            Image data of the first frame as NumPy array.
+        """
+
+        return self.__first_frame.get_image_data()
+
+    def get_frame_count(self) -> int:
+        """
+        Returns:
+            Number of frames (0 if file header doesn't define it
+            and the end of file wasn't reached yet).
+        """
+
+        return self.__frame_count
+
+    def get_frame_duration(self) -> float or None:
+        """
+        Returns:
+            Delay between frames (in seconds) or None if file doesn't define it.
+        """
+
+        return self.__frame_duration
+
+    def set_grayscale_level(self, grayscale_level: str) -> None:
+        """
+        Updates grayscale level of all kept frames
+        without converting them again.
+
+        Args:
+            grayscale_level: str
+                Grayscale level defining symbols from darkest to lightest.
+                Empty string sets default grayscale level.
+
+        Returns:
+            None.
+        """
+
+        grayscale_level = grayscale_level.strip() or consts.uiConsts["DefaultGrayscaleLevel"]
+        with self.__lock:
+            for frame in self.__kept_frames():
+                frame.set_grayscale_level(grayscale_level)
+            self.grayscale_level = grayscale_level
+
+    def set_effect_flags(self,
+                         contrast: bool, negative: bool,
+                         sharpen: bool, emboss: bool) -> None:
+        self.is_contrast = contrast
+        self.is_negative = negative
+        self.is_sharpen = sharpen
+        self.is_emboss = emboss
+
+    def release_raw_data(self) -> None:
+        """
+        Does nothing, frames don't keep raw data after conversion.
+
+        Returns:
+            None.
+        """
+
+    def get_memory_usage(self) -> int:
+        """
+        Returns:
+            Total size of image data held by all kept frames (in bytes).
+        """
+
+        with self.__lock:
+            frames = self.__kept_frames()
+        return sum(frame.get_memory_usage() for frame in frames)
+
+    def get_render_cache_stats(self) -> Dict[str, int]:
+        """
+        Returns:
+            Hits, misses, number of entries and size (in bytes)
+            of all kept frames' rendered outputs in render cache.
+        """
+
+        stats = {"hits": 0, "misses": 0, "entries": 0, "bytes": 0}
+        with self.__lock:
+            frames = self.__kept_frames()
+        for frame in frames:
+            for key, value in frame.get_render_cache_stats().items():
+                stats[key] += value
+        return stats
+
+    def release_render_cache(self) -> None:
+        """
+        Removes rendered outputs and stats of all kept frames from render cache.
+
+        Should be called when sequence is discarded.
+
+        Returns:
+            None.
+        """
+
+        with self.__lock:
+            frames = self.__kept_frames()
+        for frame in frames:
+            frame.release_render_cache()
+
+    def share_pipeline(self, other: Image or FrameSequence or None) -> bool:
+        """
+        Frames are decoded again by every conversion,
+        so there is no pipeline to share.
+
+        Args:
+            other: Image or FrameSequence or None
+                Previously converted image.
+
+        Returns:
+            False.
+        """
+
+        return False
+
+    def __kept_frames(self) -> List[Image]:
+        """
+        Should be called with lock acquired.
+
+        Returns:
+            The first frame and frames in the window.
+        """
+
+        frames = list(self.__frames.values())
+        if self.__first_frame is not None and 0 not in self.__frames:
+            frames.insert(0, self.__first_frame)
+        return frames
+
+    def __convert_window(self, index: int) -> Image:
+        """
+        Converts a window of frames starting at the given index
+        and puts them into the window of kept frames.
+
+        Continues the previous decoding pass if it has not passed
+        the given index yet, otherwise decodes file from the beginning.
+        If the window reaches the end of file, frame count is updated.
+        Should be called with lock acquired.
+
+        Args:
+            index: int
+                Index of the first frame of the window.
+
+        Returns:
+            Converted frame at the given index.
+
+        Raises:
+            IndexError: If file has no frame at the given index.
+        """
+
+        if self.__cursor is None or self.__cursor[0] > index:
+            self.__cursor = (0, iter_frames(self.path))
+        (position, frames) = self.__cursor
+        position += sum(1 for _ in islice(frames, index - position))
+        window = [] if position < index else list(self.__convert_frames(
+            self.working_size, islice(frames, self.__window_size)
+        ))
+        position += len(window)
+        self.__cursor = (position, frames)
+        if len(window) < self.__window_size:
+            self.__frame_count = position
+        if not window:
+            raise IndexError(f"Frame index out of range: {index}")
+        for offset, frame in enumerate(window):
+            self.__frames[index + offset] = frame
+            self.__frames.move_to_end(index + offset)
+        while len(self.__frames) > self.__window_size:
+            (_, evicted) = self.__frames.popitem(last=False)
+            if evicted is not self.__first_frame:
+                evicted.release_render_cache()
+        return window[0]
+
+    def __count_remaining_frames(self) -> None:
+        """
+        Counts frames by decoding the rest of file
+        (continuing the previous decoding pass) if frame count is unknown.
+        Should be called with lock acquired.
+
+        Returns:
+            None.
+        """
+
+        if self.__frame_count:
+            return
+        (position, frames) = self.__cursor or (0, iter_frames(self.path))
+        self.__frame_count = position + sum(1 for _ in frames)
+        self.__cursor = None
+
+    def __convert_frames(self, working_size: Tuple[int, int] or None,
+                         frames: Iterator[np.ndarray]) -> Iterator[Image]:
+        """
+        Converts frames in a pool of worker threads.
+
+        Args:
+            working_size: Tuple[int, int] or None
+                Maximum resolution of converted frames (full size if None).
+            frames: Iterator[np.ndarray]
+                Decoded frames (decoded lazily by the pool).
+
+        Returns:
+            Iterator of converted frames in playback order.
+        """
+
+        return map_ordered(
+            partial(self.__convert_frame, working_size), frames,
+            self.max_workers, consts.imageConsts["FrameBufferSize"]
+        )
+
+    def __convert_frame(self, working_size: Tuple[int, int] or None,
+                        image_data_raw: np.ndarray) -> Image:
+        """
+        Function used in frame conversion threads.
+
+        Args:
+            working_size: Tuple[int, int] or None
+                Maximum resolution of converted frame.
+            image_data_raw: np.ndarray
+                Decoded frame.
+
+        Returns:
+            Converted frame without raw data.
+        """
+
+        frame = Image.from_array(
+            self.name, image_data_raw,
+            self.is_contrast, self.is_negative,
+            self.is_sharpen, self.is_emboss,
+            self.grayscale_level,
+            working_size, keep_raw_data=False
+        )
+        frame.convert_to_ascii_art()
+        return frame
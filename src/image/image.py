@@ -1,25 +1,72 @@
 from __future__ import annotations
 
+import os
 from dataclasses import dataclass, field
-from functools import wraps
-from typing import Tuple, Callable, Any
+from functools import wraps, lru_cache, partial
+from threading import Lock
+from typing import Tuple, Callable, Any, Dict, Iterator, List
 
 import numpy as np
-from imageio.v2 import imread
-from numpy import fft
 
 from src.util import consts
+from src.util.cache import LRUCache
+from src.util.disk_cache import disk_cache, hash_file_contents
+from src.util.instrumentation import instrumentation, instrumented
+from src.util.scheduler import map_ordered
+from src.util.slots import add_slots
+from .color import compute_cell_colors, quantize_colors, render_color_ascii_art
+from .convolution import convolve
+from .render_cache import render_cache
+from .text import NEWLINE_CODE, encode_ascii_art, decode_ascii_art
+
+
+def imread(path: str) -> np.ndarray:
+    """
+    Decodes image file.
+
+    imageio (and its plugins) are imported on first call,
+    so importing this module stays cheap.
+
+    Args:
+        path: str
+            Path to image file.
+
+    Returns:
+        Decoded image data.
+    """
+
+    from imageio.v2 import imread as imageio_imread
+    return imageio_imread(path)
+
+
+def improps(path: str, **kwargs):
+    """
+    Reads image properties (e.g. shape) from file header without decoding it.
+
+    Args:
+        path: str
+            Path to image file.
+        kwargs:
+            Arguments of imageio.v3.improps.
+
+    Returns:
+        Image properties.
+    """
+
+    from imageio.v3 import improps as imageio_improps
+    return imageio_improps(path, **kwargs)
 
 
-def format_output_ascii(func: Callable[[Any], np.chararray]):
+def format_output_ascii(func: Callable[[Any], Tuple[np.ndarray, str]]):
     """
     Decorator for formatting ASCII art output.
 
-    Accepts NumPy char array from func and converts it into string.
+    Accepts NumPy array of glyph codes and their symbol table from func
+    and converts them into string.
 
     Args:
-        func: Callable[[Any], np.chararray]
-            Function returning NumPy char array.
+        func: Callable[[Any], Tuple[np.ndarray, str]]
+            Function returning NumPy array of glyph codes and their symbol table.
 
     Returns:
         Formatted string.
@@ -27,12 +74,266 @@ def format_output_ascii(func: Callable[[Any], np.chararray]):
 
     @wraps(func)
     def wrapper(*args) -> str:
-        data = func(*args)
-        return '\n'.join(''.join('%c' % symb for symb in row) for row in data)
+        (data, symbols) = func(*args)
+        with instrumentation.stage("image.format_output") as stage:
+            stage.nbytes = data.size + data.shape[0]
+            return decode_ascii_art(data, symbols)
 
     return wrapper
 
 
+def format_output_buffer(func: Callable[[Any], Tuple[np.ndarray, str]]):
+    """
+    Decorator for formatting ASCII art output as a text buffer.
+
+    Accepts NumPy array of glyph codes and their symbol table from func
+    and converts them into UTF-8 encoded buffer, which can be written
+    to file or socket without building a string.
+
+    Args:
+        func: Callable[[Any], Tuple[np.ndarray, str]]
+            Function returning NumPy array of glyph codes and their symbol table.
+
+    Returns:
+        Read-only memoryview of encoded text.
+    """
+
+    @wraps(func)
+    def wrapper(*args) -> memoryview:
+        (data, symbols) = func(*args)
+        with instrumentation.stage("image.format_output") as stage:
+            stage.nbytes = data.size + data.shape[0]
+            return encode_ascii_art(data, symbols=symbols)
+
+    return wrapper
+
+
+@lru_cache(maxsize=32)
+def compile_grayscale_level(grayscale_level: str) -> Tuple[np.ndarray, str]:
+    """
+    Compiles grayscale level into a lookup table.
+
+    Maps every possible 8-bit brightness value to a one-byte glyph code,
+    so the whole image can be converted to ASCII art with a single gather.
+    If grayscale level is pure ASCII, glyph codes are the symbols themselves
+    and text is built without any per-character work. Otherwise glyph codes
+    index a symbol table (see text.symbol_code), which is translated
+    to Unicode symbols when text is built.
+    Compiled tables are cached, so each grayscale level
+    is compiled only once.
+
+    Args:
+        grayscale_level: str
+            Grayscale level defining symbols from darkest to lightest.
+
+    Returns:
+        Read-only NumPy array of 256 glyph codes and their symbol table
+        (empty string if glyph codes are ASCII symbols).
+    """
+
+    grayscale_indices = (
+            np.arange(256) / 255.0 * (len(grayscale_level) - 1)
+    ).astype(np.uint8)
+    if grayscale_level.isascii():
+        glyphs = np.frombuffer(grayscale_level.encode("ascii"), dtype=np.uint8)
+        lut = glyphs[grayscale_indices]
+        symbols = ""
+    else:
+        (positions, codes) = np.unique(grayscale_indices, return_inverse=True)
+        # one code is taken by newline, so at most 255 symbols fit in a byte
+        positions, codes = positions[:255], np.minimum(codes, 254)
+        lut = (codes + (codes >= NEWLINE_CODE)).astype(np.uint8)
+        symbols = "".join(grayscale_level[position] for position in positions.tolist())
+    lut.setflags(write=False)
+    return lut, symbols
+
+
+def reduce_area(data: np.ndarray, factor: int) -> np.ndarray:
+    """
+    Downsamples image data by averaging factor x factor pixel blocks.
+
+    Incomplete blocks at the right and bottom edges are cropped.
+
+    Args:
+        data: np.ndarray
+            Image data (uint8) with 1 or more channels.
+        factor: int
+            Size of averaged blocks.
+
+    Returns:
+        Downsampled image data (uint8).
+    """
+
+    height, width = data.shape[0] // factor, data.shape[1] // factor
+    blocks = data[:height * factor, :width * factor].reshape(
+        (height, factor, width, factor) + data.shape[2:]
+    )
+    area = factor * factor
+    block_sums = blocks.sum(axis=(1, 3), dtype=np.uint32)
+    block_sums += area // 2
+    block_sums //= area
+    return block_sums.astype(np.uint8)
+
+
+@lru_cache(maxsize=1)
+def compile_luminance_table() -> np.ndarray:
+    """
+    Compiles sRGB linearization lookup table.
+
+    Maps every possible 8-bit value of each RGB channel
+    to its linear intensity weighted by channel's luminance coefficient,
+    so grayscale conversion is reduced to three gathers and two additions.
+
+    Returns:
+        Read-only NumPy float64 array of shape (3, 256).
+    """
+
+    gamma_compressed = np.arange(256) / 255.0
+    linear = np.where(
+        gamma_compressed <= 0.04045,
+        gamma_compressed / 12.92,
+        ((gamma_compressed + 0.055) / 1.055) ** 2.4
+    )
+    table = np.outer(consts.imageConsts["LuminanceCoefficients"], linear)
+    table.setflags(write=False)
+    return table
+
+
+@lru_cache(maxsize=64)
+def compute_resample_indices(src_shape: Tuple[int, int],
+                             dst_shape: Tuple[int, int]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Computes nearest-neighbour resampling index vectors.
+
+    Row and column vectors are cached process-wide by source and target
+    shape, so all images of the same size share them.
+
+    Args:
+        src_shape: Tuple[int, int]
+            Height and width of the source data.
+        dst_shape: Tuple[int, int]
+            Height and width of the resampled data.
+
+    Returns:
+        A pair of read-only row (as column vector) and column index vectors,
+        which resample source data with a single fancy-indexing operation.
+    """
+
+    (src_h, src_w), (dst_h, dst_w) = src_shape, dst_shape
+    rows = (src_h * np.arange(dst_h) / dst_h).astype(np.intp)[:, np.newaxis]
+    cols = (src_w * np.arange(dst_w) / dst_w).astype(np.intp)
+    rows.setflags(write=False)
+    cols.setflags(write=False)
+    return rows, cols
+
+
+def compute_band_bounds(height: int, width: int) -> List[Tuple[int, int]]:
+    """
+    Splits image data into row bands of at most TilePixels pixels.
+
+    Args:
+        height: int
+            Height of image data.
+        width: int
+            Width of image data.
+
+    Returns:
+        Start and stop row of every band.
+    """
+
+    band_rows = max(1, consts.imageConsts["TilePixels"] // max(1, width))
+    return [(start, min(start + band_rows, height)) for start in range(0, height, band_rows)]
+
+
+def process_band(data: np.ndarray, scale: int,
+                 functions: List[Callable[[np.ndarray], np.ndarray]],
+                 halo: int, bounds: Tuple[int, int]) -> np.ndarray:
+    """
+    Applies pipeline stages on a single row band of image data.
+
+    Band is extended by halo rows on both sides (wrapped around
+    image borders, as convolution does), so stages reading
+    neighbouring pixels produce the same band as if they were applied
+    on the whole image data.
+
+    Args:
+        data: np.ndarray
+            Whole image data (not downsampled yet if scale > 1).
+        scale: int
+            Downsampling factor of image data.
+        functions: List[Callable[[np.ndarray], np.ndarray]]
+            Pipeline stages in order.
+        halo: int
+            Number of extra rows needed on each side of the band
+            (sum of kernel radii of all stages).
+        bounds: Tuple[int, int]
+            Start and stop row of the band (in downsampled rows).
+
+    Returns:
+        Processed band without halo.
+    """
+
+    (start, stop) = bounds
+    height = data.shape[0] // scale
+    if start - halo >= 0 and stop + halo <= height:
+        band = data[(start - halo) * scale:(stop + halo) * scale]
+    else:
+        rows = np.arange(start - halo, stop + halo) % height
+        if scale > 1:
+            rows = (rows[:, np.newaxis] * scale + np.arange(scale)).ravel()
+        band = data.take(rows, axis=0)
+    if scale > 1:
+        band = reduce_area(band, scale)
+    for function in functions:
+        band = function(band)
+    return band[halo:halo + stop - start]
+
+
+def process_tiled(data: np.ndarray, scale: int,
+                  functions: List[Callable[[np.ndarray], np.ndarray]],
+                  halo: int, max_workers: int or None = None) -> np.ndarray:
+    """
+    Applies pipeline stages on image data band by band
+    in a pool of worker threads.
+
+    Every band is processed independently (see process_band)
+    and written into the output, so the result equals the single-pass one,
+    while intermediate arrays (e.g. floating-point copies) are only
+    as large as a band. At most max_workers bands are in flight.
+
+    Args:
+        data: np.ndarray
+            Whole image data (not downsampled yet if scale > 1).
+        scale: int
+            Downsampling factor of image data.
+        functions: List[Callable[[np.ndarray], np.ndarray]]
+            Pipeline stages in order.
+        halo: int
+            Number of extra rows needed on each side of every band.
+        max_workers: int or None
+            Number of worker threads (number of cores if None).
+
+    Returns:
+        Processed image data.
+    """
+
+    height, width = data.shape[0] // scale, data.shape[1] // scale
+    bounds = compute_band_bounds(height, width)
+    instrumentation.count("image.tiles", len(bounds))
+    max_workers = max_workers or os.cpu_count()
+    output = None
+    bands = map_ordered(
+        partial(process_band, data, scale, functions, halo), bounds,
+        max_workers, max_workers
+    )
+    for (start, stop), band in zip(bounds, bands):
+        if output is None:
+            output = np.empty((height,) + band.shape[1:], dtype=band.dtype)
+        output[start:stop] = band
+    return output
+
+
+@add_slots
 @dataclass
 class Image:
     """
@@ -41,6 +342,8 @@ class Image:
     This class holds all raw format data without any compression.
     Operates with image in common way, such as:
     read from path, convert to ASCII, add effect etc.
+    Stores converted image only as grayscale image data,
+    from which all ASCII art outputs are regenerated.
 
     Attributes:
         name: str
@@ -58,21 +361,52 @@ class Image:
         grayscale_level: str
             Range of symbols from darkest to lightest
             used for ASCII conversion.
+        working_size: Tuple[int, int] or None
+            Maximum resolution (width and height) ASCII art will be drawn in.
+            If set, image is downsampled (at most to this resolution)
+            before effects are applied, and full image size is processed
+            only for full-size outputs (str(), get_ascii_buffer()).
+            None processes image in full image size.
+        keep_raw_data: bool
+            Flag, which indicates if decoded image and cached pipeline stages
+            are kept after conversion (faster re-conversion with other effects).
+            Otherwise they are released and image is decoded again if needed.
+        max_workers: int or None
+            Number of threads processing bands of images larger
+            than TileThreshold pixels (number of cores if None).
         __width: int
             Width of image (in pixels count).
         __height: int
             Height of image (in pixels count).
         __color_space: int
             Image's channels count.
-        __image_data_raw: np.ndarray
+        __image_data_raw: np.ndarray or None
             List of color components values, read from image file.
+            Decoded lazily by the first pipeline stage which needs it.
+        __decode_lock: Lock
+            Guards __image_data_raw against concurrent decoding.
+        __scale: int
+            Downsampling factor of __image_data.
         __image_data: np.ndarray
             Copy of __image_data_raw, which has effects
             applied and converted to grayscale.
-        __ascii_data: np.chararray
-            Copy of __image_data converted to ASCII art.
-        __cached_ascii_data: np.chararray
-            Copy of __ascii_data scaled to the window size.
+        __grayscale: Tuple[str, np.ndarray, str]
+            Grayscale level, its compiled lookup table, which converts
+            __image_data to ASCII art glyph codes, and symbol table of glyph codes
+            (see compile_grayscale_level).
+            Both are replaced at once, so renders running in other threads
+            (reading it once) never mix glyphs of one level
+            with the other level's cache key.
+        __render_id: int
+            Identifier of this image in the render cache.
+        __render_version: int
+            Number of conversions, which invalidates outputs
+            rendered from previous image data.
+        __stage_cache: LRUCache
+            Outputs of effect pipeline stages keyed by
+            downsampling factor and the sequence of stages
+            applied to __image_data_raw
+            (at most StageCacheSize entries of StageCacheBudget bytes).
     """
 
     name: str
@@ -82,16 +416,23 @@ class Image:
     is_sharpen: bool
     is_emboss: bool
     grayscale_level: str
+    working_size: Tuple[int, int] or None = None
+    keep_raw_data: bool = True
+    max_workers: int or None = None
     __width: int = field(init=False)
     __height: int = field(init=False)
     __color_space: int = field(init=False)
-    __image_data_raw: np.ndarray = field(init=False)
-    __image_data: np.ndarray = field(init=False)
-    __ascii_data: np.chararray = field(init=False)
-    __cached_ascii_data: np.chararray = field(init=False)
+    __image_data_raw: np.ndarray or None = field(init=False)
+    __decode_lock: Lock = field(init=False)
+    __scale: int = field(init=False)
+    __image_data: np.ndarray or None = field(init=False)
+    __grayscale: Tuple[str, np.ndarray, str] = field(init=False)
+    __render_id: int = field(init=False)
+    __render_version: int = field(init=False)
+    __stage_cache: LRUCache = field(init=False)
 
     @format_output_ascii
-    def __str__(self) -> np.chararray:
+    def __str__(self) -> Tuple[np.ndarray, str]:
         """
         x.__str__() <==> str(x)
 
@@ -99,66 +440,269 @@ class Image:
             ASCII art in full image size.
         """
 
-        return self.__ascii_data
+        return self.__get_full_ascii_data()
+
+    @format_output_buffer
+    def get_ascii_buffer(self) -> Tuple[np.ndarray, str]:
+        """
+        Returns:
+            ASCII art in full image size as UTF-8 encoded text buffer.
+        """
+
+        return self.__get_full_ascii_data()
+
+    def iter_ascii_chunks(self, chunk_size: int) -> Iterator[memoryview]:
+        """
+        Encodes ASCII art in full image size by chunks of rows,
+        so the whole text is never held in memory.
+
+        Args:
+            chunk_size: int
+                Approximate size of each chunk (in bytes).
+                Each chunk holds at least one row.
+
+        Returns:
+            Iterator of UTF-8 encoded text buffers,
+            which joined together are equal to get_ascii_buffer().
+        """
+
+        (_, glyph_lut, symbols) = self.__grayscale
+        data = self.__image_data if self.__scale == 1 else self.__run_full_size_pipeline()
+        height, width = data.shape
+        rows = max(1, chunk_size // (width + 1))
+        for start in range(0, height, rows):
+            end = min(start + rows, height)
+            yield encode_ascii_art(
+                self.__get_ascii_data(data[start:end], glyph_lut), end < height, symbols
+            )
+
+    @classmethod
+    def from_array(cls, name: str, image_data_raw: np.ndarray,
+                   contrast: bool, negative: bool,
+                   sharpen: bool, emboss: bool,
+                   grayscale_level: str,
+                   working_size: Tuple[int, int] or None = None,
+                   keep_raw_data: bool = True) -> Image:
+        """
+        Creates image from already decoded image data
+        (e.g. a frame of animated image or video).
+
+        Image has no path, so once its raw data is released,
+        only outputs of the last conversion are available.
+
+        Args:
+            name: str
+                Image's given name.
+            image_data_raw: np.ndarray
+                Decoded image data (grayscale, RGB or RGBA).
+            contrast: bool
+                Image's contrast flag.
+            negative: bool
+                Image's negative flag.
+            sharpen: bool
+                Image's sharpen flag.
+            emboss: bool
+                Image's emboss flag.
+            grayscale_level: str
+                Image's grayscale level.
+            working_size: Tuple[int, int] or None
+                Maximum resolution ASCII art will be drawn in.
+            keep_raw_data: bool
+                Flag, which indicates if decoded image is kept after conversion.
+
+        Returns:
+            New image.
+        """
+
+        image = cls(
+            name, "",
+            contrast, negative,
+            sharpen, emboss,
+            grayscale_level,
+            working_size, keep_raw_data
+        )
+        image.__set_image_data_raw(image_data_raw)
+        return image
+
+    @classmethod
+    def from_session(cls, metadata: Dict[str, Any], image_data: np.ndarray) -> Image:
+        """
+        Restores converted image saved by to_session.
+
+        Neither image file nor its header is read,
+        image is decoded only if full-size output of downsampled image
+        is requested.
+
+        Args:
+            metadata: Dict[str, Any]
+                Image's metadata.
+            image_data: np.ndarray
+                Grayscale image data (e.g. memory-mapped from session file).
+
+        Returns:
+            Converted image.
+        """
+
+        image = cls(
+            metadata["name"], "",
+            metadata["is_contrast"], metadata["is_negative"],
+            metadata["is_sharpen"], metadata["is_emboss"],
+            metadata["grayscale_level"],
+            tuple(metadata["working_size"]) if metadata["working_size"] else None
+        )
+        image.path = metadata["path"]
+        image.__width, image.__height = metadata["width"], metadata["height"]
+        image.__color_space = metadata["color_space"]
+        image.__scale = metadata["scale"]
+        image.__image_data = image_data
+        image.__render_version = 1
+        image.set_grayscale_level(image.grayscale_level)
+        return image
+
+    def to_session(self) -> Tuple[Dict[str, Any], np.ndarray]:
+        """
+        Returns:
+            A pair of image's metadata (JSON serializable)
+            and converted grayscale image data.
+
+        Raises:
+            ValueError: If image is not converted.
+        """
+
+        if self.__image_data is None:
+            raise ValueError(f"Image {self.name} is not converted")
+        return {
+            "name": self.name,
+            "path": self.path,
+            "is_contrast": self.is_contrast,
+            "is_negative": self.is_negative,
+            "is_sharpen": self.is_sharpen,
+            "is_emboss": self.is_emboss,
+            "grayscale_level": self.grayscale_level,
+            "working_size": list(self.working_size) if self.working_size else None,
+            "width": self.__width,
+            "height": self.__height,
+            "color_space": self.__color_space,
+            "scale": self.__scale
+        }, self.__image_data
 
     def __post_init__(self) -> None:
         """
-        Reads image from path.
+        Reads image header from path.
 
-        Gets its width, height and color space.
-        Optionally truncates its alpha channel.
+        Gets its width, height and color space
+        without decoding image data (performance improvement).
 
         Returns:
             None.
         """
 
+        self.__stage_cache = LRUCache(
+            consts.imageConsts["StageCacheSize"], consts.imageConsts["StageCacheBudget"]
+        )
+        self.__image_data_raw = None
+        self.__decode_lock = Lock()
+        self.__image_data = None
+        self.__render_id = render_cache.new_owner()
+        self.__render_version = 0
         if not self.path:
             return
-        self.__image_data_raw = np.asarray(imread(self.path))
-        img_info = self.__image_data_raw.shape
+        self.__set_image_info(improps(self.path, index=0).shape)
+
+    def __set_image_info(self, img_info: Tuple[int, ...]) -> None:
+        """
+        Sets width, height and color space from image data shape.
+
+        Alpha channel is not counted in color space.
+
+        Args:
+            img_info: Tuple[int, ...]
+                Shape of image data.
+
+        Returns:
+            None.
+        """
+
         if len(img_info) == 3:
             self.__height, self.__width, self.__color_space = img_info
-            if self.__color_space > 3:
-                self.__image_data_raw = self.__image_data_raw[:, :, :3]
-                self.__color_space = 3
+            self.__color_space = min(self.__color_space, 3)
         else:
             self.__height, self.__width = img_info
             self.__color_space = 1
 
+    def __get_image_data_raw(self) -> np.ndarray:
+        """
+        Decodes image from path on first call.
+
+        Optionally truncates its alpha channel.
+
+        Returns:
+            Read-only raw image data.
+        """
+
+        with self.__decode_lock:
+            if self.__image_data_raw is None:
+                if not self.path:
+                    raise ValueError(f"Image data of {self.name} was released")
+                with instrumentation.stage("image.decode") as stage:
+                    self.__set_image_data_raw(imread(self.path))
+                    stage.nbytes = self.__image_data_raw.nbytes
+            return self.__image_data_raw
+
+    def __set_image_data_raw(self, image_data_raw: np.ndarray) -> None:
+        """
+        Sets decoded image data and its info.
+
+        Truncates alpha channel and makes image data read-only.
+
+        Args:
+            image_data_raw: np.ndarray
+                Decoded image data.
+
+        Returns:
+            None.
+        """
+
+        image_data_raw = np.asarray(image_data_raw)
+        self.__set_image_info(image_data_raw.shape)
+        if image_data_raw.ndim == 3 and image_data_raw.shape[2] > 3:
+            image_data_raw = image_data_raw[:, :, :3]
+        image_data_raw.setflags(write=False)
+        self.__image_data_raw = image_data_raw
+
+    @instrumented("image.convert")
     def convert_to_ascii_art(self) -> None:
         """
         General function for ASCII art conversion.
 
         Updates grayscale_level, applies all effects on image
         and converts it from RGB to grayscale.
+        Reuses cached outputs of pipeline stages
+        which are not affected by changed effect flags
+        (performance improvement).
+        If working_size is set, downsamples image before applying effects
+        (performance improvement).
 
         Returns:
             None.
         """
 
-        self.grayscale_level = self.grayscale_level.strip()
-        if not self.grayscale_level:
-            self.grayscale_level = consts.uiConsts["DefaultGrayscaleLevel"]
-        self.__image_data = self.__image_data_raw.copy()
-        if self.is_negative:
-            self.__image_data = self.__negative(self.__image_data)
-        if self.is_contrast:
-            self.__image_data = self.__contrast(self.__image_data)
-        if self.__color_space > 1:
-            self.__image_data = self.__rgb_to_gray(self.__image_data)
-        if self.is_sharpen:
-            self.__image_data = self.__sharpen(self.__image_data)
-        if self.is_emboss:
-            self.__image_data = self.__emboss(self.__image_data)
-        self.__ascii_data = self.__get_ascii_data()
-        self.__cached_ascii_data = self.__ascii_data.copy()
+        self.set_grayscale_level(self.grayscale_level)
+        self.__scale = self.__compute_scale()
+        self.__image_data = self.__run_pipeline(self.__scale)
+        self.__render_version += 1
+        render_cache.invalidate(self.__render_id)
+        if not self.keep_raw_data:
+            self.release_raw_data()
 
     @format_output_ascii
-    def get_ascii_art(self, win_width: int, win_height: int) -> np.chararray:
+    def get_ascii_art(self, win_width: int, win_height: int) -> Tuple[np.ndarray, str]:
         """
-        If win_width and win_height aren't equal to cached ascii data -
-        it computes ASCII art with size, based on window's and image's sizes, and
-        saves it in cached ascii data (performance improvement).
+        Computes ASCII art with size, based on window's and image's sizes, and
+        saves it in render cache, so recently used sizes are not recomputed
+        (performance improvement).
+        Resamples ASCII data with cached index vectors
+        (performance improvement).
 
         Args:
             win_width: int
@@ -170,17 +714,61 @@ class Image:
             Cached ascii data.
         """
 
-        (ascii_w, ascii_h) = self.__compute_art_size(win_width, win_height)
-        if self.__cached_ascii_data.shape != (ascii_h, ascii_w):
-            self.__cached_ascii_data = np.array([
-                [self.__ascii_data[
-                    int(self.__height * y / ascii_h)
-                ][
-                    int(self.__width * x / ascii_w)
-                ] for x in range(ascii_w)
-                ] for y in range(ascii_h)
-            ]).view(np.chararray)
-        return self.__cached_ascii_data
+        return self.__resize_ascii_data(win_width, win_height)
+
+    @format_output_buffer
+    def get_ascii_art_buffer(self, win_width: int, win_height: int) -> Tuple[np.ndarray, str]:
+        """
+        Same as get_ascii_art, but skips building a string.
+
+        Args:
+            win_width: int
+                Width of window, in which art will be drawn.
+            win_height: int
+                Height of window, in which art will be drawn.
+
+        Returns:
+            Cached ascii data as UTF-8 encoded text buffer.
+        """
+
+        return self.__resize_ascii_data(win_width, win_height)
+
+    def get_color_ascii_art(self, win_width: int, win_height: int,
+                            color_format: str = "ansi") -> str:
+        """
+        Computes colored ASCII art of the same size and glyphs as get_ascii_art.
+
+        Every glyph gets the mean color of the image pixels it covers
+        (with negative and contrast effects applied),
+        rounded to ColorQuantizationStep. Cell colors are saved
+        in render cache, so recently used sizes are not recomputed
+        (performance improvement).
+
+        Args:
+            win_width: int
+                Width of window, in which art will be drawn.
+            win_height: int
+                Height of window, in which art will be drawn.
+            color_format: str
+                "ansi" for terminal escape sequences or "html" for <span> elements.
+
+        Returns:
+            Colored ASCII art (rows separated by newlines).
+
+        Raises:
+            ValueError: If color format is not supported
+                or image data was released and image has no path.
+        """
+
+        (glyphs, symbols) = self.__resize_ascii_data(win_width, win_height)
+        colors = quantize_colors(
+            self.__get_cell_colors(glyphs.shape),
+            consts.imageConsts["ColorQuantizationStep"]
+        )
+        with instrumentation.stage(f"image.color_{color_format}") as stage:
+            art = render_color_ascii_art(glyphs, colors, color_format, symbols)
+            stage.nbytes = len(art)
+        return art
 
     def get_image_data(self) -> np.ndarray:
         """
@@ -214,6 +802,29 @@ class Image:
 
         return self.__color_space
 
+    def set_grayscale_level(self, grayscale_level: str) -> None:
+        """
+        Updates grayscale level.
+
+        Converted image is re-mapped to the new grayscale level lazily
+        from the kept grayscale image data, without running effect pipeline
+        again (performance improvement).
+
+        Args:
+            grayscale_level: str
+                Grayscale level defining symbols from darkest to lightest.
+                Empty string sets default grayscale level.
+
+        Returns:
+            None.
+        """
+
+        grayscale_level = grayscale_level.strip()
+        if not grayscale_level:
+            grayscale_level = consts.uiConsts["DefaultGrayscaleLevel"]
+        self.__grayscale = (grayscale_level, *compile_grayscale_level(grayscale_level))
+        self.grayscale_level = grayscale_level
+
     def set_effect_flags(self,
                          contrast: bool, negative: bool,
                          sharpen: bool, emboss: bool) -> None:
@@ -222,26 +833,356 @@ class Image:
         self.is_sharpen = sharpen
         self.is_emboss = emboss
 
-    def __get_ascii_data(self) -> np.chararray:
+    def release_raw_data(self) -> None:
+        """
+        Releases decoded image and cached pipeline stages.
+
+        Only grayscale image data is kept,
+        image is decoded again if pipeline needs it
+        (images created from_array can't be decoded again).
+
+        Returns:
+            None.
+        """
+
+        with self.__decode_lock:
+            self.__image_data_raw = None
+        self.__stage_cache = LRUCache(
+            consts.imageConsts["StageCacheSize"], consts.imageConsts["StageCacheBudget"]
+        )
+
+    def get_memory_usage(self) -> int:
+        """
+        Returns:
+            Total size of image data held by this image (in bytes).
+            Data shared between pipeline stages is counted once.
+        """
+
+        arrays = {}
+        for array in (
+                self.__image_data_raw,
+                self.__image_data,
+                *self.__stage_cache.values()
+        ):
+            if array is not None:
+                arrays[id(array)] = array.nbytes
+        return sum(arrays.values()) + render_cache.get_owner_nbytes(self.__render_id)
+
+    def get_render_cache_stats(self) -> Dict[str, int]:
+        """
+        Returns:
+            Hits, misses, number of entries and size (in bytes)
+            of this image's rendered outputs in render cache.
+        """
+
+        return render_cache.get_stats(self.__render_id)
+
+    def release_render_cache(self) -> None:
+        """
+        Removes this image's rendered outputs and stats from render cache.
+
+        Should be called when image is discarded.
+
+        Returns:
+            None.
+        """
+
+        render_cache.release_owner(self.__render_id)
+
+    def share_pipeline(self, other: Image or None) -> bool:
+        """
+        Shares decoded image data and cached pipeline stages
+        with another image of the same file.
+
+        Used when the same image is re-converted with different effects
+        (e.g. in preview), so unaffected stages are not recomputed.
+
+        Args:
+            other: Image or None
+                Previously converted image.
+
+        Returns:
+            If pipeline was shared.
+        """
+
+        if other is None or other is self or not self.path or other.path != self.path:
+            return False
+        if other.__image_data_raw is not None:
+            self.__image_data_raw = other.__image_data_raw
+        self.__stage_cache = other.__stage_cache
+        return True
+
+    @staticmethod
+    @instrumented("image.ascii_data")
+    def __get_ascii_data(data: np.ndarray, glyph_lut: np.ndarray) -> np.ndarray:
         """
         Converts image data to ASCII art.
 
         Finds needful ASCII character in grayscale level
         by brightness level of image data's values.
-        Uses NumPy vectorization (performance improvement).
+        Uses compiled grayscale level lookup table,
+        so the whole image is mapped with a single gather
+        (performance improvement).
+
+        Args:
+            data: np.ndarray
+                Grayscale image data.
+            glyph_lut: np.ndarray
+                Compiled grayscale level.
 
         Returns:
-            NumPy char array of image data converted to ASCII art.
+            NumPy uint8 array of image data converted to ASCII art glyph codes.
         """
 
-        grayscale_indices = (
-                self.__image_data.reshape((self.__height, self.__width))
-                / 255.0
-                * (len(self.grayscale_level) - 1)
-        ).astype(np.uint8)
-        # vectorized function (performance improvement)
-        apply_mask_vectorized = np.vectorize(self.__apply_grayscale_mask)
-        return apply_mask_vectorized(grayscale_indices, self.grayscale_level)
+        return glyph_lut[data]
+
+    def __get_full_ascii_data(self) -> Tuple[np.ndarray, str]:
+        """
+        Returns:
+            ASCII art glyph codes in full image size and their symbol table.
+            Processes image in full image size if it was downsampled.
+        """
+
+        (_, glyph_lut, symbols) = self.__grayscale
+        if self.__scale == 1:
+            return self.__get_ascii_data(self.__image_data, glyph_lut), symbols
+        return self.__get_ascii_data(self.__run_full_size_pipeline(), glyph_lut), symbols
+
+    def __compute_scale(self) -> int:
+        """
+        Computes downsampling factor for working_size.
+
+        Returns:
+            The largest factor keeping downsampled image
+            at least as large as working_size (1 if working_size is None).
+        """
+
+        if self.working_size is None:
+            return 1
+        (max_width, max_height) = self.working_size
+        return max(1, min(
+            self.__width // max(1, max_width),
+            self.__height // max(1, max_height)
+        ))
+
+    def __run_pipeline(self, scale: int) -> np.ndarray:
+        """
+        Runs effect pipeline on raw image data.
+
+        Pipeline consists of negative, contrast, grayscale,
+        sharpen and emboss stages (in this order).
+        Output of each applied stage is cached by the downsampling factor
+        and the sequence of stages applied before it,
+        so the pipeline is resumed from the longest cached sequence.
+        Final output is also cached on disk by file contents,
+        so reopening a known image skips decoding and the whole pipeline.
+        Images larger than TileThreshold pixels are processed
+        in row bands by a pool of threads (see process_tiled),
+        caching only the final output.
+
+        Args:
+            scale: int
+                Downsampling factor of raw image data.
+
+        Returns:
+            Grayscale image data with all effects applied.
+        """
+
+        stages = {
+            "negative": self.__negative,
+            "contrast": self.__contrast,
+            "gray": self.__rgb_to_gray,
+            "sharpen": self.__sharpen,
+            "emboss": self.__emboss
+        }
+        applied = tuple(
+            stage for stage, is_applied in zip(stages, (
+                self.is_negative, self.is_contrast,
+                self.__color_space > 1,
+                self.is_sharpen, self.is_emboss
+            )) if is_applied
+        )
+
+        data = None
+        resumed = 0
+        for count in range(len(applied), -1, -1):
+            data = self.__stage_cache.get((scale,) + applied[:count])
+            if data is not None:
+                resumed = count
+                break
+        instrumentation.count("image.stage_cache_resumed", resumed)
+        disk_key = None
+        if resumed < len(applied) or data is None:
+            disk_key = self.__get_disk_cache_key(scale, applied)
+            cached = disk_cache.get(disk_key) if disk_key else None
+            if cached is not None:
+                self.__stage_cache.put((scale,) + applied, cached)
+                return cached
+        is_tiled = (
+                (self.__width // scale) * (self.__height // scale)
+                > consts.imageConsts["TileThreshold"]
+                and (resumed < len(applied) or data is None and scale > 1)
+        )
+        if is_tiled:
+            remaining = applied[resumed:]
+            with instrumentation.stage("image.tiled") as stage:
+                data = process_tiled(
+                    self.__get_image_data_raw() if data is None else data,
+                    scale if data is None else 1,
+                    [stages[stage_name] for stage_name in remaining],
+                    self.__compute_halo(remaining), self.max_workers
+                )
+                stage.nbytes = data.nbytes
+            data.setflags(write=False)
+            self.__stage_cache.put((scale,) + applied, data)
+        else:
+            if data is None:
+                data = self.__get_image_data_raw()
+                if scale > 1:
+                    with instrumentation.stage("image.downsample") as stage:
+                        data = reduce_area(data, scale)
+                        stage.nbytes = data.nbytes
+                    data.setflags(write=False)
+                    self.__stage_cache.put((scale,), data)
+            for count in range(resumed + 1, len(applied) + 1):
+                with instrumentation.stage(f"image.{applied[count - 1]}") as stage:
+                    data = stages[applied[count - 1]](data)
+                    stage.nbytes = data.nbytes
+                data.setflags(write=False)
+                self.__stage_cache.put((scale,) + applied[:count], data)
+        if disk_key:
+            disk_cache.put(disk_key, data)
+        return data
+
+    def __run_full_size_pipeline(self) -> np.ndarray:
+        """
+        Runs effect pipeline in full image size for full-size outputs.
+
+        If raw data is not kept (keep_raw_data is False or it was released),
+        decoded image and pipeline stages in full image size
+        are released right after the pipeline, so a full-size output
+        doesn't leave full-resolution data in memory.
+
+        Returns:
+            Grayscale image data in full image size with all effects applied.
+        """
+
+        is_kept = self.keep_raw_data and self.__image_data_raw is not None
+        data = self.__run_pipeline(1)
+        if not is_kept:
+            self.release_raw_data()
+        return data
+
+    @staticmethod
+    def __compute_halo(applied: Tuple[str, ...]) -> int:
+        """
+        Computes number of neighbouring rows a band needs
+        to be processed independently.
+
+        Args:
+            applied: Tuple[str, ...]
+                Names of applied pipeline stages.
+
+        Returns:
+            Sum of kernel radii of all applied kernel-based stages.
+        """
+
+        kernels = {
+            "sharpen": consts.imageConsts["SharpenKernel"],
+            "emboss": consts.imageConsts["EmbossKernel"]
+        }
+        return sum(len(kernels[stage]) // 2 for stage in applied if stage in kernels)
+
+    def __get_disk_cache_key(self, scale: int, applied: Tuple[str, ...]) -> str or None:
+        """
+        Computes disk cache key of pipeline output.
+
+        Key consists of image file's content hash, downsampling factor
+        and applied stages. Grayscale level is not a part of the key,
+        because it's applied on the cached output without running pipeline.
+
+        Args:
+            scale: int
+                Downsampling factor of raw image data.
+            applied: Tuple[str, ...]
+                Names of applied pipeline stages.
+
+        Returns:
+            Disk cache key or None if image has no readable file.
+        """
+
+        if not self.path or not disk_cache.enabled:
+            return None
+        try:
+            content_hash = hash_file_contents(self.path)
+        except OSError:
+            return None
+        return (f"{consts.imageConsts['DiskCacheVersion']}:{content_hash}:"
+                f"{scale}:{','.join(applied)}")
+
+    def __resize_ascii_data(self, win_width: int, win_height: int) -> Tuple[np.ndarray, str]:
+        """
+        Resizes ASCII data to fit in window and caches the result
+        in render cache by ASCII art size and grayscale level.
+
+        Args:
+            win_width: int
+                Width of window, in which art will be drawn.
+            win_height: int
+                Height of window, in which art will be drawn.
+
+        Returns:
+            Cached ascii data and symbol table of its glyph codes.
+        """
+
+        (ascii_w, ascii_h) = self.__compute_art_size(win_width, win_height)
+        (grayscale_level, glyph_lut, symbols) = self.__grayscale
+        key = (self.__render_version, ascii_w, ascii_h, grayscale_level)
+        ascii_data = render_cache.get(self.__render_id, key)
+        if ascii_data is None:
+            with instrumentation.stage("image.resize") as stage:
+                rows, cols = compute_resample_indices(
+                    self.__image_data.shape, (ascii_h, ascii_w)
+                )
+                ascii_data = self.__get_ascii_data(self.__image_data[rows, cols], glyph_lut)
+                stage.nbytes = ascii_data.nbytes
+            ascii_data.setflags(write=False)
+            render_cache.put(self.__render_id, key, ascii_data)
+        return ascii_data, symbols
+
+    def __get_cell_colors(self, shape: Tuple[int, int]) -> np.ndarray:
+        """
+        Computes mean colors of ASCII art cells from raw image data
+        and caches them in render cache by ASCII art size.
+        If raw data is not kept (keep_raw_data is False or it was released),
+        image decoded for colors is released right after.
+
+        Args:
+            shape: Tuple[int, int]
+                Height and width of ASCII art.
+
+        Returns:
+            Cached RGB colors (uint8) of every cell.
+        """
+
+        key = ("color", self.__render_version) + tuple(shape)
+        colors = render_cache.get(self.__render_id, key)
+        if colors is None:
+            with instrumentation.stage("image.cell_colors") as stage:
+                is_kept = self.keep_raw_data and self.__image_data_raw is not None
+                data = self.__get_image_data_raw()
+                rows, cols = compute_resample_indices(data.shape[:2], tuple(shape))
+                colors = compute_cell_colors(data, rows, cols)
+                if not is_kept:
+                    self.release_raw_data()
+                if self.is_negative:
+                    colors = self.__negative(colors)
+                if self.is_contrast:
+                    colors = self.__contrast(colors)
+                stage.nbytes = colors.nbytes
+            colors.setflags(write=False)
+            render_cache.put(self.__render_id, key, colors)
+        return colors
 
     def __compute_art_size(self,
                            win_width: int,
@@ -349,35 +1290,21 @@ class Image:
         """
         Helper function for computing image kernel.
 
-        Uses discrete Fourier Transform
-        and applies kernel-based (sharpen, emboss etc.) effects.
+        Applies kernel-based (sharpen, emboss etc.) effects
+        with direct integer convolution (or discrete Fourier Transform
+        for large kernels).
 
         Args:
             data: np.ndarray
                 Image data.
             kernel: np.ndarray
-                3x3 effect kernel.
+                Effect kernel.
 
         Returns:
             Kernelized image data with applied kernel-based effect.
         """
 
-        new_kernel_size = (
-            data.shape[0] - kernel.shape[0],
-            data.shape[1] - kernel.shape[1]
-        )
-        kernel_padding = (
-            ((new_kernel_size[0] + 1) // 2, new_kernel_size[0] // 2),
-            ((new_kernel_size[1] + 1) // 2, new_kernel_size[1] // 2)
-        )
-        padded_kernel = np.pad(kernel, kernel_padding)
-        # move FFT origin to the middle
-        shifted_kernel = fft.ifftshift(padded_kernel)
-
-        kernelized = np.real(
-            fft.ifft2(fft.fft2(data) * fft.fft2(shifted_kernel))
-        )
-        return np.clip(kernelized, 0, 255).astype(np.ubyte)
+        return convolve(data, kernel)
 
     @staticmethod
     def __rgb_to_gray(data: np.ndarray) -> np.ndarray:
@@ -387,6 +1314,9 @@ class Image:
         Uses perceptual luminance-preserving conversion algorithm
         so grayscale image would preserve brightness measure
         (much better for ASCII representation).
+        Linearizes channels with precompiled lookup table,
+        so no floating-point copy of RGB data is created
+        (performance improvement).
 
         Args:
             data: np.ndarray
@@ -396,31 +1326,9 @@ class Image:
             Grayscale image data with 1 gray channel.
         """
 
-        gamma_compressed = data / 255.0
-        linear = np.where(
-            gamma_compressed <= 0.04045,
-            gamma_compressed / 12.92,
-            ((gamma_compressed + 0.055) / 1.055) ** 2.4
-        )
-        linear_luminance = linear @ np.array(
-            consts.imageConsts["LuminanceCoefficients"]
-        ).T
-        return (linear_luminance * 255).astype(np.ubyte)
-
-    @staticmethod
-    def __apply_grayscale_mask(index: int, grayscale_level: str) -> str:
-        """
-        Helper function for mapping grayscale level symbol
-        to image data values' brightness.
-
-        Args:
-            index: int
-                Relation between brightness of image data and grayscale level.
-            grayscale_level: str
-                Grayscale level defining symbols from darkest to lightest.
-
-        Returns:
-            Image's gray pixel represented as ASCII symbol.
-        """
-
-        return grayscale_level[index]
+        table = compile_luminance_table()
+        linear_luminance = table[0][data[:, :, 0]]
+        linear_luminance += table[1][data[:, :, 1]]
+        linear_luminance += table[2][data[:, :, 2]]
+        linear_luminance *= 255
+        return linear_luminance.astype(np.ubyte)
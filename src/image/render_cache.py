@@ -0,0 +1,243 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from itertools import count
+from threading import Lock
+from typing import Dict, Hashable, Iterator, Optional
+
+import numpy as np
+
+from src.util import consts
+
+
+class RenderCache:
+    """
+    Rendered ASCII art of all images.
+
+    Keeps a small least recently used set of rendered outputs per image
+    and evicts the least recently used outputs of all images
+    when their total size exceeds the global byte budget.
+
+    Attributes:
+        max_bytes: int
+            Global budget of cached outputs (in bytes).
+        max_entries: int
+            Maximum number of cached outputs per image.
+        hits: int
+            Number of outputs served from cache.
+        misses: int
+            Number of outputs not found in cache.
+        __entries: OrderedDict[Tuple[int, Hashable], np.ndarray]
+            Outputs of all images from least to most recently used.
+        __owners: Dict[int, OrderedDict[Hashable, None]]
+            Keys of outputs of each image from least to most recently used.
+        __owner_stats: Dict[int, List[int]]
+            Hits and misses of each image.
+        __nbytes: int
+            Total size of cached outputs (in bytes).
+        __owner_ids: Iterator[int]
+            Generator of image identifiers.
+        __lock: Lock
+            Guards cache against concurrent access.
+    """
+
+    max_bytes: int
+    max_entries: int
+    hits: int
+    misses: int
+    __entries: OrderedDict
+    __owners: Dict[int, OrderedDict]
+    __owner_stats: Dict[int, list]
+    __nbytes: int
+    __owner_ids: Iterator[int]
+    __lock: Lock
+
+    def __init__(self, max_bytes: int, max_entries: int) -> None:
+        """Cache initialization."""
+
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.__entries = OrderedDict()
+        self.__owners = {}
+        self.__owner_stats = {}
+        self.__nbytes = 0
+        self.__owner_ids = count()
+        self.__lock = Lock()
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Returns:
+            Total size of cached outputs (in bytes).
+        """
+
+        return self.__nbytes
+
+    def new_owner(self) -> int:
+        """
+        Returns:
+            New unique identifier of image caching its outputs.
+        """
+
+        return next(self.__owner_ids)
+
+    def get(self, owner: int, key: Hashable) -> Optional[np.ndarray]:
+        """
+        Looks up an output and marks it as most recently used.
+
+        Args:
+            owner: int
+                Image identifier.
+            key: Hashable
+                Output key.
+
+        Returns:
+            Cached output or None.
+        """
+
+        with self.__lock:
+            stats = self.__owner_stats.setdefault(owner, [0, 0])
+            value = self.__entries.get((owner, key))
+            if value is None:
+                self.misses += 1
+                stats[1] += 1
+                return None
+            self.hits += 1
+            stats[0] += 1
+            self.__entries.move_to_end((owner, key))
+            self.__owners[owner].move_to_end(key)
+            return value
+
+    def put(self, owner: int, key: Hashable, value: np.ndarray) -> None:
+        """
+        Caches an output and evicts outputs over per-image limit
+        and global budget.
+
+        Args:
+            owner: int
+                Image identifier.
+            key: Hashable
+                Output key.
+            value: np.ndarray
+                Rendered output.
+
+        Returns:
+            None.
+        """
+
+        with self.__lock:
+            self.__remove(owner, key)
+            keys = self.__owners.setdefault(owner, OrderedDict())
+            keys[key] = None
+            self.__entries[(owner, key)] = value
+            self.__nbytes += value.nbytes
+            while len(keys) > self.max_entries:
+                self.__remove(owner, next(iter(keys)))
+            while self.__nbytes > self.max_bytes and self.__entries:
+                self.__remove(*next(iter(self.__entries)))
+
+    def invalidate(self, owner: int) -> None:
+        """
+        Removes all outputs of an image.
+
+        Args:
+            owner: int
+                Image identifier.
+
+        Returns:
+            None.
+        """
+
+        with self.__lock:
+            for key in list(self.__owners.get(owner, ())):
+                self.__remove(owner, key)
+
+    def release_owner(self, owner: int) -> None:
+        """
+        Removes all outputs and stats of an image, which is discarded.
+
+        Args:
+            owner: int
+                Image identifier.
+
+        Returns:
+            None.
+        """
+
+        with self.__lock:
+            for key in list(self.__owners.get(owner, ())):
+                self.__remove(owner, key)
+            self.__owner_stats.pop(owner, None)
+
+    def get_owner_nbytes(self, owner: int) -> int:
+        """
+        Args:
+            owner: int
+                Image identifier.
+
+        Returns:
+            Total size of image's cached outputs (in bytes).
+        """
+
+        with self.__lock:
+            return sum(
+                self.__entries[(owner, key)].nbytes
+                for key in self.__owners.get(owner, ())
+            )
+
+    def get_stats(self, owner: Optional[int] = None) -> Dict[str, int]:
+        """
+        Args:
+            owner: int or None
+                Image identifier or None for all images.
+
+        Returns:
+            Hits, misses, number of entries and size (in bytes)
+            of cached outputs.
+        """
+
+        with self.__lock:
+            if owner is None:
+                return {
+                    "hits": self.hits, "misses": self.misses,
+                    "entries": len(self.__entries), "bytes": self.__nbytes
+                }
+            hits, misses = self.__owner_stats.get(owner, (0, 0))
+            keys = self.__owners.get(owner, ())
+            return {
+                "hits": hits, "misses": misses, "entries": len(keys),
+                "bytes": sum(self.__entries[(owner, key)].nbytes for key in keys)
+            }
+
+    def __remove(self, owner: int, key: Hashable) -> None:
+        """
+        Removes an output if cached.
+        Should be called with lock held.
+
+        Args:
+            owner: int
+                Image identifier.
+            key: Hashable
+                Output key.
+
+        Returns:
+            None.
+        """
+
+        value = self.__entries.pop((owner, key), None)
+        if value is None:
+            return
+        self.__nbytes -= value.nbytes
+        keys = self.__owners[owner]
+        del keys[key]
+        if not keys:
+            del self.__owners[owner]
+
+
+render_cache = RenderCache(
+    consts.imageConsts["RenderCacheBudget"],
+    consts.imageConsts["RenderCacheSize"]
+)
+"""Render cache shared by all images."""
@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import json
+import os
+import struct
+import tempfile
+from typing import Any, BinaryIO, Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from .frames import FrameSequence
+from .image import Image
+
+SESSION_MAGIC = b"ASCIIART-SESSION"
+"""Signature at the start of every session file."""
+
+SESSION_VERSION = 1
+"""Version of session file format."""
+
+SESSION_EXTENSION = ".asciiart"
+"""File extension of session files."""
+
+PLANE_ALIGNMENT = 4096
+"""Alignment of image data planes in session file (page size)."""
+
+
+def save_session(path: str, images: Iterable[Image or FrameSequence]) -> None:
+    """
+    Saves converted images into session file.
+
+    Session file consists of SESSION_MAGIC, size of JSON header (uint64),
+    JSON header with metadata of all images and page-aligned raw planes
+    of their grayscale image data.
+    File is written to a temporary file and atomically renamed.
+
+    Args:
+        path: str
+            Path to session file.
+        images: Iterable[Image or FrameSequence]
+            Converted images.
+
+    Returns:
+        None.
+
+    Raises:
+        ValueError: If an image is not converted.
+    """
+
+    entries = []
+    planes = []
+    offset = 0
+    for image in images:
+        metadata, data = image.to_session()
+        is_sequence = isinstance(image, FrameSequence)
+        image_planes = data if is_sequence else [data]
+        metadata["type"] = "frames" if is_sequence else "image"
+        metadata["planes"] = []
+        for plane in image_planes:
+            metadata["planes"].append({
+                "offset": offset, "shape": list(plane.shape), "dtype": plane.dtype.str
+            })
+            planes.append(plane)
+            offset = _align(offset + plane.nbytes)
+        entries.append(metadata)
+
+    header = json.dumps({"version": SESSION_VERSION, "images": entries}).encode()
+    data_offset = _align(len(SESSION_MAGIC) + 8 + len(header))
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(SESSION_MAGIC)
+            f.write(struct.pack("<Q", len(header)))
+            f.write(header)
+            for plane, metadata in zip(planes, _iter_planes_metadata(entries)):
+                _pad(f, data_offset + metadata["offset"])
+                f.write(np.ascontiguousarray(plane).data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def load_session(path: str) -> List[Image or FrameSequence]:
+    """
+    Loads images from session file.
+
+    Image data planes are memory-mapped, not read,
+    so pages are loaded from disk only when ASCII art is drawn from them.
+
+    Args:
+        path: str
+            Path to session file.
+
+    Returns:
+        Converted images in saved order.
+
+    Raises:
+        ValueError: If file is not a supported session file.
+    """
+
+    with open(path, "rb") as f:
+        if f.read(len(SESSION_MAGIC)) != SESSION_MAGIC:
+            raise ValueError(f"Not a session file: {path}")
+        (header_size,) = struct.unpack("<Q", f.read(8))
+        header = json.loads(f.read(header_size))
+    if header.get("version") != SESSION_VERSION:
+        raise ValueError(f"Unsupported session file version: {header.get('version')}")
+    data_offset = _align(len(SESSION_MAGIC) + 8 + header_size)
+    buffer = np.memmap(path, dtype=np.uint8, mode="r") \
+        if os.path.getsize(path) > data_offset else np.empty(0, dtype=np.uint8)
+
+    images = []
+    for metadata in header["images"]:
+        planes = [
+            _map_plane(buffer, data_offset, plane_metadata)
+            for plane_metadata in metadata["planes"]
+        ]
+        if metadata["type"] == "frames":
+            images.append(FrameSequence.from_session(metadata, planes))
+        else:
+            images.append(Image.from_session(metadata, planes[0]))
+    return images
+
+
+def _map_plane(buffer: np.ndarray, data_offset: int,
+               metadata: Dict[str, Any]) -> np.ndarray:
+    """
+    Helper function for viewing image data plane in memory-mapped file.
+
+    Args:
+        buffer: np.ndarray
+            Memory-mapped session file.
+        data_offset: int
+            Offset of planes section.
+        metadata: Dict[str, Any]
+            Plane's offset, shape and dtype.
+
+    Returns:
+        Read-only view of the plane (no data is read).
+    """
+
+    dtype = np.dtype(metadata["dtype"])
+    shape: Tuple[int, ...] = tuple(metadata["shape"])
+    start = data_offset + metadata["offset"]
+    size = int(np.prod(shape)) * dtype.itemsize
+    return buffer[start:start + size].view(dtype).reshape(shape)
+
+
+def _iter_planes_metadata(entries: List[Dict[str, Any]]):
+    """
+    Args:
+        entries: List[Dict[str, Any]]
+            Metadata of all images.
+
+    Returns:
+        Iterator of metadata of all planes in file order.
+    """
+
+    for metadata in entries:
+        yield from metadata["planes"]
+
+
+def _align(offset: int) -> int:
+    """
+    Args:
+        offset: int
+            File offset.
+
+    Returns:
+        The nearest PLANE_ALIGNMENT multiple not less than offset.
+    """
+
+    return -(-offset // PLANE_ALIGNMENT) * PLANE_ALIGNMENT
+
+
+def _pad(f: BinaryIO, offset: int) -> None:
+    """
+    Helper function for padding file with zeros up to offset.
+
+    Args:
+        f: BinaryIO
+            Opened file.
+        offset: int
+            File offset to pad to.
+
+    Returns:
+        None.
+    """
+
+    f.write(bytes(offset - f.tell()))
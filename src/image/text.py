@@ -0,0 +1,100 @@
+from functools import lru_cache
+from typing import Dict
+
+import numpy as np
+
+NEWLINE_CODE = ord('\n')
+"""Glyph code of the line separator."""
+
+CODE_ENCODING = "latin-1"
+"""Encoding of glyph codes (every glyph code is a single byte)."""
+
+TEXT_ENCODING = "utf-8"
+"""Encoding of ASCII art text buffers and exported files."""
+
+
+def symbol_code(index: int) -> int:
+    """
+    Args:
+        index: int
+            Index of symbol in the symbol table (less than 255).
+
+    Returns:
+        Glyph code of symbol (NEWLINE_CODE is skipped).
+    """
+
+    return index + (index >= NEWLINE_CODE)
+
+
+@lru_cache(maxsize=32)
+def compile_symbol_table(symbols: str) -> Dict[int, str]:
+    """
+    Compiles symbol table into a str.translate table,
+    which maps glyph codes to the symbols.
+
+    Args:
+        symbols: str
+            Symbols of glyph codes (see symbol_code).
+
+    Returns:
+        Translation table (cached for each symbol table).
+    """
+
+    return {symbol_code(index): symbol for index, symbol in enumerate(symbols)}
+
+
+def encode_ascii_art(data: np.ndarray, trailing_newline: bool = False,
+                     symbols: str = "") -> memoryview:
+    """
+    Encodes ASCII art glyph codes into a text buffer.
+
+    Appends newlines to the glyph codes as an extra column,
+    so the whole text of ASCII glyphs is built with a single buffer copy
+    and no per-character work.
+
+    Args:
+        data: np.ndarray
+            2D NumPy uint8 array of glyph codes.
+        trailing_newline: bool
+            Flag, which indicates if the last row is followed by newline
+            (used when text is encoded in chunks of rows).
+        symbols: str
+            Symbol table of glyph codes.
+            Empty string if glyph codes are ASCII characters themselves.
+
+    Returns:
+        Read-only buffer of UTF-8 encoded text
+        (rows separated by newlines).
+    """
+
+    height, width = data.shape
+    if height == 0:
+        return memoryview(b"")
+    text = np.empty((height, width + 1), dtype=np.uint8)
+    text[:, :width] = data
+    text[:, width] = NEWLINE_CODE
+    buffer = memoryview(text.reshape(-1))
+    buffer = buffer if trailing_newline else buffer[:-1]
+    if symbols:
+        translated = str(buffer, CODE_ENCODING).translate(compile_symbol_table(symbols))
+        return memoryview(translated.encode(TEXT_ENCODING))
+    return buffer.toreadonly()
+
+
+def decode_ascii_art(data: np.ndarray, symbols: str = "") -> str:
+    """
+    Decodes ASCII art glyph codes into a string.
+
+    Args:
+        data: np.ndarray
+            2D NumPy uint8 array of glyph codes.
+        symbols: str
+            Symbol table of glyph codes.
+            Empty string if glyph codes are ASCII characters themselves.
+
+    Returns:
+        ASCII art as string (rows separated by newlines).
+    """
+
+    text = str(encode_ascii_art(data), CODE_ENCODING)
+    return text.translate(compile_symbol_table(symbols)) if symbols else text
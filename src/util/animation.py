@@ -0,0 +1,287 @@
+from __future__ import annotations
+
+import time
+import traceback
+from collections import deque
+from threading import Condition, Thread, Event
+from typing import Callable, List, Optional
+
+from . import consts
+from .instrumentation import instrumentation
+
+
+class FrameCache:
+    """
+    Pre-rendered animation frames.
+
+    Frames are rendered ahead of playback in a background prefetcher thread,
+    so the player only hands ready text over. At most window frames
+    are kept: the prefetcher runs at most window ticks ahead of the player
+    and drops the oldest rendered frame (already played) for every new one,
+    so animations of any length are played in bounded memory.
+    Animations of at most window frames are rendered only once.
+
+    Attributes:
+        __render: Callable[[int], str]
+            Renders frame at the given playback position.
+        __window: int
+            Maximum number of rendered frames kept.
+        __frames: List[str or None]
+            Rendered frames (None if not rendered or dropped).
+        __ready: List[Event]
+            Events set when the corresponding frame is rendered.
+        __tick: int
+            Latest playback tick requested by the player.
+        __condition: Condition
+            Wakes the prefetcher when the player advances.
+        __stop_event: Event
+            Prefetcher thread stop event.
+        __thread: Thread
+            Prefetcher thread.
+    """
+
+    __render: Callable[[int], str]
+    __window: int
+    __frames: List[Optional[str]]
+    __ready: List[Event]
+    __tick: int
+    __condition: Condition
+    __stop_event: Event
+    __thread: Thread
+
+    def __init__(self, frame_count: int, render: Callable[[int], str],
+                 window: Optional[int] = None) -> None:
+        """Frame cache initialization."""
+
+        self.__render = render
+        self.__window = max(window or consts.uiConsts["AnimationPrefetchFrames"], 1)
+        self.__frames = [None] * frame_count
+        self.__ready = [Event() for _ in range(frame_count)]
+        self.__tick = 0
+        self.__condition = Condition()
+        self.__stop_event = Event()
+        self.__thread = Thread(target=self.__prefetch, daemon=True)
+
+    def __len__(self) -> int:
+        """
+        x.__len__() <==> len(x)
+
+        Returns:
+            Number of frames.
+        """
+
+        return len(self.__frames)
+
+    def start(self) -> None:
+        """
+        Starts rendering frames in background.
+
+        Returns:
+            None.
+        """
+
+        self.__thread.start()
+
+    def stop(self) -> None:
+        """
+        Stops rendering frames and waits for the prefetcher thread.
+
+        Returns:
+            None.
+        """
+
+        self.__stop_event.set()
+        with self.__condition:
+            self.__condition.notify()
+        if self.__thread.is_alive():
+            self.__thread.join()
+
+    def get(self, tick: int, timeout: float = 0.0) -> Optional[str]:
+        """
+        Args:
+            tick: int
+                Playback tick (frame's playback position
+                counted over all loops of the animation).
+            timeout: float
+                Maximum time (in seconds) to wait for the frame to be rendered.
+
+        Returns:
+            Rendered frame or None if it's not rendered in time.
+        """
+
+        with self.__condition:
+            if tick > self.__tick:
+                self.__tick = tick
+                self.__condition.notify()
+        position = tick % len(self.__frames)
+        if self.__ready[position].wait(max(0.0, timeout)):
+            return self.__frames[position]
+        return None
+
+    def __prefetch(self) -> None:
+        """
+        Function used in prefetcher thread.
+
+        Renders frames in playback order up to window ticks ahead of the player,
+        skipping frames the player has already passed.
+
+        Returns:
+            None.
+        """
+
+        rendered = deque()
+        tick = 0
+        while self.__frames:
+            with self.__condition:
+                self.__condition.wait_for(
+                    lambda: self.__stop_event.is_set() or tick < self.__tick + self.__window
+                )
+                tick = max(tick, self.__tick)
+            if self.__stop_event.is_set():
+                return
+            position = tick % len(self.__frames)
+            tick += 1
+            if self.__frames[position] is not None:
+                continue
+            try:
+                with instrumentation.stage("animation.render") as stage:
+                    self.__frames[position] = self.__render(position)
+                    stage.nbytes = len(self.__frames[position])
+            except Exception:
+                traceback.print_exc()
+                self.__frames[position] = ""
+            self.__ready[position].set()
+            rendered.append(position)
+            if len(rendered) > self.__window:
+                dropped = rendered.popleft()
+                self.__ready[dropped].clear()
+                self.__frames[dropped] = None
+
+
+class AnimationPlayer:
+    """
+    Drift-free animation player.
+
+    Schedules frames against a monotonic clock:
+    frame k is due at start + k * duration regardless of how long
+    handing previous frames over took. Frames that are not rendered
+    until their slot ends are dropped instead of delaying playback.
+
+    Attributes:
+        __frames: FrameCache
+            Pre-rendered frames.
+        __duration: float
+            Delay between animation frames (in seconds).
+        __on_frame: Callable[[int, str], None]
+            Called (in player thread) with playback position and frame.
+        __stop_event: Event
+            Player thread stop event.
+        __thread: Thread
+            Player thread.
+        __start_time: float
+            Monotonic time of playback start.
+        __stop_time: float or None
+            Monotonic time of playback stop.
+        shown_frames: int
+            Number of frames handed over.
+        dropped_frames: int
+            Number of frames skipped to keep up with the clock.
+    """
+
+    __frames: FrameCache
+    __duration: float
+    __on_frame: Callable[[int, str], None]
+    __stop_event: Event
+    __thread: Thread
+    __start_time: float
+    __stop_time: Optional[float]
+    shown_frames: int
+    dropped_frames: int
+
+    def __init__(self, frames: FrameCache, duration: float,
+                 on_frame: Callable[[int, str], None]) -> None:
+        """Player initialization."""
+
+        self.__frames = frames
+        self.__duration = max(duration, 1e-3)
+        self.__on_frame = on_frame
+        self.__stop_event = Event()
+        self.__thread = Thread(target=self.__play, daemon=True)
+        self.__start_time = time.monotonic()
+        self.__stop_time = None
+        self.shown_frames = 0
+        self.dropped_frames = 0
+
+    @property
+    def fps(self) -> float:
+        """
+        Returns:
+            Achieved frames per second.
+        """
+
+        end_time = self.__stop_time if self.__stop_time is not None else time.monotonic()
+        elapsed = end_time - self.__start_time
+        return self.shown_frames / elapsed if elapsed > 0 else 0.0
+
+    def is_alive(self) -> bool:
+        """
+        Returns:
+            If player is playing.
+        """
+
+        return self.__thread.is_alive()
+
+    def start(self) -> None:
+        """
+        Starts frame prefetching and playback.
+
+        Returns:
+            None.
+        """
+
+        self.__frames.start()
+        self.__start_time = time.monotonic()
+        self.__thread.start()
+
+    def stop(self) -> None:
+        """
+        Stops playback and frame prefetching.
+
+        Returns:
+            None.
+        """
+
+        self.__stop_event.set()
+        if self.__thread.is_alive():
+            self.__thread.join()
+        self.__frames.stop()
+
+    def __play(self) -> None:
+        """
+        Function used in player thread.
+
+        Loops over all frames until stopped.
+
+        Returns:
+            None.
+        """
+
+        frame_count = len(self.__frames)
+        last_tick = -1
+        while frame_count and not self.__stop_event.is_set():
+            now = time.monotonic()
+            tick = int((now - self.__start_time) / self.__duration)
+            self.dropped_frames += max(0, tick - last_tick - 1)
+            instrumentation.count("animation.dropped", max(0, tick - last_tick - 1))
+            last_tick = tick
+            deadline = self.__start_time + (tick + 1) * self.__duration
+            frame = self.__frames.get(tick, deadline - now)
+            if frame is None or self.__stop_event.is_set():
+                self.dropped_frames += frame is None
+                instrumentation.count("animation.dropped", frame is None)
+            else:
+                self.__on_frame(tick % frame_count, frame)
+                self.shown_frames += 1
+                instrumentation.count("animation.shown")
+            self.__stop_event.wait(max(0.0, deadline - time.monotonic()))
+        self.__stop_time = time.monotonic()
@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Hashable, List, Optional
+
+
+class LRUCache:
+    """
+    Thread-safe least recently used cache.
+
+    Evicts least recently used entries when the number of entries
+    or their total size exceeds the given limits.
+
+    Attributes:
+        max_entries: int
+            Maximum number of cached entries.
+        max_bytes: int or None
+            Maximum total size of cached entries (in bytes).
+            Entry size is taken from its nbytes attribute (or len()).
+            None means no size limit.
+        hits: int
+            Number of successful lookups.
+        misses: int
+            Number of failed lookups.
+        __entries: OrderedDict[Hashable, Any]
+            Cached entries from least to most recently used.
+        __nbytes: int
+            Total size of cached entries (in bytes).
+        __lock: Lock
+            Guards entries against concurrent access.
+    """
+
+    max_entries: int
+    max_bytes: Optional[int]
+    hits: int
+    misses: int
+    __entries: OrderedDict
+    __nbytes: int
+    __lock: Lock
+
+    def __init__(self, max_entries: int, max_bytes: Optional[int] = None) -> None:
+        """Cache initialization."""
+
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.__entries = OrderedDict()
+        self.__nbytes = 0
+        self.__lock = Lock()
+
+    def __len__(self) -> int:
+        """
+        x.__len__() <==> len(x)
+
+        Returns:
+            Number of cached entries.
+        """
+
+        return len(self.__entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        """
+        if x.__contains__(y) <==> if y in x
+
+        Args:
+            key: Hashable
+                Entry key.
+
+        Returns:
+            If entry is cached (does not affect recency).
+        """
+
+        return key in self.__entries
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Returns:
+            Total size of cached entries (in bytes).
+        """
+
+        return self.__nbytes
+
+    def values(self) -> List[Any]:
+        """
+        Returns:
+            Snapshot of cached entries (does not affect recency).
+        """
+
+        with self.__lock:
+            return list(self.__entries.values())
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Looks up an entry and marks it as most recently used.
+
+        Args:
+            key: Hashable
+                Entry key.
+
+        Returns:
+            Cached entry or None.
+        """
+
+        with self.__lock:
+            value = self.__entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.__entries.move_to_end(key)
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """
+        Caches an entry and evicts least recently used entries over limits.
+
+        Args:
+            key: Hashable
+                Entry key.
+            value: Any
+                Entry to cache.
+
+        Returns:
+            None.
+        """
+
+        with self.__lock:
+            if key in self.__entries:
+                self.__nbytes -= self.__sizeof(self.__entries.pop(key))
+            self.__entries[key] = value
+            self.__nbytes += self.__sizeof(value)
+            while self.__entries and (
+                    len(self.__entries) > self.max_entries
+                    or (self.max_bytes is not None and self.__nbytes > self.max_bytes)
+            ):
+                _, evicted = self.__entries.popitem(last=False)
+                self.__nbytes -= self.__sizeof(evicted)
+
+    def clear(self) -> None:
+        """
+        Removes all entries.
+
+        Returns:
+            None.
+        """
+
+        with self.__lock:
+            self.__entries.clear()
+            self.__nbytes = 0
+
+    @staticmethod
+    def __sizeof(value: Any) -> int:
+        """
+        Helper function for computing entry size.
+
+        Args:
+            value: Any
+                Cached entry.
+
+        Returns:
+            Entry size (in bytes).
+        """
+
+        nbytes = getattr(value, "nbytes", None)
+        return nbytes if nbytes is not None else len(value)
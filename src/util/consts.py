@@ -1,4 +1,6 @@
 """Constant values used in user interface."""
+import os
+
 uiConsts = {
     "ApplicationMinWidth": 800,
     "ApplicationMinHeight": 600,
@@ -22,6 +24,9 @@ uiConsts = {
     "AddImageDialogPathBoxRightMargin": 8,
     "DefaultArtSize": 10,
     "DefaultAnimationDuration": 0.5,
+    "RenderDebounceDelay": 0.15,
+    "CoarseRenderScale": 3,
+    "AnimationPrefetchFrames": 32,
 
     "ProjectName": "ASCII Art",
     "AuthorName": "Ivan Menshikov",
@@ -30,6 +35,9 @@ uiConsts = {
     "PlayButtonText": "Play animation",
     "StopButtonText": "Stop animation",
     "SettingsText": "Settings",
+    "OpenSessionText": "Open session",
+    "SaveSessionText": "Save session",
+    "SessionFilesFilter": "Sessions (*.asciiart)",
     "AddImgButtonText": "Add image",
     "AddImgEffectsText": "Image effects",
     "AddImgContrastEffectText": "Contrast",
@@ -55,7 +63,8 @@ uiConsts = {
     "AddImageDialogRequiredTooltip": "Required field",
     "SliderTooltip": "Art size",
     "AnimationDuration": "Animation duration",
-    "SupportedImageFormats": "*.pgm *.ppm *.jpg *.jpeg *.png",
+    "SupportedImageFormats": "*.pgm *.ppm *.jpg *.jpeg *.png *.gif",
+    "SupportedVideoFormats": "*.mp4 *.avi *.mov *.mkv *.webm",
 
     "DrawerButtonImgSrc": "../../drawable/menu.svg",
     "PlayButtonImgSrc": "../../drawable/play.svg",
@@ -85,5 +94,22 @@ imageConsts = {
         [-1, 5, -1],
         [0, -1, 0]
     ],
-    "LuminanceCoefficients": [0.2126, 0.7152, 0.0722]
+    "LuminanceCoefficients": [0.2126, 0.7152, 0.0722],
+    "StageCacheSize": 6,
+    "StageCacheBudget": 256 * 1024 * 1024,
+    "DirectConvolutionMaxKernelSize": 7,
+    "RenderCacheSize": 8,
+    "RenderCacheBudget": 64 * 1024 * 1024,
+    "ExportChunkSize": 1024 * 1024,
+    "FrameBufferSize": 16,
+    "FrameWindowSize": 32,
+    "DiskCacheDir": os.path.join(
+        os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+        "ascii-art"
+    ),
+    "DiskCacheBudget": 512 * 1024 * 1024,
+    "DiskCacheVersion": 1,
+    "TileThreshold": 4096 * 4096,
+    "TilePixels": 1024 * 1024,
+    "ColorQuantizationStep": 8
 }
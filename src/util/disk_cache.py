@@ -0,0 +1,269 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+from functools import lru_cache
+from threading import Lock
+from typing import List, Optional
+
+import numpy as np
+
+from . import consts
+from .instrumentation import instrumentation
+
+
+@lru_cache(maxsize=256)
+def hash_file(path: str, size: int, mtime_ns: int) -> str:
+    """
+    Hashes file contents.
+
+    Hashes are cached by path, size and modification time,
+    so unchanged files are read only once per process.
+
+    Args:
+        path: str
+            Path to file.
+        size: int
+            File size (part of the cache key).
+        mtime_ns: int
+            File modification time (part of the cache key).
+
+    Returns:
+        Hex digest of file contents.
+    """
+
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def hash_file_contents(path: str) -> str:
+    """
+    Args:
+        path: str
+            Path to file.
+
+    Returns:
+        Hex digest of file contents.
+    """
+
+    stat = os.stat(path)
+    return hash_file(os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+
+
+class DiskCache:
+    """
+    Size-bounded least recently used cache of NumPy arrays on disk.
+
+    Every entry is a single .npy file named by the hash of its key.
+    Entries are written to a temporary file and atomically renamed,
+    so readers (also in other processes) never see a partial entry.
+    File modification time marks recency: hits touch the file
+    and the least recently used files are removed
+    when their total size exceeds max_bytes.
+
+    Attributes:
+        directory: str
+            Cache directory (created on first write).
+        max_bytes: int
+            Maximum total size of cached files (in bytes).
+        enabled: bool
+            Flag, which indicates if cache is used.
+        hits: int
+            Number of entries loaded from disk.
+        misses: int
+            Number of entries not found on disk.
+        __nbytes: int or None
+            Estimated total size of cached files (None until scanned).
+        __lock: Lock
+            Guards size estimate and eviction.
+    """
+
+    directory: str
+    max_bytes: int
+    enabled: bool
+    hits: int
+    misses: int
+    __nbytes: Optional[int]
+    __lock: Lock
+
+    def __init__(self, directory: str, max_bytes: int, enabled: bool = True) -> None:
+        """Cache initialization."""
+
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.__nbytes = None
+        self.__lock = Lock()
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """
+        Loads an entry and marks it as most recently used.
+
+        Unreadable (e.g. truncated by a crash) entries are removed.
+
+        Args:
+            key: str
+                Entry key.
+
+        Returns:
+            Read-only cached array or None.
+        """
+
+        if not self.enabled:
+            return None
+        path = self.__get_path(key)
+        try:
+            with instrumentation.stage("disk_cache.load") as stage:
+                data = np.load(path, allow_pickle=False)
+                stage.nbytes = data.nbytes
+            os.utime(path)
+        except FileNotFoundError:
+            self.misses += 1
+            instrumentation.count("disk_cache.miss")
+            return None
+        except (OSError, ValueError):
+            self.misses += 1
+            self.__remove(path)
+            return None
+        self.hits += 1
+        instrumentation.count("disk_cache.hit")
+        data.setflags(write=False)
+        return data
+
+    def put(self, key: str, data: np.ndarray) -> None:
+        """
+        Stores an entry atomically and evicts least recently used entries
+        over max_bytes.
+
+        Write errors are ignored (cache is only an optimization).
+
+        Args:
+            key: str
+                Entry key.
+            data: np.ndarray
+                Array to store.
+
+        Returns:
+            None.
+        """
+
+        if not self.enabled or data.nbytes > self.max_bytes:
+            return
+        path = self.__get_path(key)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with instrumentation.stage("disk_cache.store") as stage:
+                fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+                try:
+                    with os.fdopen(fd, "wb") as f:
+                        np.save(f, np.ascontiguousarray(data), allow_pickle=False)
+                    os.replace(tmp_path, path)
+                except BaseException:
+                    self.__remove(tmp_path)
+                    raise
+                size = os.path.getsize(path)
+                stage.nbytes = size
+        except OSError:
+            return
+        with self.__lock:
+            if self.__nbytes is not None:
+                self.__nbytes += size
+        self.__evict()
+
+    def clear(self) -> None:
+        """
+        Removes all entries.
+
+        Returns:
+            None.
+        """
+
+        with self.__lock:
+            for entry in self.__scan():
+                self.__remove(entry.path)
+            self.__nbytes = 0
+
+    def __get_path(self, key: str) -> str:
+        """
+        Args:
+            key: str
+                Entry key.
+
+        Returns:
+            Path of entry's file.
+        """
+
+        return os.path.join(self.directory, hashlib.sha1(key.encode()).hexdigest() + ".npy")
+
+    def __scan(self) -> List[os.DirEntry]:
+        """
+        Returns:
+            Entries of cache directory (empty if it doesn't exist).
+        """
+
+        try:
+            return [
+                entry for entry in os.scandir(self.directory)
+                if entry.is_file() and entry.name.endswith(".npy")
+            ]
+        except FileNotFoundError:
+            return []
+
+    def __evict(self) -> None:
+        """
+        Removes least recently used entries while cache exceeds max_bytes.
+        Directory is scanned only when the size estimate exceeds the limit.
+
+        Returns:
+            None.
+        """
+
+        with self.__lock:
+            if self.__nbytes is not None and self.__nbytes <= self.max_bytes:
+                return
+            entries = []
+            for entry in self.__scan():
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+            entries.sort()
+            self.__nbytes = sum(size for _, size, _ in entries)
+            for _, size, path in entries:
+                if self.__nbytes <= self.max_bytes:
+                    break
+                self.__remove(path)
+                self.__nbytes -= size
+                instrumentation.count("disk_cache.evicted")
+
+    @staticmethod
+    def __remove(path: str) -> None:
+        """
+        Removes file if it exists.
+
+        Args:
+            path: str
+                Path to file.
+
+        Returns:
+            None.
+        """
+
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+disk_cache = DiskCache(
+    consts.imageConsts["DiskCacheDir"],
+    consts.imageConsts["DiskCacheBudget"]
+)
+"""Conversion cache shared by all images and processes."""
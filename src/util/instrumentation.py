@@ -0,0 +1,310 @@
+from __future__ import annotations
+
+import json
+import os
+import sys
+import time
+from functools import wraps
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional, TextIO, Tuple
+
+PROFILE_ENV = "ASCII_ART_PROFILE"
+"""Environment variable enabling instrumentation ("1" or path of the stats file)."""
+
+
+class Stage:
+    """
+    Context manager measuring one run of an instrumented stage.
+
+    Attributes:
+        nbytes: int
+            Bytes allocated by the stage (set by the instrumented code).
+        __instrumentation: Instrumentation
+            Receives the measurement.
+        __name: str
+            Stage name.
+        __start: float
+            Performance counter at stage start.
+    """
+
+    __slots__ = ("nbytes", "__instrumentation", "__name", "__start")
+
+    nbytes: int
+    __instrumentation: Instrumentation
+    __name: str
+    __start: float
+
+    def __init__(self, instrumentation: Instrumentation, name: str) -> None:
+        """Stage initialization."""
+
+        self.nbytes = 0
+        self.__instrumentation = instrumentation
+        self.__name = name
+        self.__start = 0.0
+
+    def __enter__(self) -> Stage:
+        self.__start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.__instrumentation.record(
+            self.__name, time.perf_counter() - self.__start, self.nbytes
+        )
+
+
+class NullStage:
+    """
+    Context manager used while instrumentation is disabled.
+
+    Shared by all stages, so disabled instrumentation
+    allocates nothing and records nothing.
+
+    Attributes:
+        nbytes: int
+            Ignored.
+    """
+
+    __slots__ = ("nbytes",)
+
+    nbytes: int
+
+    def __init__(self) -> None:
+        """Stage initialization."""
+
+        self.nbytes = 0
+
+    def __enter__(self) -> NullStage:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        pass
+
+
+class Instrumentation:
+    """
+    Per-stage timing and counters.
+
+    Collects call counts, durations and allocated bytes of named stages
+    (e.g. "image.decode") from all threads.
+    Disabled instrumentation costs one attribute check per stage.
+
+    Attributes:
+        enabled: bool
+            Flag, which indicates if stages are measured.
+        __null_stage: NullStage
+            Stage returned while disabled.
+        __stats: Dict[str, List[float]]
+            Calls, total seconds, maximum seconds and bytes of each stage.
+        __lock: Lock
+            Guards stats against concurrent updates.
+    """
+
+    enabled: bool
+    __null_stage: NullStage
+    __stats: Dict[str, List[float]]
+    __lock: Lock
+
+    def __init__(self, enabled: bool = False) -> None:
+        """Instrumentation initialization."""
+
+        self.enabled = enabled
+        self.__null_stage = NullStage()
+        self.__stats = {}
+        self.__lock = Lock()
+
+    def stage(self, name: str) -> Stage or NullStage:
+        """
+        Args:
+            name: str
+                Stage name.
+
+        Returns:
+            Context manager measuring the stage
+            (no-op one if instrumentation is disabled).
+        """
+
+        if not self.enabled:
+            return self.__null_stage
+        return Stage(self, name)
+
+    def record(self, name: str, seconds: float = 0.0,
+               nbytes: int = 0, calls: int = 1) -> None:
+        """
+        Adds a measurement to stage's stats.
+
+        Args:
+            name: str
+                Stage name.
+            seconds: float
+                Duration (in seconds).
+            nbytes: int
+                Allocated bytes.
+            calls: int
+                Number of calls.
+
+        Returns:
+            None.
+        """
+
+        with self.__lock:
+            stats = self.__stats.get(name)
+            if stats is None:
+                self.__stats[name] = [calls, seconds, seconds, nbytes]
+                return
+            stats[0] += calls
+            stats[1] += seconds
+            stats[2] = max(stats[2], seconds)
+            stats[3] += nbytes
+
+    def count(self, name: str, value: int = 1) -> None:
+        """
+        Increments a counter (if instrumentation is enabled).
+
+        Args:
+            name: str
+                Counter name.
+            value: int
+                Increment.
+
+        Returns:
+            None.
+        """
+
+        if self.enabled:
+            self.record(name, calls=value)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """
+        Returns:
+            Copy of stats: stage name mapped to its
+            "calls", "seconds", "max_seconds" and "bytes".
+        """
+
+        with self.__lock:
+            return {
+                name: {
+                    "calls": calls, "seconds": seconds,
+                    "max_seconds": max_seconds, "bytes": nbytes
+                }
+                for name, (calls, seconds, max_seconds, nbytes) in sorted(self.__stats.items())
+            }
+
+    def merge(self, snapshot: Dict[str, Dict[str, float]]) -> None:
+        """
+        Adds stats collected elsewhere (e.g. in a worker process).
+
+        Args:
+            snapshot: Dict[str, Dict[str, float]]
+                Stats returned by snapshot().
+
+        Returns:
+            None.
+        """
+
+        with self.__lock:
+            for name, stats in snapshot.items():
+                own = self.__stats.setdefault(name, [0, 0.0, 0.0, 0])
+                own[0] += stats["calls"]
+                own[1] += stats["seconds"]
+                own[2] = max(own[2], stats["max_seconds"])
+                own[3] += stats["bytes"]
+
+    def reset(self) -> None:
+        """
+        Clears all stats.
+
+        Returns:
+            None.
+        """
+
+        with self.__lock:
+            self.__stats.clear()
+
+    def dump(self, path: Optional[str] = None) -> None:
+        """
+        Writes stats snapshot as JSON.
+
+        Args:
+            path: str or None
+                Path of the stats file ("-" or None for stderr).
+
+        Returns:
+            None.
+        """
+
+        if path in (None, "-", "1"):
+            self.__dump(sys.stderr)
+            return
+        with open(path, "w") as f:
+            self.__dump(f)
+
+    def __dump(self, f: TextIO) -> None:
+        """
+        Helper function for writing stats snapshot as JSON.
+
+        Args:
+            f: TextIO
+                Opened file.
+
+        Returns:
+            None.
+        """
+
+        json.dump(self.snapshot(), f, indent=2)
+        f.write("\n")
+
+
+instrumentation = Instrumentation(enabled=bool(os.environ.get(PROFILE_ENV)))
+"""Instrumentation shared by all modules."""
+
+
+def instrumented(name: str):
+    """
+    Decorator measuring every call of a function as a stage.
+
+    Bytes of NumPy array results are recorded as allocated bytes.
+
+    Args:
+        name: str
+            Stage name.
+
+    Returns:
+        Decorated function.
+    """
+
+    def decorator(func: Callable[..., Any]):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not instrumentation.enabled:
+                return func(*args, **kwargs)
+            with instrumentation.stage(name) as stage:
+                result = func(*args, **kwargs)
+                stage.nbytes = getattr(result, "nbytes", 0)
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def call_with_stats(func: Callable[..., Any], *args) -> Tuple[Any, Dict[str, Dict[str, float]]]:
+    """
+    Calls function with instrumentation enabled
+    and collects stats of this call only.
+
+    Used in worker processes, whose stats are merged by the parent process.
+
+    Args:
+        func: Callable[..., Any]
+            Function to call.
+        args:
+            Function arguments.
+
+    Returns:
+        A pair of function result and stats snapshot.
+    """
+
+    instrumentation.enabled = True
+    instrumentation.reset()
+    result = func(*args)
+    return result, instrumentation.snapshot()
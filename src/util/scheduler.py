@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+import os
+import time
+import traceback
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import Lock
+from typing import Any, Callable, Deque, Dict, Hashable, Iterable, Iterator, Optional, Set, Tuple
+
+from .instrumentation import instrumentation
+
+
+class ConversionScheduler:
+    """
+    Bounded scheduler for background conversions.
+
+    Runs jobs in a pool of worker threads sized to the number of cores.
+    Jobs are identified by key (e.g. image index), and only the newest job
+    of each key is delivered:
+    pending older jobs are cancelled, a job submitted while an older job
+    of the same key is running waits for it (so jobs of one key never race)
+    and results of superseded jobs are dropped.
+
+    Attributes:
+        __executor: ThreadPoolExecutor
+            Pool of worker threads.
+        __lock: Lock
+            Guards scheduler state.
+        __generations: Dict[Hashable, int]
+            Number of the newest job of each key.
+        __pending: Dict[Hashable, Future]
+            Submitted but not started job of each key.
+        __running: Set[Hashable]
+            Keys with a running job.
+        __waiting: Dict[Hashable, Tuple[int, Callable, Callable]]
+            Newest job of each key waiting for running job of the same key.
+    """
+
+    __executor: ThreadPoolExecutor
+    __lock: Lock
+    __generations: Dict[Hashable, int]
+    __pending: Dict[Hashable, Future]
+    __running: Set[Hashable]
+    __waiting: Dict[Hashable, Tuple[int, Callable[[], Any], Callable[[Any], None]]]
+
+    def __init__(self, max_workers: Optional[int] = None) -> None:
+        """Scheduler initialization."""
+
+        self.__executor = ThreadPoolExecutor(max_workers=max_workers or os.cpu_count())
+        self.__lock = Lock()
+        self.__generations = {}
+        self.__pending = {}
+        self.__running = set()
+        self.__waiting = {}
+
+    @property
+    def depth(self) -> int:
+        """
+        Returns:
+            Number of jobs waiting to be started.
+        """
+
+        with self.__lock:
+            return len(self.__pending) + len(self.__waiting)
+
+    def submit(self, key: Hashable,
+               job: Callable[[], Any],
+               on_done: Callable[[Any], None]) -> None:
+        """
+        Schedules a job and supersedes older jobs of the same key.
+
+        Args:
+            key: Hashable
+                Job's key.
+            job: Callable[[], Any]
+                Function to run in background.
+            on_done: Callable[[Any], None]
+                Called (in worker thread) with job's result,
+                if no newer job of the same key was submitted meanwhile.
+
+        Returns:
+            None.
+        """
+
+        with self.__lock:
+            generation = self.__generations.get(key, 0) + 1
+            self.__generations[key] = generation
+            if key in self.__running:
+                self.__waiting[key] = (generation, job, on_done)
+                return
+            self.__submit(key, generation, job, on_done)
+
+    def is_current(self, key: Hashable, generation: int) -> bool:
+        """
+        Args:
+            key: Hashable
+                Job's key.
+            generation: int
+                Job's number.
+
+        Returns:
+            If job is the newest job of its key.
+        """
+
+        return self.__generations.get(key) == generation
+
+    def shutdown(self) -> None:
+        """
+        Cancels all pending jobs and stops worker threads
+        without waiting for running jobs.
+
+        Returns:
+            None.
+        """
+
+        with self.__lock:
+            self.__generations.clear()
+            self.__waiting.clear()
+            for pending in self.__pending.values():
+                pending.cancel()
+            self.__pending.clear()
+        self.__executor.shutdown(wait=False)
+
+    def __submit(self, key: Hashable, generation: int,
+                 job: Callable[[], Any],
+                 on_done: Callable[[Any], None]) -> None:
+        """
+        Submits a job to the pool and cancels pending job of the same key.
+        Should be called with lock held.
+
+        Args:
+            key: Hashable
+                Job's key.
+            generation: int
+                Job's number.
+            job: Callable[[], Any]
+                Function to run in background.
+            on_done: Callable[[Any], None]
+                Called with job's result.
+
+        Returns:
+            None.
+        """
+
+        pending = self.__pending.pop(key, None)
+        if pending is not None:
+            pending.cancel()
+        self.__pending[key] = self.__executor.submit(
+            self.__run, key, generation, job, on_done, time.perf_counter()
+        )
+
+    def __run(self, key: Hashable, generation: int,
+              job: Callable[[], Any],
+              on_done: Callable[[Any], None],
+              submitted: float) -> None:
+        """
+        Function used in worker threads.
+
+        Args:
+            key: Hashable
+                Job's key.
+            generation: int
+                Job's number.
+            job: Callable[[], Any]
+                Function to run.
+            on_done: Callable[[Any], None]
+                Called with job's result.
+            submitted: float
+                Performance counter at job's submission.
+
+        Returns:
+            None.
+        """
+
+        with self.__lock:
+            if not self.is_current(key, generation):
+                instrumentation.count("scheduler.superseded")
+                return
+            self.__pending.pop(key, None)
+            self.__running.add(key)
+        result = None
+        is_failed = False
+        if instrumentation.enabled:
+            instrumentation.record("scheduler.wait", time.perf_counter() - submitted)
+        try:
+            with instrumentation.stage("scheduler.job"):
+                result = job()
+        except Exception:
+            is_failed = True
+            traceback.print_exc()
+        finally:
+            with self.__lock:
+                self.__running.discard(key)
+                is_current = self.is_current(key, generation)
+                waiting = self.__waiting.pop(key, None)
+                if waiting is not None:
+                    self.__submit(key, *waiting)
+        if is_current and not is_failed:
+            on_done(result)
+
+
+def map_ordered(func: Callable[[Any], Any], items: Iterable[Any],
+                max_workers: Optional[int] = None,
+                buffer_size: Optional[int] = None) -> Iterator[Any]:
+    """
+    Maps function over items in a pool of worker threads
+    and yields results in order of items.
+
+    Items are pulled from the iterable only when there is room
+    in the reorder buffer, so at most buffer_size items (and their results)
+    are held at once, regardless of how many items there are
+    or which of them take longest.
+
+    Args:
+        func: Callable[[Any], Any]
+            Function to apply to each item.
+        items: Iterable[Any]
+            Items (e.g. lazily decoded frames).
+        max_workers: int or None
+            Number of worker threads (number of cores if None).
+        buffer_size: int or None
+            Maximum number of items in flight (twice max_workers if None).
+
+    Returns:
+        Iterator of results. Closing it cancels items not started yet.
+
+    Raises:
+        Exception: The first exception raised by func (in order of items).
+    """
+
+    max_workers = max_workers or os.cpu_count()
+    buffer_size = max(1, buffer_size or 2 * max_workers)
+    pending: Deque[Future] = deque()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        try:
+            for item in items:
+                if len(pending) >= buffer_size:
+                    yield pending.popleft().result()
+                pending.append(executor.submit(func, item))
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
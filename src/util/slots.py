@@ -0,0 +1,32 @@
+from dataclasses import fields
+from typing import Type, TypeVar
+
+T = TypeVar("T")
+
+
+def add_slots(cls: Type[T]) -> Type[T]:
+    """
+    Rebuilds data class with __slots__ of its fields, so its instances
+    have no per-instance __dict__ (smaller instances, and assigning
+    an unknown attribute raises AttributeError).
+
+    Works like dataclass(slots=True) of Python 3.10+,
+    which can't be used with Python 3.8.
+    Must be applied on top of the dataclass decorator.
+    Methods of the class must not use argument-less super().
+
+    Args:
+        cls: Type[T]
+            Data class to rebuild.
+
+    Returns:
+        New class with the same fields, methods and __slots__.
+    """
+
+    names = tuple(f.name for f in fields(cls))
+    cls_dict = dict(cls.__dict__)
+    cls_dict["__slots__"] = names
+    for name in names + ("__dict__", "__weakref__"):
+        # field defaults are kept by generated __init__, not as class attributes
+        cls_dict.pop(name, None)
+    return type(cls)(cls.__name__, cls.__bases__, cls_dict)
@@ -0,0 +1,10 @@
+import pytest
+
+from src.util.disk_cache import disk_cache
+
+
+@pytest.fixture(autouse=True)
+def isolated_disk_cache(tmp_path_factory):
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(disk_cache, "directory", str(tmp_path_factory.mktemp("disk_cache")))
+        yield disk_cache
@@ -0,0 +1,70 @@
+import time
+from threading import Lock
+
+from src.util.animation import AnimationPlayer, FrameCache
+
+
+def test_frame_cache():
+    frames = FrameCache(3, lambda position: f"frame{position}")
+    assert frames.get(0) is None
+    frames.start()
+    assert [frames.get(i, 1.0) for i in range(3)] == ["frame0", "frame1", "frame2"]
+    frames.stop()
+
+
+def test_player():
+    shown = []
+    lock = Lock()
+
+    def on_frame(position, frame):
+        with lock:
+            shown.append((position, frame))
+
+    player = AnimationPlayer(FrameCache(4, str), 0.01, on_frame)
+    player.start()
+    time.sleep(0.2)
+    player.stop()
+    assert not player.is_alive()
+    assert shown[:4] == [(0, "0"), (1, "1"), (2, "2"), (3, "3")]
+    assert 0 < player.fps <= 110
+    assert player.shown_frames == len(shown)
+
+
+def test_player_drops_slow_frames():
+    def render(position):
+        time.sleep(0.05)
+        return str(position)
+
+    player = AnimationPlayer(FrameCache(3, render), 0.01, lambda *_: None)
+    start = time.monotonic()
+    player.start()
+    time.sleep(0.2)
+    elapsed = time.monotonic() - start
+    player.stop()
+    assert player.dropped_frames > 0
+    # playback follows the clock instead of the render speed
+    assert player.shown_frames + player.dropped_frames >= elapsed / 0.01 - 3
+
+
+def test_frame_cache_window():
+    renders = []
+
+    def render(position):
+        renders.append(position)
+        return f"frame{position}"
+
+    frames = FrameCache(10, render, window=3)
+    frames.start()
+    for tick in range(20):
+        assert frames.get(tick, 1.0) == f"frame{tick % 10}"
+        assert sum(frame is not None for frame in frames._FrameCache__frames) <= 3
+    frames.stop()
+    # frames are rendered again in every loop instead of being kept
+    assert renders[:20] == list(range(10)) * 2
+
+    renders.clear()
+    frames = FrameCache(3, render, window=3)
+    frames.start()
+    assert [frames.get(tick, 1.0) for tick in range(9)] == ["frame0", "frame1", "frame2"] * 3
+    frames.stop()
+    assert renders == [0, 1, 2]
@@ -0,0 +1,20 @@
+import copy
+
+from benchmarks.pipeline import compare, run_benchmarks
+
+
+def test_benchmarks():
+    results = run_benchmarks([0.05], 1, log=lambda _: None)
+    stages = results["results"]["0.05"]
+    assert set(stages) == {
+        "decode", "negative", "contrast", "rgb_to_gray", "sharpen",
+        "emboss", "ascii_data", "resize", "format_output",
+        "color_ansi", "color_html", "convert"
+    }
+    assert all(stage["seconds"] > 0 and stage["peak_bytes"] > 0 for stage in stages.values())
+    assert compare(results, results) == []
+
+    baseline = copy.deepcopy(results)
+    baseline["results"]["0.05"]["convert"]["seconds"] = stages["convert"]["seconds"] / 2 - 0.01
+    regressions = compare(results, baseline)
+    assert len(regressions) == 1 and regressions[0].startswith("convert at 0.05 MP")
@@ -0,0 +1,54 @@
+import os
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+from src.cli import main
+from src.cli.batch import compute_output_paths
+
+
+def relative_path(rp: str) -> str:
+    return os.path.join(sys.path[0], rp)
+
+
+def test_batch_conversion(tmp_path, capsys):
+    assert main([
+        relative_path("tests/data/*.png"), "--contrast",
+        "-o", str(tmp_path), "-j", "2"
+    ]) == 0
+    assert "images/s" in capsys.readouterr().out
+    with open(relative_path("tests/data/lenna_ascii_full.txt")) as f:
+        assert (tmp_path / "lenna.txt").read_text() == f.read()
+
+
+def test_output_paths(tmp_path):
+    images = [Path("a/p.png"), Path("b/p.png"), Path("b/x.png"), Path("b/x.jpg"), Path("b/y.png")]
+    assert compute_output_paths(images, None, ".txt") == [
+        Path("a/p.txt"), Path("b/p.txt"), Path("b/x.png.txt"), Path("b/x.jpg.txt"), Path("b/y.txt")
+    ]
+    assert compute_output_paths(images, tmp_path, ".txt") == [
+        tmp_path / "a/p.png.txt", tmp_path / "b/p.png.txt",
+        tmp_path / "x.png.txt", tmp_path / "x.jpg.txt", tmp_path / "y.txt"
+    ]
+
+
+def test_batch_conversion_name_collisions(tmp_path, capsys):
+    for directory in ("a", "b"):
+        (tmp_path / directory).mkdir()
+        shutil.copy(relative_path("tests/data/lenna.png"), tmp_path / directory / "p.png")
+    output_dir = tmp_path / "out"
+    assert main([str(tmp_path / "a"), str(tmp_path / "b"), "-o", str(output_dir), "-j", "1"]) == 0
+    assert "Converted 2 of 2" in capsys.readouterr().out
+    assert sorted(p.relative_to(output_dir).as_posix() for p in output_dir.rglob("*.txt")) == [
+        "a/p.png.txt", "b/p.png.txt"
+    ]
+
+
+def test_no_images(tmp_path):
+    assert main([str(tmp_path / "missing.png")]) == 1
+
+
+def test_headless_import():
+    code = "import sys, src.cli; assert 'PySide2' not in sys.modules"
+    subprocess.run([sys.executable, "-c", code], cwd=sys.path[0], check=True)
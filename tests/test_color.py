@@ -0,0 +1,65 @@
+import os
+import re
+import sys
+
+import numpy as np
+import pytest
+from numpy.testing import assert_equal
+
+from src.image.color import compute_cell_colors, quantize_colors, render_color_ascii_art
+from src.util import consts
+
+
+def relative_path(rp: str) -> str:
+    return os.path.join(sys.path[0], rp)
+
+
+def test_cell_colors():
+    data = np.random.default_rng(0).integers(0, 256, (12, 10, 3), dtype=np.uint8)
+    rows, cols = np.array([0, 4, 7]), np.array([0, 5])
+    colors = compute_cell_colors(data, rows, cols)
+    assert colors.shape == (3, 2, 3)
+    expected = data[4:7, 5:].reshape(-1, 3).mean(axis=0)
+    assert_equal(colors[1, 1], np.round(expected).astype(np.uint8))
+
+    gray = compute_cell_colors(data[:, :, 0], np.array([0, 0, 1]), np.array([0]))
+    assert gray.shape == (3, 1, 3)
+    assert_equal(gray[0], gray[1])  # upsampled cells repeat a pixel
+
+
+def test_quantize_colors():
+    colors = np.array([[[0, 3, 4], [251, 252, 255]]], dtype=np.uint8)
+    assert_equal(quantize_colors(colors, 8), [[[0, 0, 8], [248, 255, 255]]])
+    assert quantize_colors(colors, 1) is colors
+
+
+def test_merged_runs():
+    glyphs = np.frombuffer(b"ab<d", dtype=np.uint8).reshape(1, 4)
+    colors = np.zeros((1, 4, 3), dtype=np.uint8)
+    colors[0, 3] = (255, 0, 16)
+    assert render_color_ascii_art(glyphs, colors, "ansi") == \
+        "\x1b[38;2;0;0;0mab<\x1b[38;2;255;0;16md\x1b[0m"
+    assert render_color_ascii_art(glyphs, colors, "html") == \
+        "<span style=\"color:#000000\">ab&lt;</span><span style=\"color:#ff0010\">d</span>"
+    with pytest.raises(ValueError):
+        render_color_ascii_art(glyphs, colors, "rtf")
+
+
+def test_image_color_ascii_art():
+    from src.image import Image
+    lenna = Image(
+        "Lenna", relative_path("tests/data/lenna.png"),
+        False, True, False, False,
+        consts.uiConsts["DefaultGrayscaleLevel"]
+    )
+    lenna.convert_to_ascii_art()
+    art = lenna.get_color_ascii_art(80, 40)
+    assert re.sub("\x1b\\[[0-9;]*m", "", art) == lenna.get_ascii_art(80, 40)
+    escapes = art.count("\x1b[38;2;")
+    assert escapes < 80 * 40  # runs of the same color are merged
+    lenna.release_raw_data()  # colors are cached or decoded again
+    assert lenna.get_color_ascii_art(80, 40, "html").count("<span") == escapes
+    usage = lenna.get_memory_usage()
+    assert lenna.get_color_ascii_art(40, 20)
+    # image decoded for new cell colors is released again
+    assert lenna.get_memory_usage() < usage + 512 * 512
@@ -0,0 +1,63 @@
+import os
+import sys
+
+import numpy as np
+
+from src.util import consts
+from src.util.disk_cache import DiskCache
+
+
+def relative_path(rp: str) -> str:
+    return os.path.join(sys.path[0], rp)
+
+
+def new_lenna():
+    from src.image import Image
+    return Image(
+        "Lenna", relative_path("tests/data/lenna.png"),
+        True, False, True, False,
+        consts.uiConsts["DefaultGrayscaleLevel"]
+    )
+
+
+def test_image_uses_disk_cache(isolated_disk_cache, monkeypatch):
+    lenna = new_lenna()
+    lenna.convert_to_ascii_art()
+    expected = str(lenna)
+    hits = isolated_disk_cache.hits
+
+    def fail(*_):
+        raise AssertionError("image decoded despite disk cache")
+
+    monkeypatch.setattr("src.image.image.imread", fail)
+    reopened = new_lenna()
+    reopened.grayscale_level = "@#. "  # not a part of the key
+    reopened.convert_to_ascii_art()
+    assert isolated_disk_cache.hits == hits + 1
+    assert np.array_equal(reopened.get_image_data(), lenna.get_image_data())
+    reopened.set_grayscale_level(consts.uiConsts["DefaultGrayscaleLevel"])
+    assert str(reopened) == expected
+
+
+def test_lru_eviction(tmp_path):
+    entry = np.zeros(1000, dtype=np.uint8)
+    cache = DiskCache(str(tmp_path / "cache"), 3 * 1200)
+    for key in "abc":
+        cache.put(key, entry)
+    os.utime(cache._DiskCache__get_path("a"), ns=(0, 0))
+    os.utime(cache._DiskCache__get_path("b"), ns=(1, 1))
+    assert cache.get("a") is not None  # "a" becomes the most recently used
+    cache.put("d", entry)
+    assert cache.get("b") is None
+    assert all(cache.get(key) is not None for key in "acd")
+    assert not [name for name in os.listdir(tmp_path / "cache") if name.endswith(".tmp")]
+
+
+def test_corrupted_entry(tmp_path):
+    cache = DiskCache(str(tmp_path), 1024 * 1024)
+    cache.put("key", np.arange(10, dtype=np.uint8))
+    path = cache._DiskCache__get_path("key")
+    with open(path, "r+b") as f:
+        f.truncate(20)
+    assert cache.get("key") is None
+    assert not os.path.exists(path)
@@ -0,0 +1,55 @@
+import gzip
+import os
+import sys
+
+import pytest
+
+from src.util import consts
+
+
+def relative_path(rp: str) -> str:
+    return os.path.join(sys.path[0], rp)
+
+
+@pytest.fixture
+def lenna():
+    from src.image import Image
+    lenna = Image(
+        "Lenna", relative_path("tests/data/lenna.png"),
+        True, False, False, False,
+        consts.uiConsts["DefaultGrayscaleLevel"]
+    )
+    lenna.convert_to_ascii_art()
+    return lenna
+
+
+@pytest.fixture
+def expected():
+    with open(relative_path("tests/data/lenna_ascii_full.txt"), "rb") as f:
+        return f.read()
+
+
+def test_chunks(lenna, expected):
+    chunks = [bytes(chunk) for chunk in lenna.iter_ascii_chunks(10000)]
+    assert len(chunks) == 27
+    assert b"".join(chunks) == expected
+
+
+@pytest.mark.parametrize("name", ("lenna.txt", "lenna.txt.gz"))
+def test_text(lenna, expected, tmp_path, name):
+    from src.image.export import export_ascii_art
+    assert export_ascii_art(lenna, str(tmp_path / name)) == len(expected)
+    with (gzip.open if name.endswith(".gz") else open)(tmp_path / name, "rb") as f:
+        assert f.read() == expected
+
+
+def test_html(lenna, expected, tmp_path):
+    from src.image.export import export_ascii_art
+    export_ascii_art(lenna, str(tmp_path / "lenna.art"), "html")
+    page = (tmp_path / "lenna.art").read_text("utf-8")
+    assert page.startswith("<!DOCTYPE html>") and "<title>Lenna</title>" in page
+    art = page[page.index(">", page.index("<pre")) + 1:page.index("</pre>")]
+    assert "<" not in art
+    assert art.replace("&lt;", "<").replace("&gt;", ">").replace("&amp;", "&") == expected.decode()
+    with pytest.raises(ValueError):
+        export_ascii_art(lenna, str(tmp_path / "lenna.bmp"), "bmp")
@@ -1,11 +1,14 @@
+import os
+import sys
+
 import pytest
 
 
-@pytest.fixture
-def factory():
-    from src.factory import ArtFactory
+@pytest.fixture(params=["ArtList", "ArtFactory"])
+def factory(request):
+    import src.factory
     from src.image import Image
-    factory = ArtFactory()
+    factory = getattr(src.factory, request.param)()
     for i in range(10):
         factory += Image(
             f"Lenna{i}", "",
@@ -51,3 +54,27 @@ def test_changes(factory):
 
     assert len(factory) == 5
     assert summ == 220
+
+
+def test_release_render_cache():
+    from src.factory import ArtList
+    from src.image import Image
+    images = []
+    for i in range(3):
+        image = Image(
+            f"Lenna{i}", os.path.join(sys.path[0], "tests/data/lenna.png"),
+            False, False, False, False,
+            ""
+        )
+        image.convert_to_ascii_art()
+        image.get_ascii_art(40, 20)
+        images.append(image)
+    arts = ArtList(images[:2])
+    arts.loaded_image = images[2]
+    arts[0] = images[2]
+    assert [image.get_render_cache_stats()["entries"] for image in images] == [0, 1, 1]
+    arts.loaded_image = None
+    del arts[1]
+    assert [image.get_render_cache_stats()["entries"] for image in images] == [0, 0, 1]
+    arts.reset([])
+    assert images[2].get_render_cache_stats() == {"hits": 0, "misses": 0, "entries": 0, "bytes": 0}
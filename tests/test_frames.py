@@ -0,0 +1,156 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+from imageio.v3 import imwrite
+
+from src.image import FrameSequence, Image, open_image
+from src.image.export import export_ascii_art
+from src.cli.batch import convert_image
+from src.image.frames import FRAME_SEPARATOR, count_frames
+from src.util import consts
+
+FRAME_COUNT = 12
+
+
+@pytest.fixture
+def gif_path(tmp_path):
+    y, x = np.mgrid[:48, :64]
+    frames = [
+        np.stack([(x * 4 + i * 20) % 256, (y * 5) % 256, np.full_like(x, i * 20)], axis=2).astype(np.uint8)
+        for i in range(FRAME_COUNT)
+    ]
+    path = tmp_path / "clip.gif"
+    imwrite(path, frames, duration=40, loop=0)
+    return str(path)
+
+
+def open_clip(path):
+    return open_image(
+        "Clip", path,
+        True, False, True, False,
+        consts.uiConsts["DefaultGrayscaleLevel"]
+    )
+
+
+def test_open_image(gif_path):
+    assert count_frames(gif_path) == FRAME_COUNT
+    clip = open_clip(gif_path)
+    assert isinstance(clip, FrameSequence)
+    assert clip.get_frame_count() == FRAME_COUNT
+    assert clip.get_frame_duration() == pytest.approx(0.04)
+    assert isinstance(open_clip("tests/data/lenna.png"), Image)
+
+
+def test_frames_match_images(gif_path):
+    from imageio.v3 import imiter
+    clip = open_clip(gif_path)
+    clip.working_size = (16, 12)
+    clip.max_workers = 3
+    clip.convert_to_ascii_art()
+    assert len(clip) == FRAME_COUNT
+    for frame, image_data in zip(clip, imiter(gif_path)):
+        image = Image.from_array(
+            "Frame", image_data,
+            True, False, True, False,
+            consts.uiConsts["DefaultGrayscaleLevel"], (16, 12)
+        )
+        image.convert_to_ascii_art()
+        assert frame.get_ascii_art(40, 20) == image.get_ascii_art(40, 20)
+        assert frame.get_image_data().shape == (12, 16)
+        with pytest.raises(ValueError):
+            str(frame)  # raw data was released
+    assert clip.get_ascii_art(40, 20) == clip[0].get_ascii_art(40, 20)
+
+
+def test_frame_window(gif_path, monkeypatch):
+    monkeypatch.setitem(consts.imageConsts, "FrameWindowSize", 4)
+    clip = open_clip(gif_path)
+    clip.working_size = (16, 12)
+    clip.convert_to_ascii_art()
+    assert len(clip) == FRAME_COUNT
+    expected = [frame.get_ascii_art(40, 20) for frame in clip]
+    frame_size = clip[0].get_memory_usage()
+    # the first frame and the window of the last frames are kept
+    assert clip.get_memory_usage() == 5 * frame_size
+    for index in (10, 3, 4, 11, 0, -1):
+        assert clip[index].get_ascii_art(40, 20) == expected[index]
+        assert clip.get_memory_usage() <= 5 * frame_size
+    with pytest.raises(IndexError):
+        clip[FRAME_COUNT]
+
+
+def count_decoded_frames(monkeypatch):
+    import src.image.frames as frames_module
+    decoded = []
+    iter_frames = frames_module.iter_frames
+
+    def counting_iter_frames(path):
+        for frame in iter_frames(path):
+            decoded.append(frame)
+            yield frame
+
+    monkeypatch.setattr(frames_module, "iter_frames", counting_iter_frames)
+    return decoded
+
+
+def test_lazy_frame_decoding(gif_path, monkeypatch):
+    monkeypatch.setitem(consts.imageConsts, "FrameWindowSize", 4)
+    decoded = count_decoded_frames(monkeypatch)
+    clip = open_clip(gif_path)
+    clip.convert_to_ascii_art()
+    # frame count is read from file header, only the first window is decoded
+    assert len(decoded) == 4
+    assert len(clip) == clip.get_frame_count() == FRAME_COUNT
+    assert len(decoded) == 4
+
+
+def test_unknown_frame_count(gif_path, monkeypatch):
+    monkeypatch.setitem(consts.imageConsts, "FrameWindowSize", 5)
+    monkeypatch.setattr("src.image.frames.count_frames", lambda _: 0)
+    decoded = count_decoded_frames(monkeypatch)
+    clip = open_clip(gif_path)
+    clip.convert_to_ascii_art()
+    assert len(decoded) == 5 and clip.get_frame_count() == 0
+    # frames are counted once iteration reaches the end of file
+    assert sum(1 for _ in clip) == FRAME_COUNT
+    assert clip.get_frame_count() == FRAME_COUNT
+    assert len(decoded) == FRAME_COUNT
+
+    clip = open_clip(gif_path)
+    clip.convert_to_ascii_art()
+    decoded.clear()
+    assert len(clip) == FRAME_COUNT  # counted when asked for
+    assert len(decoded) == FRAME_COUNT - 5
+
+
+def test_export_frames(gif_path, tmp_path):
+    from imageio.v3 import imiter
+    clip = open_clip(gif_path)
+    clip.max_workers = 2
+    clip.convert_to_ascii_art()
+    expected = []
+    for image_data in imiter(gif_path):
+        image = Image.from_array(
+            "Frame", image_data,
+            True, False, True, False,
+            consts.uiConsts["DefaultGrayscaleLevel"]
+        )
+        image.convert_to_ascii_art()
+        expected.append(bytes(image.get_ascii_buffer()))
+    expected = FRAME_SEPARATOR.join(expected)
+    assert bytes(clip.get_ascii_buffer()) == expected
+    assert export_ascii_art(clip, str(tmp_path / "clip.txt")) == len(expected)
+    assert (tmp_path / "clip.txt").read_bytes() == expected
+
+
+def test_batch_converts_frames_once(gif_path, tmp_path, monkeypatch):
+    calls = []
+    convert = Image.convert_to_ascii_art
+    monkeypatch.setattr(Image, "convert_to_ascii_art", lambda self: calls.append(convert(self)))
+    (_, written) = convert_image(
+        Path(gif_path), tmp_path / "clip.txt",
+        True, False, True, False, ""
+    )
+    assert len(calls) == FRAME_COUNT
+    assert written == (tmp_path / "clip.txt").stat().st_size
@@ -4,15 +4,27 @@ import sys
 import numpy as np
 import pytest
 from imageio.v2 import imread
-from numpy.testing import assert_equal
+from numpy.testing import assert_equal, assert_allclose
 
 from src.util import consts
 
 
+# direct integer convolution is exact, FFT goldens may be truncated by 1
+KERNEL_TOLERANCE = 1
+
+
 def relative_path(rp: str) -> str:
     return os.path.join(sys.path[0], rp)
 
 
+def assert_effect(data: np.ndarray, effect: str) -> None:
+    expected = np.asarray(imread(relative_path(f"tests/data/lenna_{effect}.ppm")))
+    if effect in ("sharpen", "emboss"):
+        assert_allclose(data.astype(int), expected.astype(int), rtol=0, atol=KERNEL_TOLERANCE)
+    else:
+        assert_equal(data, expected)
+
+
 @pytest.fixture
 def lenna():
     from src.image import Image
@@ -42,10 +54,7 @@ def test_effects(lenna, effect: str):
     else:
         lenna.set_effect_flags(False, False, False, True)
     lenna.convert_to_ascii_art()
-    assert_equal(
-        lenna.get_image_data(),
-        np.asarray(imread(relative_path(f"tests/data/lenna_{effect}.ppm")))
-    )
+    assert_effect(lenna.get_image_data(), effect)
 
 
 def test_ascii_art_full(lenna):
@@ -68,3 +77,221 @@ def test_all(lenna):
     lenna.convert_to_ascii_art()
     with open(relative_path("tests/data/lenna_ascii_all.txt")) as f:
         assert_equal(str(lenna), f.read())
+
+
+def test_grayscale_level_lut():
+    from src.image.image import compile_grayscale_level
+    from src.image.text import NEWLINE_CODE
+    (lut, symbols) = compile_grayscale_level("@o.")
+    assert lut.dtype == np.uint8 and lut.shape == (256,) and symbols == ""
+    assert bytes(lut[[0, 127, 128, 255]]) == b"@@o."
+    assert compile_grayscale_level("@o.")[0] is lut
+    (lut, symbols) = compile_grayscale_level("█▒░ ")
+    assert symbols == "█▒░ "
+    assert NEWLINE_CODE not in lut
+    assert "".join(symbols[lut[value]] for value in (0, 85, 170, 255)) == "█▒░ "
+    (lut, symbols) = compile_grayscale_level("".join(map(chr, range(0x2500, 0x2600))))
+    assert len(symbols) == 255 and NEWLINE_CODE not in lut
+
+
+def test_unicode_grayscale_level(lenna):
+    lenna.set_grayscale_level("█▓▒░ ")
+    lenna.convert_to_ascii_art()
+    art = lenna.get_ascii_art(50, 20)
+    assert set(art) <= set("█▓▒░ \n") and len(art.split("\n")) == 20
+    assert bytes(lenna.get_ascii_art_buffer(50, 20)).decode("utf-8") == art
+    assert bytes(lenna.get_ascii_buffer()).decode("utf-8") == str(lenna)
+    assert b"".join(lenna.iter_ascii_chunks(4096)) == bytes(lenna.get_ascii_buffer())
+    colored = lenna.get_color_ascii_art(50, 20, "html")
+    assert "█" in colored and colored.count("\n") == 19
+
+
+def test_resample_indices():
+    from src.image.image import compute_resample_indices
+    rows, cols = compute_resample_indices((512, 512), (189, 378))
+    assert rows.shape == (189, 1) and cols.shape == (378,)
+    assert list(rows[:4, 0]) == [int(512 * y / 189) for y in range(4)]
+    assert compute_resample_indices((512, 512), (189, 378))[0] is rows
+
+
+def test_ascii_buffer(lenna):
+    lenna.convert_to_ascii_art()
+    assert bytes(lenna.get_ascii_buffer()).decode("utf-8") == str(lenna)
+    assert bytes(lenna.get_ascii_art_buffer(50, 20)) == lenna.get_ascii_art(50, 20).encode()
+
+
+def test_pipeline_cache(lenna):
+    for effect, flags in (
+            ("sharpen", (False, False, True, False)),
+            ("emboss", (False, False, False, True)),
+            ("gray", (False, False, False, False)),
+            ("negative", (False, True, False, False)),
+            ("sharpen", (False, False, True, False))
+    ):
+        lenna.set_effect_flags(*flags)
+        lenna.convert_to_ascii_art()
+        assert_effect(lenna.get_image_data(), effect)
+
+
+def test_share_pipeline(lenna):
+    from src.image import Image
+    lenna.convert_to_ascii_art()
+    preview = Image(
+        "Preview", lenna.path,
+        True, False, False, False,
+        ""
+    )
+    assert preview.share_pipeline(lenna)
+    assert not preview.share_pipeline(None)
+    preview.convert_to_ascii_art()
+    with open(relative_path("tests/data/lenna_ascii_full.txt")) as f:
+        assert_equal(str(preview), f.read())
+
+
+def test_convolution_engines():
+    from src.image.convolution import direct_convolve, fft_convolve
+    data = np.asarray(imread(relative_path("tests/data/lenna_gray.ppm")))
+    kernel = np.array(consts.imageConsts["EmbossKernel"])
+    assert_allclose(
+        direct_convolve(data, kernel).astype(int),
+        fft_convolve(data, kernel).astype(int),
+        rtol=0, atol=KERNEL_TOLERANCE
+    )
+
+
+def test_working_size(lenna):
+    lenna.set_effect_flags(True, False, False, False)
+    lenna.working_size = (200, 100)
+    lenna.convert_to_ascii_art()
+    assert lenna.get_image_data().shape == (256, 256)
+    assert len(lenna.get_ascii_art(200, 100).split('\n')) == 100
+    with open(relative_path("tests/data/lenna_ascii_full.txt")) as f:
+        assert_equal(str(lenna), f.read())
+
+
+def test_lazy_decoding(monkeypatch):
+    from src.image import Image
+
+    def fail(*_):
+        raise AssertionError("image decoded on construction")
+
+    monkeypatch.setattr("src.image.image.imread", fail)
+    image = Image(
+        "Lenna", relative_path("tests/data/lenna.png"),
+        False, False, False, False,
+        ""
+    )
+    assert (image.get_width(), image.get_height(), image.get_color_space()) == (512, 512, 3)
+    monkeypatch.undo()
+    image.convert_to_ascii_art()
+    assert_effect(image.get_image_data(), "gray")
+
+
+def test_memory_usage(lenna):
+    assert lenna.get_memory_usage() == 0
+    lenna.set_effect_flags(True, False, True, False)
+    lenna.convert_to_ascii_art()
+    raw_size = 512 * 512 * 3
+    assert lenna.get_memory_usage() >= raw_size
+    lenna.release_raw_data()
+    assert lenna.get_memory_usage() == 512 * 512
+    assert not hasattr(lenna, "__dict__")
+    with pytest.raises(AttributeError):
+        lenna.unknown_attribute = True
+    lenna.keep_raw_data = False
+    lenna.set_effect_flags(True, False, False, False)
+    lenna.convert_to_ascii_art()
+    with open(relative_path("tests/data/lenna_ascii_full.txt")) as f:
+        assert_equal(str(lenna), f.read())
+    assert lenna.get_memory_usage() == 512 * 512
+
+
+def test_stage_cache_budget(lenna, monkeypatch):
+    raw_size = 512 * 512 * 3
+    monkeypatch.setitem(consts.imageConsts, "StageCacheBudget", raw_size)
+    lenna.release_raw_data()  # recreates stage cache with the patched budget
+    lenna.set_effect_flags(True, True, True, True)
+    lenna.convert_to_ascii_art()
+    # raw data, stages within the budget and the final grayscale image data
+    assert lenna.get_memory_usage() <= 2 * raw_size + 512 * 512
+
+
+def test_full_size_output_releases_data(lenna):
+    lenna.set_effect_flags(True, False, False, False)
+    lenna.working_size = (200, 100)
+    lenna.keep_raw_data = False
+    lenna.convert_to_ascii_art()
+    usage = lenna.get_memory_usage()
+    assert usage == 256 * 256
+    with open(relative_path("tests/data/lenna_ascii_full.txt")) as f:
+        expected = f.read()
+    assert_equal(str(lenna), expected)
+    assert lenna.get_memory_usage() == usage
+    assert b"".join(lenna.iter_ascii_chunks(4096)).decode() == expected
+    assert lenna.get_memory_usage() == usage
+
+
+def test_set_grayscale_level(lenna, monkeypatch):
+    lenna.set_effect_flags(True, True, True, True)
+    lenna.convert_to_ascii_art()
+    assert lenna.get_ascii_art(40, 20)
+    monkeypatch.setattr("src.image.image.convolve", None)  # pipeline must not run
+    lenna.set_grayscale_level(" @o. ")
+    assert lenna.grayscale_level == "@o."
+    with open(relative_path("tests/data/lenna_ascii_all.txt")) as f:
+        assert_equal(str(lenna), f.read())
+    assert set(lenna.get_ascii_art(40, 20)) <= set("@o.\n")
+
+
+def test_render_cache(lenna):
+    lenna.convert_to_ascii_art()
+    for _ in range(3):
+        for size in ((40, 20), (80, 40)):
+            lenna.get_ascii_art(*size)
+    stats = lenna.get_render_cache_stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (4, 2, 2)
+    lenna.set_grayscale_level("@o.")
+    assert set(lenna.get_ascii_art(40, 20)) <= set("@o.\n")
+    lenna.convert_to_ascii_art()
+    assert lenna.get_render_cache_stats()["entries"] == 0
+
+
+@pytest.mark.parametrize("working_size", (None, (100, 100)))
+@pytest.mark.parametrize("flags", (
+        (False, False, False, False), (True, True, False, False),
+        (False, False, True, False), (True, True, True, True)
+))
+def test_tiled_processing(monkeypatch, flags, working_size):
+    from src.image import Image
+    from src.util.disk_cache import disk_cache
+    monkeypatch.setattr(disk_cache, "enabled", False)
+
+    def convert(tile_threshold: int) -> np.ndarray:
+        monkeypatch.setitem(consts.imageConsts, "TileThreshold", tile_threshold)
+        image = Image(
+            "Lenna", relative_path("tests/data/lenna.png"),
+            *flags, "", working_size, max_workers=3
+        )
+        image.convert_to_ascii_art()
+        return image.get_image_data()
+
+    monkeypatch.setitem(consts.imageConsts, "TilePixels", 512 * 7)  # uneven bands
+    assert_equal(convert(0), convert(512 * 512))
+
+
+def test_grayscale_level_switch_during_render(lenna, monkeypatch):
+    from src.image import image as image_module
+    lenna.convert_to_ascii_art()
+    expected = lenna.get_ascii_art(40, 20)
+    lenna.convert_to_ascii_art()  # drops rendered outputs
+    resample = image_module.compute_resample_indices
+
+    def switch_level(*args):
+        lenna.set_grayscale_level("@o.")  # e.g. settings applied from GUI thread
+        return resample(*args)
+
+    monkeypatch.setattr(image_module, "compute_resample_indices", switch_level)
+    lenna.get_ascii_art(40, 20)  # rendered with the default level
+    monkeypatch.undo()
+    lenna.set_grayscale_level("")
+    assert lenna.get_ascii_art(40, 20) == expected
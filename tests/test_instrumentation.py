@@ -0,0 +1,68 @@
+import json
+import os
+import sys
+
+from src.image import Image
+from src.util import consts
+from src.util.instrumentation import Instrumentation, instrumentation, instrumented
+
+
+def relative_path(rp: str) -> str:
+    return os.path.join(sys.path[0], rp)
+
+
+def convert_lenna():
+    lenna = Image(
+        "Lenna", relative_path("tests/data/lenna.png"),
+        True, False, True, False,
+        consts.uiConsts["DefaultGrayscaleLevel"]
+    )
+    lenna.convert_to_ascii_art()
+    lenna.get_ascii_art(100, 50)
+    return lenna
+
+
+def test_disabled():
+    instrumentation.reset()
+    convert_lenna()
+    assert instrumentation.snapshot() == {}
+
+
+def test_image_stages(monkeypatch):
+    monkeypatch.setattr(instrumentation, "enabled", True)
+    instrumentation.reset()
+    convert_lenna()
+    stats = instrumentation.snapshot()
+    instrumentation.reset()
+    for stage in (
+            "image.convert", "image.decode", "image.contrast", "image.gray",
+            "image.sharpen", "convolution.direct", "image.resize", "image.format_output"
+    ):
+        assert stats[stage]["calls"] == 1, stage
+        assert stats[stage]["seconds"] >= 0
+    assert stats["image.decode"]["bytes"] == 512 * 512 * 3
+    assert stats["image.gray"]["bytes"] == 512 * 512
+    assert stats["image.convert"]["seconds"] >= stats["image.contrast"]["seconds"]
+
+
+def test_snapshot_merge_dump(tmp_path):
+    stats = Instrumentation(enabled=True)
+
+    @instrumented("square")
+    def square(x):
+        return x * x
+
+    with stats.stage("outer") as stage:
+        stage.nbytes = 10
+    stats.count("events", 3)
+    stats.count("events")
+    merged = Instrumentation()
+    merged.merge(stats.snapshot())
+    merged.merge(stats.snapshot())
+    snapshot = merged.snapshot()
+    assert snapshot["events"]["calls"] == 8
+    assert snapshot["outer"]["calls"] == 2 and snapshot["outer"]["bytes"] == 20
+    assert snapshot["outer"]["max_seconds"] == stats.snapshot()["outer"]["max_seconds"]
+    merged.dump(str(tmp_path / "stats.json"))
+    assert json.loads((tmp_path / "stats.json").read_text()) == snapshot
+    assert square(3) == 9  # shared instrumentation is disabled
@@ -0,0 +1,36 @@
+import numpy as np
+
+from src.image.render_cache import RenderCache
+
+
+def test_per_image_limit():
+    cache = RenderCache(1024, 2)
+    owner = cache.new_owner()
+    for size in range(3):
+        cache.put(owner, size, np.zeros(10, dtype=np.uint8))
+    assert cache.get(owner, 0) is None
+    assert cache.get(owner, 2) is not None
+    assert cache.get_stats(owner) == {"hits": 1, "misses": 1, "entries": 2, "bytes": 20}
+
+
+def test_global_budget():
+    cache = RenderCache(100, 8)
+    first, second = cache.new_owner(), cache.new_owner()
+    cache.put(first, 0, np.zeros(40, dtype=np.uint8))
+    cache.put(second, 0, np.zeros(40, dtype=np.uint8))
+    assert cache.get(first, 0) is not None
+    cache.put(second, 1, np.zeros(40, dtype=np.uint8))
+    assert cache.get(second, 0) is None
+    assert cache.nbytes == 80
+    cache.invalidate(first)
+    assert cache.get_stats() == {"hits": 1, "misses": 1, "entries": 1, "bytes": 40}
+
+
+def test_release_owner():
+    cache = RenderCache(1024, 2)
+    owner = cache.new_owner()
+    cache.put(owner, 0, np.zeros(10, dtype=np.uint8))
+    assert cache.get(owner, 1) is None
+    cache.release_owner(owner)
+    assert cache.get_stats(owner) == {"hits": 0, "misses": 0, "entries": 0, "bytes": 0}
+    assert cache.nbytes == 0 and not cache._RenderCache__owner_stats
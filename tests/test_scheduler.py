@@ -0,0 +1,73 @@
+import time
+from threading import Event, Lock
+
+from src.util.scheduler import ConversionScheduler, map_ordered
+
+
+def test_newest_job_wins():
+    scheduler = ConversionScheduler(max_workers=2)
+    started, release, finished = Event(), Event(), Event()
+    results = []
+    lock = Lock()
+    concurrent = []
+
+    def job(value):
+        def run():
+            with lock:
+                concurrent.append(value)
+            started.set()
+            release.wait(5)
+            with lock:
+                concurrent.remove(value)
+            return value
+        return run
+
+    def on_done(value):
+        results.append(value)
+        if value == 4:
+            finished.set()
+
+    scheduler.submit(0, job(1), on_done)
+    assert started.wait(5)
+    for value in (2, 3, 4):
+        scheduler.submit(0, job(value), on_done)
+        assert len(concurrent) == 1  # jobs of one key never race
+    assert scheduler.depth == 1
+    release.set()
+    assert finished.wait(5)
+    assert results == [4]
+    assert scheduler.depth == 0
+    scheduler.shutdown()
+
+
+def test_independent_keys():
+    scheduler = ConversionScheduler(max_workers=2)
+    done = {key: Event() for key in range(5)}
+    for key in done:
+        scheduler.submit(key, lambda k=key: k * 2, lambda value: done[value // 2].set())
+    assert all(event.wait(5) for event in done.values())
+    scheduler.shutdown()
+
+
+def test_map_ordered():
+    lock = Lock()
+    in_flight = [0, 0]  # current, max
+
+    def items():
+        for value in range(50):
+            with lock:
+                in_flight[0] += 1
+                in_flight[1] = max(in_flight)
+            yield value
+
+    def square(value):
+        time.sleep(0.001 * (value % 3))
+        return value * value
+
+    results = []
+    for result in map_ordered(square, items(), max_workers=4, buffer_size=6):
+        results.append(result)
+        with lock:
+            in_flight[0] -= 1
+    assert results == [value * value for value in range(50)]
+    assert in_flight[1] <= 7  # buffer + the item being pulled
@@ -0,0 +1,70 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+from imageio.v3 import imwrite
+
+from src.image import FrameSequence, Image, open_image
+from src.image.session import load_session, save_session
+from src.util import consts
+
+
+def relative_path(rp: str) -> str:
+    return os.path.join(sys.path[0], rp)
+
+
+def is_memory_mapped(data: np.ndarray) -> bool:
+    while data is not None:
+        if isinstance(data, np.memmap):
+            return True
+        data = data.base
+    return False
+
+
+@pytest.fixture
+def images(tmp_path):
+    gif_path = str(tmp_path / "clip.gif")
+    imwrite(gif_path, [np.full((24, 32, 3), i * 40, dtype=np.uint8) for i in range(5)], duration=50)
+    lenna = Image(
+        "Lenna", relative_path("tests/data/lenna.png"),
+        True, False, True, False,
+        "@%#*+=-:."
+    )
+    lenna.working_size = (200, 100)
+    clip = open_image("Clip", gif_path, False, True, False, False, "")
+    for image in (lenna, clip):
+        image.convert_to_ascii_art()
+    return [lenna, clip]
+
+
+def test_session(images, tmp_path):
+    path = str(tmp_path / "session.asciiart")
+    save_session(path, images)
+    lenna, clip = load_session(path)
+    assert isinstance(lenna, Image) and isinstance(clip, FrameSequence)
+    assert (lenna.name, lenna.path, lenna.grayscale_level) == (images[0].name, images[0].path, "@%#*+=-:.")
+    assert (lenna.is_contrast, lenna.is_sharpen, lenna.working_size) == (True, True, (200, 100))
+    assert (lenna.get_width(), lenna.get_height()) == (512, 512)
+    assert is_memory_mapped(lenna.get_image_data())
+    assert np.array_equal(lenna.get_image_data(), images[0].get_image_data())
+    assert lenna.get_ascii_art(120, 60) == images[0].get_ascii_art(120, 60)
+    assert str(lenna) == str(images[0])  # decoded from path on demand
+
+    assert len(clip) == 5 and clip.get_frame_duration() == pytest.approx(0.05)
+    assert clip.is_negative
+    for frame, expected in zip(clip, images[1]):
+        assert is_memory_mapped(frame.get_image_data())
+        assert frame.get_ascii_art(40, 20) == expected.get_ascii_art(40, 20)
+
+
+def test_invalid_session(images, tmp_path):
+    with pytest.raises(ValueError):
+        save_session(str(tmp_path / "session.asciiart"), [Image(
+            "Lenna", relative_path("tests/data/lenna.png"),
+            False, False, False, False,
+            consts.uiConsts["DefaultGrayscaleLevel"]
+        )])
+    assert os.listdir(tmp_path) == ["clip.gif"]  # no partial file is left
+    with pytest.raises(ValueError):
+        load_session(relative_path("tests/data/lenna.png"))
@@ -0,0 +1,65 @@
+import os
+import subprocess
+import sys
+from typing import Set, Tuple
+
+import pytest
+
+COLD_START_BUDGET = 0.1  # seconds on top of third-party imports
+
+GUI_DEPENDENCIES = (
+    "import numpy, PySide2.QtCore, PySide2.QtGui, PySide2.QtQml, "
+    "PySide2.QtQuick, PySide2.QtQuickControls2, PySide2.QtWidgets"
+)
+
+
+def import_in_fresh_interpreter(statement: str) -> Tuple[float, Set[str]]:
+    code = (
+        "import sys, time\n"
+        "start = time.perf_counter()\n"
+        f"{statement}\n"
+        "print(time.perf_counter() - start)\n"
+        "print(' '.join(sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=sys.path[0],
+        check=True, capture_output=True, text=True
+    )
+    seconds, modules = result.stdout.splitlines()
+    return float(seconds), set(modules.split())
+
+
+def test_core_cold_start():
+    seconds, modules = import_in_fresh_interpreter("import src.image, src.factory")
+    assert seconds < COLD_START_BUDGET
+    assert not {"PySide2", "numpy", "imageio"} & modules
+
+
+def test_headless_conversion_imports():
+    numpy_seconds, _ = import_in_fresh_interpreter("import numpy")
+    seconds, modules = import_in_fresh_interpreter(
+        "from src.factory import ArtList\n"
+        "from src.image import Image, FrameSequence"
+    )
+    assert seconds < numpy_seconds + COLD_START_BUDGET
+    assert "numpy" in modules
+    assert not {"PySide2", "imageio"} & modules
+
+
+def test_headless_list():
+    from src.factory import ArtList
+    from src.image import Image
+    arts = ArtList()
+    arts += Image("Lenna", os.path.join(sys.path[0], "tests/data/lenna.png"), False, False, False, False, "")
+    assert len(arts) == 1 and 0 in arts
+    assert not arts.is_animatable()
+    arts.reset([])
+    assert len(arts) == 0
+
+
+def test_gui_cold_start():
+    pytest.importorskip("PySide2")
+    dependencies_seconds, _ = import_in_fresh_interpreter(GUI_DEPENDENCIES)
+    seconds, modules = import_in_fresh_interpreter("import app")
+    assert seconds < dependencies_seconds + COLD_START_BUDGET
+    assert "imageio" not in modules